@@ -1,14 +1,24 @@
+import argparse
 import json
+import os
 import re
+import time
 from pathlib import Path
 
 from tqdm import tqdm
 
-RAW_INPUT = Path("../data/processed/digwatch_clean_full.json")
+RAW_INPUT = Path("../data/processed/digwatch_clean_full.jsonl")
+# normalize_digwatch.py piše ovde dok radi, pa preimenuje u RAW_INPUT
+PARTIAL_INPUT = RAW_INPUT.with_name(RAW_INPUT.name + ".partial")
 OUTPUT_CHUNKS = Path("../data/processed/digwatch_chunks.jsonl")
 WARNINGS = Path("../data/processed/digwatch_warnings.jsonl")
 STATE_FILE = Path("../data/processed/digwatch_state.json")
 
+FOLLOW_POLL = 0.5  # s između provera dok normalizer još piše
+FOLLOW_WAIT = 60  # --follow: koliko se čeka da normalizer otvori .partial
+FOLLOW_IDLE = 600  # .partial koji ovoliko s ne raste = ubijen normalizer
+SAVE_EVERY = 500  # postova između dva upisa state-a
+
 
 def load_json(path):
     with open(path, "r", encoding="utf-8") as f:
@@ -20,6 +30,77 @@ def save_json(path, data):
         json.dump(data, f, indent=2, ensure_ascii=False)
 
 
+def read_jsonl(path):
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def follow_jsonl(path, final):
+    """
+    Streams records from a JSONL file that normalize_digwatch.py is still
+    writing. Ends when the file is renamed to `final` (normalization done);
+    if it disappears any other way, or stops growing for FOLLOW_IDLE s, the
+    normalizer failed and so do we.
+    """
+    try:
+        f = open(path, "r", encoding="utf-8")
+    except FileNotFoundError:
+        # normalizer je završio između provere i otvaranja
+        yield from read_jsonl(final)
+        return
+
+    with f:
+        inode = os.fstat(f.fileno()).st_ino
+        pending = ""
+        writing = True
+        last_data = time.time()
+        while True:
+            line = f.readline()
+            if line:
+                last_data = time.time()
+                pending += line
+                if pending.endswith("\n"):
+                    if pending.strip():
+                        yield json.loads(pending)
+                    pending = ""
+                continue
+            if not writing:
+                break
+            if time.time() - last_data > FOLLOW_IDLE:
+                raise RuntimeError(f"{path}: nema novih zapisa {FOLLOW_IDLE}s")
+            if path.exists():
+                time.sleep(FOLLOW_POLL)
+            else:
+                writing = False  # još jedno čitanje do kraja posle rename-a
+
+    if not final.exists() or final.stat().st_ino != inode:
+        raise RuntimeError(f"{path}: normalizacija prekinuta pre kraja")
+    if pending.strip():
+        yield json.loads(pending)
+
+
+def input_items(follow):
+    """
+    Normalized posts, one at a time. While the normalizer is running (its
+    .partial file exists) the chunker follows it instead of waiting for the
+    end; --follow also waits up to FOLLOW_WAIT s for the normalizer to start.
+    """
+    started = time.time()
+    while follow and not PARTIAL_INPUT.exists():
+        if RAW_INPUT.exists() and RAW_INPUT.stat().st_mtime >= started:
+            break  # normalizer je već završio
+        if time.time() - started > FOLLOW_WAIT:
+            print(f"[WARN] {PARTIAL_INPUT} se nije pojavio, čitam {RAW_INPUT}")
+            break
+        time.sleep(FOLLOW_POLL)
+
+    if PARTIAL_INPUT.exists():
+        return follow_jsonl(PARTIAL_INPUT, RAW_INPUT)
+    return read_jsonl(RAW_INPUT)
+
+
 def append_jsonl(path, obj):
     with open(path, "a", encoding="utf-8") as f:
         f.write(json.dumps(obj, ensure_ascii=False) + "\n")
@@ -79,52 +160,138 @@ def chunk_text(text, max_len=1200, fallback_threshold=1500):
     return chunks
 
 
-def main():
-    print("=== DIGWATCH CHUNKING START ===")
+def chunk_item(item):
+    """Chunk zapisi jednog normalizovanog DigWatch posta (verzija = modified)."""
+    doc_id = str(item.get("id", ""))
+    chunks = chunk_text(item.get("text"), max_len=1200, fallback_threshold=1500)
+
+    return [
+        {
+            "id": f"digwatch::{doc_id}::{idx:03}",
+            "title": item.get("title", ""),
+            "url": item.get("url", ""),
+            "text": ch,
+            "date": item.get("date"),
+            "quarter": item.get("quarter", ""),
+            "categories": item.get("category_names", []),
+            "tags": item.get("tag_names", []),
+            "origin_site": "digwatch",
+            "source": "digwatch",
+            "modified": item.get("modified"),
+        }
+        for idx, ch in enumerate(chunks, start=1)
+    ]
+
+
+def load_state():
+    """
+    {post id: modified} već chunkovanih postova. Napredak se ne pamti kao
+    pozicija u toku: raw store pomera izmenjen post na kraj, a compaction
+    menja redosled, pa bi indeks preskočio izmenjene i nove postove.
+    """
+    if not STATE_FILE.exists():
+        return {}
+    state = load_json(STATE_FILE)
+    if "done" not in state:
+        print("[STATE] Stari state (pozicija u toku) → chunkujem sve ponovo")
+        return {}
+    return state["done"]
+
 
-    data = load_json(RAW_INPUT)
+def save_state(done):
+    tmp = STATE_FILE.with_name(STATE_FILE.name + ".tmp")
+    save_json(tmp, {"done": done})
+    tmp.replace(STATE_FILE)
 
-    if STATE_FILE.exists():
-        state = load_json(STATE_FILE)
-        start_index = state.get("last_processed", 0)
-        print(f"[STATE] Continuing from index {start_index}")
+
+def post_id(chunk):
+    """'digwatch::<post id>::007' → '<post id>'"""
+    parts = (chunk.get("id") or "").split("::")
+    return parts[1] if len(parts) == 3 else None
+
+
+def compact_chunks(done):
+    """
+    Iz OUTPUT_CHUNKS izbacuje chunkove starih verzija postova (modified se
+    razlikuje od onog u state-u, ili post nije chunkovan) i starije kopije
+    istog chunk ID-ja (prekinut prolaz). Vraća broj izbačenih linija.
+    """
+    if not OUTPUT_CHUNKS.exists():
+        return 0
+
+    last = {}
+    with open(OUTPUT_CHUNKS, "r", encoding="utf-8") as f:
+        for n, line in enumerate(f):
+            if line.strip():
+                last[json.loads(line).get("id")] = n
+
+    dropped = 0
+    tmp = OUTPUT_CHUNKS.with_name(OUTPUT_CHUNKS.name + ".tmp")
+    with open(OUTPUT_CHUNKS, "r", encoding="utf-8") as f, open(
+        tmp, "w", encoding="utf-8"
+    ) as out:
+        for n, line in enumerate(f):
+            if not line.strip():
+                continue
+            chunk = json.loads(line)
+            pid = post_id(chunk)
+            current = pid in done and done[pid] == chunk.get("modified")
+            if not current or last[chunk.get("id")] != n:
+                dropped += 1
+                continue
+            out.write(line)
+
+    if dropped:
+        tmp.replace(OUTPUT_CHUNKS)
     else:
-        start_index = 0
-        state = {"last_processed": 0}
+        tmp.unlink()
+    return dropped
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="pokrenut uporedo sa normalize_digwatch.py: čeka i prati njegov izlaz",
+    )
+    args = parser.parse_args()
 
-    for i in tqdm(range(start_index, len(data)), desc="Chunking DigWatch"):
-        item = data[i]
+    print("=== DIGWATCH CHUNKING START ===")
+
+    done = load_state()
+    print(f"[STATE] Već chunkovanih postova: {len(done)}")
+    chunked = skipped = 0
+
+    # postovi stižu jedan po jedan; ceo normalizovan arhiv se ne drži u memoriji;
+    # post se (ponovo) chunkuje kad je nov ili mu se modified promenio
+    items = input_items(args.follow)
+    for item in tqdm(items, desc="Chunking DigWatch"):
         doc_id = str(item.get("id", ""))
+        if doc_id in done and done[doc_id] == item.get("modified"):
+            skipped += 1
+            continue
 
         if not item.get("text"):
             append_jsonl(WARNINGS, {"id": doc_id, "issue": "Missing text"})
-            continue
-
-        if not item.get("date"):
-            append_jsonl(WARNINGS, {"id": doc_id, "issue": "Missing date"})
-
-        categories = item.get("category_names", [])
-        tags = item.get("tag_names", [])
-
-        chunks = chunk_text(item["text"], max_len=1200, fallback_threshold=1500)
-
-        for idx, ch in enumerate(chunks, start=1):
-            obj = {
-                "id": f"digwatch::{doc_id}::{idx:03}",
-                "title": item.get("title", ""),
-                "url": item.get("url", ""),
-                "text": ch,
-                "date": item.get("date"),
-                "quarter": item.get("quarter", ""),
-                "categories": categories,
-                "tags": tags,
-                "origin_site": "digwatch",
-                "source": "digwatch",
-            }
-            append_jsonl(OUTPUT_CHUNKS, obj)
-
-        state["last_processed"] = i + 1
-        save_json(STATE_FILE, state)
+        else:
+            if not item.get("date"):
+                append_jsonl(WARNINGS, {"id": doc_id, "issue": "Missing date"})
+            for obj in chunk_item(item):
+                append_jsonl(OUTPUT_CHUNKS, obj)
+
+        # i post bez teksta ulazi u state, da se ne proverava svaki put
+        done[doc_id] = item.get("modified")
+        chunked += 1
+        if chunked % SAVE_EVERY == 0:
+            save_state(done)
+
+    save_state(done)
+    # chunkovi prethodnih verzija izmenjenih postova (i duplikati prekinutog
+    # prolaza) se izbacuju; ingest upisuje samo ono što ostane
+    dropped = compact_chunks(done)
+    print(f"Chunkovano (novi/izmenjeni): {chunked} | nepromenjeni: {skipped}")
+    print(f"Izbačeno zastarelih chunkova: {dropped}")
 
     print("=== DONE ===")
     print(f"Chunks saved to: {OUTPUT_CHUNKS}")
@@ -1,9 +1,23 @@
 import json
 import re
+import sys
 from datetime import datetime
 from pathlib import Path
 from typing import List, Tuple
 
+from incremental import (
+    carry_over,
+    chunker_version,
+    is_unchanged,
+    load_fingerprints,
+    load_previous_chunks,
+    save_fingerprints,
+)
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from crawler.boilerplate import LearnedBoilerplate  # noqa: E402
+
 INPUT_FILE = (
     Path(__file__).resolve().parents[1]
     / "scripts"
@@ -23,6 +37,9 @@ OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
 MAX_CHARS = 1200
 HARD_MAX_CHARS = 2000
 
+# linije koje se ponavljaju na mnogo strana izvora (crawler/learn_boilerplate.py)
+LEARNED = LearnedBoilerplate("eu_ds")
+
 
 def clean_whitespace(text: str) -> str:
     """Normalizuj whitespace: trim, ukloni višak praznih redova, duple razmake."""
@@ -76,6 +93,17 @@ def parse_date_and_quarter(date_published: str, date_updated: str) -> Tuple[str,
     return iso, quarter
 
 
+def drop_learned_boilerplate(obj: dict) -> int:
+    """
+    Izbacuje naučene boilerplate linije iz content-a. Fingerprint dobija trag
+    izbačenih linija, pa se posle novog učenja ponovo chunkuju samo članci
+    kojima se taj skup promenio. Vraća broj izbačenih linija.
+    """
+    obj["content"], dropped = LEARNED.strip(obj.get("content") or "")
+    obj["fingerprint"] = LEARNED.stamp(obj.get("fingerprint"), dropped)
+    return len(dropped)
+
+
 def split_into_paragraphs(content: str) -> List[str]:
     """Split po praznim redovima u paragraf blokove."""
     if not content:
@@ -351,6 +379,57 @@ def slug_from_url(url: str) -> str:
     return slug
 
 
+def chunk_article(obj: dict) -> List[dict]:
+    """Chunk zapisi jednog članka: blokovi + tematske kategorije i tagovi po bloku."""
+    url = obj.get("url") or ""
+    title = obj.get("title") or ""
+    content = obj.get("content") or ""
+
+    date_iso, quarter = parse_date_and_quarter(
+        obj.get("date_published", "") or "", obj.get("date_updated", "") or ""
+    )
+
+    base_cat = obj.get("news_type") or obj.get("content_type") or "News article"
+    base_categories = [base_cat]
+
+    slug = slug_from_url(url)
+    records = []
+
+    for local_idx, block in enumerate(build_chunk_blocks(content), start=1):
+        block = clean_whitespace(block)
+        if not block:
+            continue
+
+        thematic = infer_thematic_categories(block, title)
+        # spoji kategorije bez duplikata
+        categories: List[str] = []
+        for c in base_categories + thematic:
+            if c and c not in categories:
+                categories.append(c)
+
+        tags = infer_tags(block, title)
+
+        chunk_id = f"eu-news::{slug}::{local_idx:03d}"
+
+        records.append(
+            {
+                "id": chunk_id,
+                "text": block,
+                "title": title,
+                "url": url,
+                "source": "eu-news",
+                "date": date_iso,
+                "quarter": quarter,
+                "categories": categories,
+                "tags": tags,
+                "origin_site": "digital-strategy",
+                "fingerprint": obj.get("fingerprint"),
+            }
+        )
+
+    return records
+
+
 def main():
     if not INPUT_FILE.exists():
         print(f"❌ INPUT ne postoji: {INPUT_FILE}")
@@ -358,6 +437,15 @@ def main():
 
     count_articles = 0
     count_chunks = 0
+    count_reused = 0
+    count_dropped = 0
+
+    # članci koje je crawler dobio kao 304 Not Modified ili sa nepromenjenim
+    # fingerprint-om se ne chunkuju ponovo, dok se kod chunkera ne promeni
+    previous = load_previous_chunks(OUTPUT_FILE)
+    version = chunker_version(__file__)
+    fingerprints = load_fingerprints(OUTPUT_FILE, version)
+    seen_fingerprints = {}
 
     with open(INPUT_FILE, "r", encoding="utf-8") as fin, open(
         OUTPUT_FILE, "w", encoding="utf-8"
@@ -373,60 +461,38 @@ def main():
                 print(f"⚠️ JSON decode error u liniji {line_idx}: {e}")
                 continue
 
+            count_dropped += drop_learned_boilerplate(obj)
             url = obj.get("url") or ""
-            title = obj.get("title") or ""
             content = obj.get("content") or ""
             if not content.strip():
                 continue
 
             count_articles += 1
+            fingerprint = obj.get("fingerprint")
+            if fingerprint:
+                seen_fingerprints[url] = fingerprint
+
+            if is_unchanged(obj, url, previous, fingerprints):
+                reused = carry_over(previous, url, fout)
+                count_chunks += reused
+                count_reused += 1
+                continue
 
-            date_iso, quarter = parse_date_and_quarter(
-                obj.get("date_published", "") or "", obj.get("date_updated", "") or ""
-            )
-
-            base_cat = obj.get("news_type") or obj.get("content_type") or "News article"
-            base_categories = [base_cat]
-
-            slug = slug_from_url(url)
-            blocks = build_chunk_blocks(content)
-
-            for local_idx, block in enumerate(blocks, start=1):
-                block = clean_whitespace(block)
-                if not block:
-                    continue
-
-                thematic = infer_thematic_categories(block, title)
-                # spoji kategorije bez duplikata
-                categories: List[str] = []
-                for c in base_categories + thematic:
-                    if c and c not in categories:
-                        categories.append(c)
-
-                tags = infer_tags(block, title)
-
-                chunk_id = f"eu-news::{slug}::{local_idx:03d}"
-
-                rec = {
-                    "id": chunk_id,
-                    "text": block,
-                    "title": title,
-                    "url": url,
-                    "source": "eu-news",
-                    "date": date_iso,
-                    "quarter": quarter,
-                    "categories": categories,
-                    "tags": tags,
-                    "origin_site": "digital-strategy",
-                }
-
+            for rec in chunk_article(obj):
                 fout.write(json.dumps(rec, ensure_ascii=False) + "\n")
                 count_chunks += 1
 
+    save_fingerprints(OUTPUT_FILE, seen_fingerprints, version)
+
     print("\n======================================")
     print("Završeno EU DS chunkovanje (v3 PRO)!")
     print(f"Ukupno članaka: {count_articles}")
     print(f"Generisano chunkova: {count_chunks}")
+    print(f"Nepromenjeni članci (304/fingerprint, chunkovi preuzeti): {count_reused}")
+    print(
+        f"Izbačeno naučenih boilerplate linija: {count_dropped} "
+        f"({len(LEARNED)} u tabeli)"
+    )
     print(f"Output fajl: {OUTPUT_FILE}")
     print("======================================\n")
 
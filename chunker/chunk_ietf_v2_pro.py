@@ -199,6 +199,7 @@ def main():
                 "tags": tags,
                 "origin_site": "ietf.org",
                 "source": "ietf.org",
+                "fingerprint": item.get("fingerprint"),
             }
             append_jsonl(OUTPUT_CHUNKS, obj)
 
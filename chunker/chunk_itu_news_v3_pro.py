@@ -1,9 +1,23 @@
 import json
 import re
+import sys
 from datetime import datetime
 from pathlib import Path
 from typing import List, Tuple
 
+from incremental import (
+    carry_over,
+    chunker_version,
+    is_unchanged,
+    load_fingerprints,
+    load_previous_chunks,
+    save_fingerprints,
+)
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from crawler.boilerplate import LearnedBoilerplate  # noqa: E402
+
 INPUT_FILE = (
     Path(__file__).resolve().parents[1] / "scripts" / "itu" / "itu_all_clean.jsonl"
 )
@@ -20,6 +34,9 @@ OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
 MAX_CHARS = 1200
 HARD_MAX_CHARS = 2000
 
+# linije koje se ponavljaju na mnogo strana izvora (crawler/learn_boilerplate.py)
+LEARNED = LearnedBoilerplate("itu")
+
 
 def clean_whitespace(text: str) -> str:
     """Normalizuj whitespace: trim, ukloni višak praznih redova, duple razmake."""
@@ -74,6 +91,17 @@ def parse_date_and_quarter(date_str: str) -> Tuple[str, str]:
     return "", ""
 
 
+def drop_learned_boilerplate(obj: dict) -> int:
+    """
+    Izbacuje naučene boilerplate linije iz content-a. Fingerprint dobija trag
+    izbačenih linija, pa se posle novog učenja ponovo chunkuju samo članci
+    kojima se taj skup promenio. Vraća broj izbačenih linija.
+    """
+    obj["content"], dropped = LEARNED.strip(obj.get("content") or "")
+    obj["fingerprint"] = LEARNED.stamp(obj.get("fingerprint"), dropped)
+    return len(dropped)
+
+
 def split_into_paragraphs(content: str) -> List[str]:
     """Split po praznim redovima u paragraf blokove."""
     if not content:
@@ -393,6 +421,15 @@ def main():
 
     count_articles = 0
     count_chunks = 0
+    count_reused = 0
+    count_dropped = 0
+
+    # članci koje je crawler dobio kao 304 Not Modified ili sa nepromenjenim
+    # fingerprint-om se ne chunkuju ponovo, dok se kod chunkera ne promeni
+    previous = load_previous_chunks(OUTPUT_FILE)
+    version = chunker_version(__file__)
+    fingerprints = load_fingerprints(OUTPUT_FILE, version)
+    seen_fingerprints = {}
 
     with open(INPUT_FILE, "r", encoding="utf-8") as fin, open(
         OUTPUT_FILE, "w", encoding="utf-8"
@@ -408,12 +445,23 @@ def main():
                 print(f"⚠️ JSON decode error u liniji {line_idx}: {e}")
                 continue
 
+            count_dropped += drop_learned_boilerplate(obj)
             url = obj.get("url") or ""
             raw_date = obj.get("date") or ""
             content = obj.get("content") or ""
             if not content.strip():
                 continue
 
+            fingerprint = obj.get("fingerprint")
+            if fingerprint:
+                seen_fingerprints[url] = fingerprint
+
+            if is_unchanged(obj, url, previous, fingerprints):
+                count_chunks += carry_over(previous, url, fout)
+                count_articles += 1
+                count_reused += 1
+                continue
+
             title, body = extract_title_and_body(content)
             if not title:
 
@@ -455,15 +503,23 @@ def main():
                     "categories": categories,
                     "tags": tags,
                     "origin_site": "itu-news",
+                    "fingerprint": fingerprint,
                 }
 
                 fout.write(json.dumps(rec, ensure_ascii=False) + "\n")
                 count_chunks += 1
 
+    save_fingerprints(OUTPUT_FILE, seen_fingerprints, version)
+
     print("\n======================================")
     print("Završeno ITU chunkovanje (v3 PRO)!")
     print(f"Ukupno članaka: {count_articles}")
     print(f"Generisano chunkova: {count_chunks}")
+    print(f"Nepromenjeni članci (304/fingerprint, chunkovi preuzeti): {count_reused}")
+    print(
+        f"Izbačeno naučenih boilerplate linija: {count_dropped} "
+        f"({len(LEARNED)} u tabeli)"
+    )
     print(f"Output fajl: {OUTPUT_FILE}")
     print("======================================\n")
 
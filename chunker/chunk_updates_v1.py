@@ -1,13 +1,20 @@
 import html
 import json
 import re
+import sys
 from datetime import datetime
 from pathlib import Path
 
-from bs4 import BeautifulSoup
+from lxml import etree
 
-RAW = Path(__file__).resolve().parents[1] / "data" / "raw" / "updates_all.json"
-TAX = Path(__file__).resolve().parents[1] / "data" / "raw" / "taxonomy_map.json"
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from crawler.boilerplate import LearnedBoilerplate  # noqa: E402
+from crawler.extract import get_text, parse_html  # noqa: E402
+from crawler.raw_store import DEFAULT_DIR, LEGACY_JSON, iter_raw_updates  # noqa: E402
+from crawler.taxonomy import TaxonomyCache  # noqa: E402
+
+RAW = DEFAULT_DIR
 OUT = (
     Path(__file__).resolve().parents[1]
     / "data"
@@ -31,9 +38,21 @@ BLACKLIST_PHRASES = [
     "would you like to learn more about ai, tech and digital diplomacy",
     "ask our diplo chatbot",
 ]
+# paragrafi koji se ponavljaju na mnogo postova (crawler/learn_boilerplate.py)
+LEARNED = LearnedBoilerplate("digwatch")
 MIN_WORDS = 12
 TOKEN_RE = re.compile(r"[A-Za-zÀ-ž0-9]+")
 
+DROP_XPATH = etree.XPath("//script | //style | //iframe | //noscript")
+BLOCKS_XPATH = etree.XPath(
+    "//h2 | //h3 | //p | //ul | //ol | //blockquote | //table"
+)  # redosled dokumenta, kao find_all
+ALL_P_XPATH = etree.XPath("//p")
+TH_XPATH = etree.XPath(".//th")
+TR_XPATH = etree.XPath(".//tr")
+CELLS_XPATH = etree.XPath(".//td | .//th")
+LI_XPATH = etree.XPath("./li")
+
 
 def words_count(txt: str) -> int:
     return len(TOKEN_RE.findall(txt or ""))
@@ -54,16 +73,16 @@ def is_blacklisted(txt: str) -> bool:
 
 def table_to_lines(tbl) -> list[str]:
     lines, headers = [], []
-    for th in tbl.find_all("th"):
-        hdr = clean_text(th.get_text(" ", strip=True))
+    for th in TH_XPATH(tbl):
+        hdr = clean_text(get_text(th))
         if hdr:
             headers.append(hdr)
     if headers:
         lines.append(" | ".join(headers))
-    for tr in tbl.find_all("tr"):
+    for tr in TR_XPATH(tbl):
         cells = []
-        for cell in tr.find_all(["td", "th"]):
-            val = clean_text(cell.get_text(" ", strip=True))
+        for cell in CELLS_XPATH(tr):
+            val = clean_text(get_text(cell))
             if val:
                 cells.append(val)
         if cells:
@@ -73,28 +92,30 @@ def table_to_lines(tbl) -> list[str]:
 
 def list_to_paragraph(ul_or_ol) -> str:
     items = []
-    for li in ul_or_ol.find_all("li", recursive=False):
-        t = clean_text(li.get_text(" ", strip=True))
+    for li in LI_XPATH(ul_or_ol):
+        t = clean_text(get_text(li))
         if t:
             items.append(f"• {t}")
     return " ".join(items) if items else ""
 
 
 def extract_chunks_from_html(html_in: str):
-    soup = BeautifulSoup(html_in or "", "lxml")
-    for tag in soup(["script", "style", "iframe", "noscript"]):
-        tag.decompose()
+    doc = parse_html(html_in)
+    if doc is None:
+        return []
+    for tag in DROP_XPATH(doc):
+        tag.drop_tree()  # tail tekst ostaje, kao kod decompose()
     chunks, h2, h3 = [], None, None
-    for el in soup.find_all(["h2", "h3", "p", "ul", "ol", "blockquote", "table"]):
-        name = el.name.lower()
+    for el in BLOCKS_XPATH(doc):
+        name = el.tag
         if name == "h2":
-            h2, h3 = clean_text(el.get_text(" ", strip=True)), None
+            h2, h3 = clean_text(get_text(el)), None
             continue
         if name == "h3":
-            h3 = clean_text(el.get_text(" ", strip=True))
+            h3 = clean_text(get_text(el))
             continue
         if name == "p":
-            text = clean_text(el.get_text(" ", strip=True))
+            text = clean_text(get_text(el))
             if text:
                 chunks.append(
                     {
@@ -105,7 +126,7 @@ def extract_chunks_from_html(html_in: str):
                 )
             continue
         if name == "blockquote":
-            text = clean_text(el.get_text(" ", strip=True))
+            text = clean_text(get_text(el))
             if text:
                 chunks.append(
                     {
@@ -139,8 +160,8 @@ def extract_chunks_from_html(html_in: str):
                     )
             continue
     if not chunks:
-        for p in soup.find_all("p"):
-            text = clean_text(p.get_text(" ", strip=True))
+        for p in ALL_P_XPATH(doc):
+            text = clean_text(get_text(p))
             if text:
                 chunks.append(
                     {
@@ -177,18 +198,13 @@ def newer(a: str | None, b: str | None) -> str | None:
 
 
 def main():
-    assert RAW.exists(), f"Nema ulaza: {RAW}"
-    cat_map, tag_map = {}, {}
-    if TAX.exists():
-        tax = json.loads(TAX.read_text(encoding="utf-8"))
-        cat_map = tax.get("categories") or {}
-        tag_map = tax.get("tags") or {}
-
-    posts = json.loads(RAW.read_text(encoding="utf-8"))
+    assert RAW.exists() or LEGACY_JSON.exists(), f"Nema ulaza: {RAW}"
+    # ID-jevi kojih nema u taxonomy_map.json dohvataju se na zahtev (include=)
+    taxonomy = TaxonomyCache()
 
     wrote, skipped_paras = 0, 0
     with OUT.open("w", encoding="utf-8") as f:
-        for p in posts:
+        for p in iter_raw_updates(RAW):
             title = clean_text(((p.get("title") or {}).get("rendered")) or "")
             url = (p.get("link") or "").strip().rstrip("/")
             date = (p.get("date") or "").strip()
@@ -197,8 +213,8 @@ def main():
 
             cat_ids = p.get("categories") or []
             tag_ids = p.get("tags") or []
-            cat_names = [cat_map.get(cid) for cid in cat_ids if cat_map.get(cid)]
-            tag_names = [tag_map.get(tid) for tid in tag_ids if tag_map.get(tid)]
+            cat_names = taxonomy.names("categories", cat_ids)
+            tag_names = taxonomy.names("tags", tag_ids)
 
             effective_date = newer(modified, date) or date or modified or ""
             quarter = to_quarter(effective_date or date)
@@ -220,7 +236,11 @@ def main():
 
             for ch in extract_chunks_from_html(html_body):
                 text = ch.get("paragraph_text") or ""
-                if is_blacklisted(text) or words_count(text) < MIN_WORDS:
+                if (
+                    is_blacklisted(text)
+                    or text in LEARNED
+                    or words_count(text) < MIN_WORDS
+                ):
                     skipped_paras += 1
                     continue
 
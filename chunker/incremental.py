@@ -0,0 +1,100 @@
+import hashlib
+import json
+from pathlib import Path
+
+
+def load_previous_chunks(path, key="url"):
+    """
+    Učitava prethodni chunk izlaz (JSONL) grupisan po članku (podrazumevano url).
+    Koristi se da se članci čiji se fingerprint nije promenio (i oni koje
+    crawler označi kao "not_modified", HTTP 304) ne chunkuju ponovo – njihovi
+    stari chunkovi se samo prepišu u novi izlaz.
+    Mora se pozvati PRE nego što se izlazni fajl otvori sa "w".
+    """
+    previous = {}
+    path = Path(path)
+    if not path.exists():
+        return previous
+
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                obj = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            previous.setdefault(obj.get(key) or "", []).append(line)
+
+    previous.pop("", None)
+    return previous
+
+
+def carry_over(previous, article_key, fout) -> int:
+    """Prepisuje stare chunkove članka u fout; vraća broj prepisanih linija."""
+    lines = previous.get(article_key) or []
+    for line in lines:
+        fout.write(line + "\n")
+    return len(lines)
+
+
+def chunker_version(*scripts) -> str:
+    """
+    Hash koda chunkera (skripta + ovaj modul), kao code_version() u
+    crawler/http_cache.py: posle izmene chunkovanja (MAX_CHARS, pravila
+    podele, polja zapisa...) stari chunkovi se više ne prepisuju.
+    """
+    h = hashlib.sha256()
+    for path in [*scripts, __file__]:
+        h.update(Path(path).read_bytes())
+    return h.hexdigest()[:16]
+
+
+def fingerprints_path(output_path) -> Path:
+    """Sidecar uz chunk izlaz: foo.jsonl → foo.fingerprints.json."""
+    output_path = Path(output_path)
+    return output_path.with_name(output_path.stem + ".fingerprints.json")
+
+
+def load_fingerprints(output_path, version):
+    """
+    {url: fingerprint} članaka chunkovanih u poslednjem USPEŠNOM prolazu.
+    Ako je taj prolaz radila druga verzija chunkera (chunker_version()) ili
+    sidecar nema verziju, vraća {} – svi članci se chunkuju ponovo.
+    """
+    path = fingerprints_path(output_path)
+    if not path.exists():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(data, dict) or data.get("version") != version:
+        return {}
+    return data.get("fingerprints") or {}
+
+
+def save_fingerprints(output_path, fingerprints, version):
+    """Upisuje se tek na kraju prolaza, pa prekinut prolaz ne menja stanje."""
+    path = fingerprints_path(output_path)
+    tmp = path.with_name(path.name + ".tmp")
+    data = {"version": version, "fingerprints": fingerprints}
+    tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(path)
+
+
+def is_unchanged(item, article_key, previous, fingerprints) -> bool:
+    """
+    True ako stari chunkovi članka mogu da se prepišu umesto ponovnog
+    chunkovanja: fingerprint sadržaja (računat pri fetch-u, i za 304 iz
+    keširanog zapisa) je isti kao u poslednjem uspešnom prolazu iste verzije
+    chunkera (fingerprints iz load_fingerprints()).
+    "not_modified" sam nije dovoljan: fingerprint nosi i trag naučenog
+    boilerplate-a (LearnedBoilerplate.stamp), pa posle relearn-a i članak
+    dobijen sa 304 mora ponovo da se chunkuje ako mu se taj trag promenio.
+    """
+    if article_key not in previous:
+        return False
+    fp = item.get("fingerprint")
+    return bool(fp) and fingerprints.get(article_key) == fp
@@ -2,6 +2,15 @@ import json
 import re
 from datetime import datetime
 
+from incremental import (
+    carry_over,
+    chunker_version,
+    is_unchanged,
+    load_fingerprints,
+    load_previous_chunks,
+    save_fingerprints,
+)
+
 INPUT_FILE = "un_ode_news_clean.jsonl"
 OUTPUT_FILE = "un_ode_news_chunks.jsonl"
 
@@ -113,6 +122,14 @@ def smart_chunk(text):
 def main():
     print("🔧 Generating UN ODET chunks...")
 
+    # članci koje je crawler dobio kao 304 Not Modified ili sa nepromenjenim
+    # fingerprint-om se ne chunkuju ponovo, dok se kod chunkera ne promeni
+    previous = load_previous_chunks(OUTPUT_FILE)
+    version = chunker_version(__file__)
+    fingerprints = load_fingerprints(OUTPUT_FILE, version)
+    seen_fingerprints = {}
+    reused = 0
+
     with open(INPUT_FILE, "r", encoding="utf-8") as f_in, open(
         OUTPUT_FILE, "w", encoding="utf-8"
     ) as f_out:
@@ -122,6 +139,15 @@ def main():
             title = item["title"]
             text = item["text"]
             url = item["url"]
+            fingerprint = item.get("fingerprint")
+            if fingerprint:
+                seen_fingerprints[url] = fingerprint
+
+            if is_unchanged(item, url, previous, fingerprints):
+                carry_over(previous, url, f_out)
+                reused += 1
+                continue
+
             date_iso = item["date"]
             date_full = f"{date_iso}T00:00:00Z"
 
@@ -145,10 +171,14 @@ def main():
                     "categories": categories,
                     "tags": tags,
                     "text": chunk_text,
+                    "fingerprint": fingerprint,
                 }
                 f_out.write(json.dumps(out, ensure_ascii=False) + "\n")
 
+    save_fingerprints(OUTPUT_FILE, seen_fingerprints, version)
+
     print(f"\nSaved chunks → {OUTPUT_FILE}")
+    print(f"Unchanged articles (304/fingerprint, chunks reused): {reused}")
     print("Chunking complete!")
 
 
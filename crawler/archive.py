@@ -0,0 +1,232 @@
+"""
+Compressed, content-addressed archive of raw HTTP responses.
+
+Every fetched body is stored once (keyed by its sha256) as a zlib-compressed
+blob appended to the current segment file; segments roll over at
+SEGMENT_BYTES. A small SQLite index maps digest → (segment, offset, length)
+and url → latest response (status, headers, digest).
+
+With replay=True the crawl engine serves fetches from here instead of the
+network, so an extractor change can be re-run over the whole corpus offline
+and benchmarks see exactly the same bytes every time.
+
+responses.complete tells how much of the page a row holds:
+    1     the complete body
+    0     a body the streaming read (crawler/streaming.py) cut off at the
+          article end; lookup() returns it only with truncated=True (replay /
+          re-extraction of a streaming source, whose extractor never reads
+          past that point anyway)
+    NULL  rows written before the column existed (EU DS / ITU rows among
+          them may be cut off as well)
+
+Several crawler processes (--worker mode) may record into one archive: each
+record() holds SQLite's write lock on the index (BEGIN IMMEDIATE) while it
+appends, so a blob's offset is taken at the real end of the segment and is
+never shared by two blobs.
+
+Layout (data/raw/archive/):
+    index.sqlite
+    segment-00001.bin
+    segment-00002.bin
+    ...
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_DIR = ROOT / "data" / "raw" / "archive"
+
+SEGMENT_BYTES = 256 * 1024 * 1024
+WRITE_TIMEOUT = 120  # seconds to wait for another process's write lock
+
+# only these headers are needed for replay (encoding, validators)
+KEEP_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Content-Language")
+
+
+class ArchivedResponse:
+    """Minimal stand-in for requests.Response when replaying from the archive."""
+
+    def __init__(self, url, status_code, headers, content, truncated=False):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self.truncated = truncated
+
+    @property
+    def text(self):
+        encoding = get_encoding_from_headers(self.headers) or "utf-8"
+        return self.content.decode(encoding, errors="replace")
+
+
+class ResponseArchive:
+    def __init__(self, path=DEFAULT_DIR, segment_bytes=SEGMENT_BYTES):
+        self.dir = Path(path)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self._lock = threading.Lock()
+
+        self.conn = sqlite3.connect(
+            str(self.dir / "index.sqlite"),
+            timeout=WRITE_TIMEOUT,
+            check_same_thread=False,
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS blobs (
+                digest  TEXT PRIMARY KEY,
+                segment INTEGER,
+                offset  INTEGER,
+                length  INTEGER,
+                size    INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS responses (
+                url        TEXT PRIMARY KEY,
+                status     INTEGER,
+                headers    TEXT,
+                digest     TEXT,
+                fetched_at TEXT,
+                complete   INTEGER
+            );
+            """
+        )
+        columns = {r[1] for r in self.conn.execute("PRAGMA table_info(responses)")}
+        if "complete" not in columns:
+            self.conn.execute("ALTER TABLE responses ADD COLUMN complete INTEGER")
+        self.conn.commit()
+        self._segment = self._current_segment()
+
+    def _segment_path(self, n):
+        return self.dir / f"segment-{n:05d}.bin"
+
+    def _current_segment(self):
+        row = self.conn.execute("SELECT MAX(segment) FROM blobs").fetchone()
+        return row[0] or 1
+
+    @contextmanager
+    def _writing(self):
+        """
+        Exclusive write transaction across threads and processes: BEGIN
+        IMMEDIATE blocks until no other writer holds the index. The current
+        segment is re-read inside it (another writer may have rolled over).
+        """
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._segment = self._current_segment()
+                yield
+            except BaseException:
+                # an already appended blob stays as unindexed (dead) bytes
+                self.conn.rollback()
+                raise
+            self.conn.commit()
+
+    def _append_blob(self, data: bytes):
+        """Appends at the end of the current segment; call inside _writing()."""
+        path = self._segment_path(self._segment)
+        if path.exists() and path.stat().st_size >= self.segment_bytes:
+            self._segment += 1
+            path = self._segment_path(self._segment)
+        with path.open("ab") as f:
+            f.seek(0, os.SEEK_END)
+            offset = f.tell()
+            f.write(data)
+        return self._segment, offset
+
+    def record(self, url, status, headers, body: bytes, complete=True) -> str:
+        """
+        Stores a response body (deduplicated by sha256) and indexes url.
+        complete=False marks a body the streaming read cut off at the article
+        end.
+        """
+        digest = hashlib.sha256(body).hexdigest()
+        headers = {k: headers[k] for k in KEEP_HEADERS if k in headers}
+        compressed = zlib.compress(body, 6)
+
+        with self._writing():
+            known = self.conn.execute(
+                "SELECT 1 FROM blobs WHERE digest = ?", (digest,)
+            ).fetchone()
+            if not known:
+                segment, offset = self._append_blob(compressed)
+                self.conn.execute(
+                    "INSERT INTO blobs VALUES (?, ?, ?, ?, ?)",
+                    (digest, segment, offset, len(compressed), len(body)),
+                )
+            self.conn.execute(
+                """
+                INSERT INTO responses
+                    (url, status, headers, digest, fetched_at, complete)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    status = excluded.status,
+                    headers = excluded.headers,
+                    digest = excluded.digest,
+                    fetched_at = excluded.fetched_at,
+                    complete = excluded.complete
+                """,
+                (
+                    url,
+                    status,
+                    json.dumps(headers),
+                    digest,
+                    datetime.now(timezone.utc).isoformat(),
+                    int(complete),
+                ),
+            )
+        return digest
+
+    def read_blob(self, digest) -> bytes:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT segment, offset, length FROM blobs WHERE digest = ?",
+                (digest,),
+            ).fetchone()
+        if not row:
+            return None
+        segment, offset, length = row
+        with self._segment_path(segment).open("rb") as f:
+            f.seek(offset)
+            return zlib.decompress(f.read(length))
+
+    def lookup(self, url, truncated=False):
+        """
+        Latest archived response for url as ArchivedResponse, or None.
+        truncated=True: a body cut off at the article end is returned too
+        (ArchivedResponse.truncated is then True); otherwise it counts as
+        not archived.
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT status, headers, digest, complete FROM responses "
+                "WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if not row or (row[3] == 0 and not truncated):
+            return None
+        body = self.read_blob(row[2])
+        if body is None:
+            return None
+        return ArchivedResponse(
+            url, row[0], json.loads(row[1]), body, truncated=row[3] == 0
+        )
+
+    def urls(self):
+        with self._lock:
+            return [r[0] for r in self.conn.execute("SELECT url FROM responses")]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,287 @@
+"""
+Per-page parse time of the lxml extractors (crawler/extract.py) against the
+BeautifulSoup versions they replaced, plus an output comparison.
+
+    python crawler/bench_extract.py
+    python crawler/bench_extract.py --limit 300 --repeat 5
+    python crawler/bench_extract.py --only ietf --html page1.html page2.html
+
+Pages come from the response archive (data/raw/archive, by host) for the
+article extractors and from post content in the DigWatch raw store for
+strip_html / chunk_updates_v1; --html adds local files to every extractor.
+Each page is run `repeat` times per implementation and the fastest run
+counts. A non-zero "diff" column means the lxml extractor produced different
+output for that many pages (the first differing page is printed).
+
+The reference functions below are the pre-lxml implementations, kept
+verbatim so the comparison stays meaningful.
+"""
+
+import argparse
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup, NavigableString
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+sys.path.append(str(ROOT / "chunker"))
+
+import chunk_updates_v1 as updates  # noqa: E402
+from crawler import ietf_collect_articles_full as ietf  # noqa: E402
+from crawler.archive import ResponseArchive  # noqa: E402
+from crawler.extract import html_to_text, parse_html  # noqa: E402
+from crawler.raw_store import iter_raw_updates  # noqa: E402
+from scripts.itu import itu_news_full_crawling_state_najnovnije as itu  # noqa: E402
+from scripts.un import un_ode_news_crawl_full as un  # noqa: E402
+
+# ---- reference implementations (BeautifulSoup) ----
+
+
+def ietf_bs(html):
+    soup = BeautifulSoup(html, "html.parser")
+    main = soup.find("main")
+    if not main:
+        return {"title": None, "date": None, "html_content": "", "text_content": ""}
+    h1 = main.find("h1")
+    if not h1:
+        return {"title": None, "date": None, "html_content": "", "text_content": ""}
+    title = h1.get_text(strip=True)
+    after_nodes = [n for n in h1.next_siblings if not isinstance(n, NavigableString)]
+    date = None
+    for node in after_nodes:
+        if node.name == "p":
+            txt = node.get_text(strip=True)
+            if any(m in txt for m in ietf.MONTHS):
+                date = txt
+                break
+    clean_nodes = []
+    for node in after_nodes:
+        if node.name not in ietf.ALLOWED_TAGS:
+            continue
+        if node.find("i", class_="bi-twitter") or node.find("i", class_="bi-linkedin"):
+            continue
+        clean_nodes.append(node)
+    html_content = "".join(str(x) for x in clean_nodes)
+    paragraphs = [ietf.clean_text(x.get_text(" ", strip=True)) for x in clean_nodes]
+    paragraphs = ietf.dedupe_paragraphs(paragraphs)
+    return {
+        "title": title,
+        "date": date,
+        "html_content": html_content,
+        "text_content": "\n".join(paragraphs),
+    }
+
+
+def un_bs(html):
+    soup = BeautifulSoup(html, "html.parser")
+    body = soup.select_one(".field--name-body")
+    if body:
+        return "\n\n".join(p.get_text(" ", strip=True) for p in body.find_all("p"))
+    main_tag = soup.find("main")
+    if main_tag:
+        paragraphs = [p.get_text(" ", strip=True) for p in main_tag.find_all("p")]
+        if paragraphs:
+            return "\n\n".join(paragraphs)
+    all_p = soup.find_all("p")
+    if all_p:
+        return "\n\n".join(p.get_text(" ", strip=True) for p in all_p)
+    return ""
+
+
+def itu_bs(html):
+    soup = BeautifulSoup(html, "html.parser")
+    main = soup.find("main")
+    if not main:
+        return ""
+    lines = []
+    seen = set()
+    for tag in main.find_all(["p", "h2", "h3", "li"]):
+        txt = tag.get_text(" ", strip=True)
+        if not txt:
+            continue
+        if any(txt.startswith(stop) for stop in itu.STOP_PHRASES):
+            break
+        if txt in itu.SKIP_LINES:
+            continue
+        txt = itu.clean_spaces(txt)
+        if txt in seen:
+            continue
+        seen.add(txt)
+        if tag.name in ("h2", "h3"):
+            lines.append(txt)
+        elif tag.name == "li":
+            lines.append(f"- {txt}")
+        else:
+            lines.append(txt)
+    return itu.global_clean("\n\n".join(lines))
+
+
+def strip_html_bs(html):
+    return BeautifulSoup(html, "html.parser").get_text(" ", strip=True)
+
+
+def _bs_table_lines(tbl):
+    lines, headers = [], []
+    for th in tbl.find_all("th"):
+        hdr = updates.clean_text(th.get_text(" ", strip=True))
+        if hdr:
+            headers.append(hdr)
+    if headers:
+        lines.append(" | ".join(headers))
+    for tr in tbl.find_all("tr"):
+        cells = []
+        for cell in tr.find_all(["td", "th"]):
+            val = updates.clean_text(cell.get_text(" ", strip=True))
+            if val:
+                cells.append(val)
+        if cells:
+            lines.append(" | ".join(cells))
+    return [ln for ln in lines if ln]
+
+
+def _bs_list(ul_or_ol):
+    items = []
+    for li in ul_or_ol.find_all("li", recursive=False):
+        t = updates.clean_text(li.get_text(" ", strip=True))
+        if t:
+            items.append(f"• {t}")
+    return " ".join(items) if items else ""
+
+
+def updates_bs(html_in):
+    soup = BeautifulSoup(html_in or "", "lxml")
+    for tag in soup(["script", "style", "iframe", "noscript"]):
+        tag.decompose()
+    chunks, h2, h3 = [], None, None
+
+    def add(text, h2, h3):
+        if text:
+            chunks.append(
+                {"section_title": h2, "subsection_title": h3, "paragraph_text": text}
+            )
+
+    for el in soup.find_all(["h2", "h3", "p", "ul", "ol", "blockquote", "table"]):
+        name = el.name.lower()
+        if name == "h2":
+            h2, h3 = updates.clean_text(el.get_text(" ", strip=True)), None
+        elif name == "h3":
+            h3 = updates.clean_text(el.get_text(" ", strip=True))
+        elif name in ("p", "blockquote"):
+            add(updates.clean_text(el.get_text(" ", strip=True)), h2, h3)
+        elif name in ("ul", "ol"):
+            add(updates.clean_text(_bs_list(el)), h2, h3)
+        elif name == "table":
+            for ln in _bs_table_lines(el):
+                add(updates.clean_text(ln), h2, h3)
+    if not chunks:
+        for p in soup.find_all("p"):
+            add(updates.clean_text(p.get_text(" ", strip=True)), None, None)
+    return chunks
+
+
+# ---- extractor pairs: name → (host in the archive or None, before, after) ----
+
+EXTRACTORS = {
+    "ietf": ("www.ietf.org", ietf_bs, ietf.extract_article),
+    "un": ("www.un.org", un_bs, lambda h: un.extract_text(parse_html(h))),
+    "itu": ("www.itu.int", itu_bs, lambda h: itu.extract_content(parse_html(h))),
+    "digwatch_strip_html": (None, strip_html_bs, html_to_text),
+    "chunk_updates_v1": (None, updates_bs, updates.extract_chunks_from_html),
+}
+
+HOST_RE = re.compile(r"^https?://([^/]+)")
+
+
+def archived_pages(host, limit):
+    archive = ResponseArchive()
+    pages = []
+    try:
+        for url in archive.urls():
+            m = HOST_RE.match(url)
+            if not m or m.group(1).lower() != host:
+                continue
+            resp = archive.lookup(url)
+            if resp is None or resp.status_code != 200:
+                continue
+            pages.append((url, resp.text))
+            if limit and len(pages) >= limit:
+                break
+    finally:
+        archive.close()
+    return pages
+
+
+def post_contents(limit):
+    pages = []
+    for post in iter_raw_updates():
+        content = (post.get("content") or {}).get("rendered") or ""
+        if content:
+            pages.append((post.get("link") or str(post.get("id")), content))
+            if limit and len(pages) >= limit:
+                break
+    return pages
+
+
+def best_time(fn, html, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(html)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def bench(name, pages, before, after, repeat):
+    t_before, t_after, diffs = [], [], 0
+    for label, html in pages:
+        tb, rb = best_time(before, html, repeat)
+        ta, ra = best_time(after, html, repeat)
+        t_before.append(tb)
+        t_after.append(ta)
+        if rb != ra:
+            diffs += 1
+            if diffs == 1:
+                print(f"  ≠ {name}: {label}\n    before: {str(rb)[:300]!r}\n"
+                      f"    after:  {str(ra)[:300]!r}")
+    return t_before, t_after, diffs
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--only", choices=sorted(EXTRACTORS), action="append")
+    parser.add_argument("--limit", type=int, default=200, help="stranica po ekstraktoru")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--html", type=Path, nargs="*", default=[])
+    args = parser.parse_args()
+
+    local = [(str(p), p.read_text(encoding="utf-8")) for p in args.html]
+
+    print(f"{'extractor':<22}{'pages':>7}{'bs4 ms':>10}{'lxml ms':>10}"
+          f"{'p50 bs4':>10}{'p50 lxml':>10}{'speedup':>9}{'diff':>6}")
+    for name in args.only or EXTRACTORS:
+        host, before, after = EXTRACTORS[name]
+        pages = archived_pages(host, args.limit) if host else post_contents(args.limit)
+        pages += local
+        if not pages:
+            print(f"{name:<22}{0:>7}   (nema stranica)")
+            continue
+
+        t_before, t_after, diffs = bench(name, pages, before, after, args.repeat)
+        mean_b = statistics.mean(t_before) * 1000
+        mean_a = statistics.mean(t_after) * 1000
+        print(
+            f"{name:<22}{len(pages):>7}{mean_b:>10.2f}{mean_a:>10.2f}"
+            f"{statistics.median(t_before) * 1000:>10.2f}"
+            f"{statistics.median(t_after) * 1000:>10.2f}"
+            f"{mean_b / mean_a if mean_a else 0:>8.1f}x{diffs:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Compiled per-source boilerplate filters.
+
+The extractors used to test every line against their rule lists one rule at
+a time (any(skip in txt for skip in SKIP_LINES), any(txt.startswith(stop)
+...)) and global_clean() ran one re.sub per GLOBAL_REMOVE_PATTERNS entry.
+A BoilerplateFilter is built once per source from the same lists:
+
+  - phrase rules (contained in the line / line prefix) are merged into a
+    trie and emitted as one regex (phrase_regex). The regex engine walks the
+    trie at each position, so a check costs O(len(line) * longest phrase)
+    however many phrases there are
+  - whole-line rules are a frozenset lookup
+  - the remove patterns are joined into one alternation, applied with sub()
+    until nothing matches (usually one pass, a second when a removal exposes
+    another rule), followed by the blank-line collapse and strip every
+    global_clean() did
+
+    EU_FILTER = BoilerplateFilter(
+        skip_contains=SKIP_LINES,
+        stop_prefixes=STOP_PHRASES,
+        remove_patterns=GLOBAL_REMOVE_PATTERNS,
+        flags=re.DOTALL,
+    )
+    if EU_FILTER.stops(txt): break
+    if EU_FILTER.skips(txt): continue
+    text = EU_FILTER.clean(text)
+
+The hand-written lists miss new footer / navigation lines. LearnedBoilerplate
+is the per-source table learned from the corpus (crawler/learn_boilerplate.py):
+normalized lines that occur on many pages of a source. It is applied after the
+corpus it is learned from (UN cleaning, chunkers), never inside the crawlers,
+so a relearn always sees every line.
+"""
+
+import hashlib
+import json
+import re
+from collections import Counter
+from pathlib import Path
+
+from crawler.fingerprint import normalize_text
+
+ROOT = Path(__file__).resolve().parents[1]
+LEARNED_DIR = ROOT / "data" / "processed" / "boilerplate"
+
+# linija je boilerplate ako se javlja na >= MIN_PAGES strana I >= MIN_SHARE izvora
+MIN_PAGES = 10
+MIN_SHARE = 0.03
+
+BLANK_LINES_RE = re.compile(r"\n\s*\n\s*\n+")
+BULLET_RE = re.compile(r"^[-–•·*]+\s*")
+
+_END = ""  # trie key marking the end of a phrase
+
+
+def _trie(phrases):
+    root = {}
+    for phrase in phrases:
+        node = root
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[_END] = {}
+    return root
+
+
+def _emit(node) -> str:
+    # the filters only ask whether *some* phrase matches, so a phrase that
+    # ends here makes every longer phrase through this node redundant
+    if _END in node:
+        return ""
+    branches = [re.escape(ch) + _emit(child) for ch, child in sorted(node.items())]
+    if len(branches) == 1:
+        return branches[0]
+    return "(?:" + "|".join(branches) + ")"
+
+
+def phrase_regex(phrases, flags=0):
+    """
+    One compiled regex matching any of the literal `phrases`; .search() is
+    "contains any", .match() is "starts with any". None for no phrases.
+    """
+    phrases = list(phrases)
+    if not phrases:
+        return None
+    return re.compile(_emit(_trie(phrases)), flags)
+
+
+def combined_regex(patterns, flags=0):
+    """All `patterns` as one alternation (leftmost match wins); None if empty."""
+    patterns = list(patterns)
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{p})" for p in patterns), flags)
+
+
+class BoilerplateFilter:
+    def __init__(
+        self,
+        skip_contains=(),
+        skip_lines=(),
+        skip_prefixes=(),
+        stop_prefixes=(),
+        remove_patterns=(),
+        flags=0,
+        ignore_case=False,
+    ):
+        """
+        skip_contains    – a line containing any of these is dropped
+        skip_lines       – a line equal to one of these is dropped
+        skip_prefixes    – a line starting with one of these is dropped
+        stop_prefixes    – a line starting with one of these ends the article
+        remove_patterns  – regexes removed from the assembled text (clean())
+        flags            – re flags for remove_patterns
+        ignore_case      – phrase rules compare lowercased (str.lower())
+        """
+        self.ignore_case = ignore_case
+        norm = str.lower if ignore_case else str
+        self._contains = phrase_regex(map(norm, skip_contains))
+        self._prefixes = phrase_regex(map(norm, skip_prefixes))
+        self._stop = phrase_regex(map(norm, stop_prefixes))
+        self._lines = frozenset(map(norm, skip_lines))
+        self._remove = combined_regex(remove_patterns, flags)
+
+    def _key(self, line):
+        return line.lower() if self.ignore_case else line
+
+    def stops(self, line) -> bool:
+        return self._stop is not None and self._stop.match(self._key(line)) is not None
+
+    def skips(self, line) -> bool:
+        key = self._key(line)
+        return (
+            key in self._lines
+            or (self._prefixes is not None and self._prefixes.match(key) is not None)
+            or (self._contains is not None and self._contains.search(key) is not None)
+        )
+
+    def clean(self, text) -> str:
+        if not text:
+            return ""
+        if self._remove is not None:
+            # a removal can expose another match ("- News Share on Email" →
+            # "- News "), which the old one-pattern-at-a-time passes caught
+            # when the exposed pattern came later in the list
+            text, n = self._remove.subn("", text)
+            while n:
+                text, n = self._remove.subn("", text)
+        return BLANK_LINES_RE.sub("\n\n", text).strip()
+
+
+# ---- learned (cross-page) boilerplate ----
+
+
+def normalize_line(line) -> str:
+    """Key of a line in the learned table: normalized, casefolded, no bullet."""
+    return BULLET_RE.sub("", normalize_text(line).casefold())
+
+
+def learn_lines(pages, min_pages=MIN_PAGES, min_share=MIN_SHARE):
+    """
+    pages: iterable of line lists, one per page. Returns (page count,
+    {normalized line: number of pages}) for the lines that occur on at least
+    `min_pages` pages and at least `min_share` of all pages.
+    """
+    df = Counter()
+    n = 0
+    for lines in pages:
+        n += 1
+        df.update({key for key in map(normalize_line, lines) if key})
+    threshold = max(min_pages, min_share * n)
+    return n, {line: c for line, c in df.most_common() if c >= threshold}
+
+
+def learned_path(source) -> Path:
+    return LEARNED_DIR / f"{source}.json"
+
+
+class LearnedBoilerplate:
+    def __init__(self, source, path=None):
+        self.source = source
+        self.path = Path(path or learned_path(source))
+        self.lines = frozenset()
+        if self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            self.lines = frozenset(data.get("lines") or ())
+
+    def __len__(self):
+        return len(self.lines)
+
+    def __contains__(self, line):
+        return normalize_line(line) in self.lines
+
+    @staticmethod
+    def save(source, pages, lines, min_pages, min_share, path=None):
+        path = Path(path or learned_path(source))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "source": source,
+            "pages": pages,
+            "min_pages": min_pages,
+            "min_share": min_share,
+            "lines": lines,
+        }
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding="utf-8")
+        tmp.replace(path)
+        return path
+
+    def strip(self, text, sep="\n"):
+        """(text without learned lines, keys of the dropped lines)."""
+        if not self.lines or not text:
+            return text, []
+        kept, dropped = [], []
+        for line in text.split(sep):
+            key = normalize_line(line)
+            if key and key in self.lines:
+                dropped.append(key)
+            else:
+                kept.append(line)
+        return sep.join(kept), dropped
+
+    @staticmethod
+    def stamp(fingerprint, dropped):
+        """
+        Article fingerprint as seen by the chunkers / ingest: unchanged when no
+        learned line was dropped, otherwise extended with a hash of the dropped
+        lines. A relearned table thus re-chunks (and re-embeds) only the
+        articles whose dropped lines actually changed.
+        """
+        if not fingerprint or not dropped:
+            return fingerprint
+        joined = "\n".join(sorted(set(dropped)))
+        return f"{fingerprint}-{hashlib.sha256(joined.encode('utf-8')).hexdigest()[:8]}"
@@ -0,0 +1,129 @@
+"""
+Bounded pool of reusable headless Chrome workers for JS-rendered pages.
+
+Drivers are started lazily (up to `size`) and handed out through a blocking
+queue, so any number of crawl-engine threads can call render() concurrently
+while at most `size` browsers run at once. Instead of fixed sleeps, render()
+waits explicitly until document.readyState == "complete" and, optionally,
+until a CSS selector is present in the DOM.
+
+selenium is imported only when the first browser is started, so crawlers
+that never hit the fallback path do not need Chrome installed.
+"""
+
+import os
+import queue
+import threading
+
+DEFAULT_SIZE = max(1, min(4, os.cpu_count() or 1))
+
+
+def make_chrome():
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    opts = Options()
+    opts.add_argument("--headless=new")
+    opts.add_argument("--disable-gpu")
+    opts.add_argument("--no-sandbox")
+    opts.add_argument("--log-level=3")
+    return webdriver.Chrome(options=opts)
+
+
+class BrowserPool:
+    def __init__(self, size=DEFAULT_SIZE, make_driver=make_chrome, page_timeout=30):
+        self.size = size
+        self.make_driver = make_driver
+        self.page_timeout = page_timeout
+
+        self._idle = queue.Queue()
+        self._started = 0
+        self._all = []
+        self._lock = threading.Lock()
+        self.rendered = 0
+
+    def _acquire(self):
+        """
+        An idle driver, or a new one while fewer than `size` slots are taken.
+        A None in the idle queue is a slot freed by a broken driver: whoever
+        takes it starts the replacement (threads blocked in get() wake up).
+        """
+        try:
+            driver = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                free = self._started < self.size
+                if free:
+                    self._started += 1
+            driver = None if free else self._idle.get()
+
+        if driver is not None:
+            return driver
+
+        try:
+            driver = self.make_driver()
+            driver.set_page_load_timeout(self.page_timeout)
+        except Exception:
+            self._idle.put(None)  # the slot stays free for the next caller
+            raise
+        with self._lock:
+            self._all.append(driver)
+        return driver
+
+    def _release(self, driver, broken=False):
+        if not broken:
+            self._idle.put(driver)
+            return
+
+        with self._lock:
+            if driver in self._all:
+                self._all.remove(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        self._idle.put(None)
+
+    def render(self, url, wait_css=None, timeout=None):
+        """Loads url in a pooled browser and returns the rendered page_source."""
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        timeout = timeout or self.page_timeout
+        driver = self._acquire()
+        # any failure (WebDriverException, urllib3 / socket errors, the wait
+        # callback) may leave the browser in an unknown state: replace it
+        broken = True
+        try:
+            driver.get(url)
+            wait = WebDriverWait(driver, timeout)
+            wait.until(
+                lambda d: d.execute_script("return document.readyState") == "complete"
+            )
+            if wait_css:
+                try:
+                    wait.until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, wait_css))
+                    )
+                except TimeoutException:
+                    pass  # selector never showed up: return what the page has
+            html = driver.page_source
+            broken = False
+        finally:
+            self._release(driver, broken=broken)
+
+        with self._lock:
+            self.rendered += 1
+        return html
+
+    def close(self):
+        with self._lock:
+            drivers, self._all = self._all, []
+            self._started = 0
+        for d in drivers:
+            try:
+                d.quit()
+            except Exception:
+                pass
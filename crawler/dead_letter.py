@@ -0,0 +1,69 @@
+"""
+Dead-letter file for URLs the crawl engine gave up on.
+
+When a fetch fails permanently (non-retryable status) or runs out of retry
+attempts, the engine appends one JSON line here instead of blocking the crawl
+on it or dropping it silently:
+
+    {"url": ..., "error": "HTTP 503", "attempts": 6, "failed_at": ..., "item": {...}}
+
+`item` is the adapter's original input item, so a later run can re-drive the
+failures through the same extract / on_result path:
+
+    dlq = DeadLetterQueue("ietf")
+    engine.crawl(dlq.take(), extract, on_result)   # failures are re-added
+
+Layout: data/raw/dead_letter/<source>.jsonl
+"""
+
+import json
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_DIR = ROOT / "data" / "raw" / "dead_letter"
+
+
+class DeadLetterQueue:
+    def __init__(self, source, path=DEFAULT_DIR):
+        self.path = Path(path) / f"{source}.jsonl"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.added = 0
+
+    def add(self, url, item, error, attempts):
+        entry = {
+            "url": url,
+            "error": error,
+            "attempts": attempts,
+            "failed_at": datetime.now(timezone.utc).isoformat(),
+            "item": item,
+        }
+        with self._lock:
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+            self.added += 1
+
+    def entries(self):
+        if not self.path.exists():
+            return []
+        with self._lock:
+            lines = self.path.read_text(encoding="utf-8").splitlines()
+        return [json.loads(line) for line in lines if line.strip()]
+
+    def take(self):
+        """
+        Returns the dead-lettered input items (one per url, latest entry) and
+        empties the file; anything that fails again is appended anew.
+        """
+        latest = {}
+        for entry in self.entries():
+            latest[entry["url"]] = entry["item"]
+        with self._lock:
+            if self.path.exists():
+                self.path.unlink()
+        return list(latest.values())
+
+    def __len__(self):
+        return len({e["url"] for e in self.entries()})
@@ -0,0 +1,215 @@
+"""
+URL discovery from sitemaps and RSS/Atom feeds instead of HTML listing pages.
+
+    python crawler/discover_urls.py --source itu
+    python crawler/discover_urls.py --source eu_ds --out eu_news_full_20251120_0008.json
+    python crawler/discover_urls.py --source un --full
+
+For each source the configured sitemaps (child sitemaps older than the last
+successful run are skipped) and feeds are stream-parsed, URLs are filtered with the same
+pattern the listing collector uses and then:
+
+  - URLs not in the source's URL list are added to it (same item format as
+    the listing collector), so the article crawler picks them up
+  - with a frontier source, every (url, lastmod) goes through
+    Frontier.refresh(): already crawled URLs with a newer lastmod are queued
+    for re-crawl
+
+last_run only moves forward when every sitemap and feed was read without an
+error; otherwise the next run reads the older child sitemaps again, so URLs
+of a sitemap that failed once are not lost.
+"""
+
+import argparse
+import json
+import re
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import requests
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from crawler.discovery import load_known_items  # noqa: E402
+from crawler.frontier import Frontier  # noqa: E402
+from crawler.sitemaps import iter_feed, iter_sitemap  # noqa: E402
+
+STATE_PATH = ROOT / "data" / "raw" / "discovery_state.json"
+HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
+
+SOURCES = {
+    "itu": {
+        "sitemaps": ["https://www.itu.int/hub/sitemap_index.xml"],
+        "feeds": ["https://www.itu.int/hub/feed/"],
+        "match": re.compile(r"^https://www\.itu\.int/hub/\d{4}/\d{2}/.+?/?$"),
+        "out": ROOT / "scripts" / "itu" / "itu_all_urls.jsonl",
+        "format": "jsonl",
+        "frontier": "itu",
+    },
+    "eu_ds": {
+        "sitemaps": ["https://digital-strategy.ec.europa.eu/sitemap.xml"],
+        "feeds": ["https://digital-strategy.ec.europa.eu/en/rss.xml"],
+        "match": re.compile(r"^https://digital-strategy\.ec\.europa\.eu/en/news/.+"),
+        "out": ROOT
+        / "scripts"
+        / "eu_digital_strategy"
+        / "eu_news_full_20251120_0008.json",
+        "format": "items",
+        "frontier": "eu_ds",
+    },
+    "un": {
+        "sitemaps": ["https://www.un.org/digital-emerging-technologies/sitemap.xml"],
+        "feeds": [],
+        "match": re.compile(
+            r"^https://www\.un\.org/digital-emerging-technologies/(content/)?news/.+"
+        ),
+        "out": ROOT / "scripts" / "un" / "un_ode_news_urls.json",
+        "format": "list",
+        "frontier": None,
+    },
+}
+
+
+def load_state():
+    if STATE_PATH.exists():
+        try:
+            return json.loads(STATE_PATH.read_text(encoding="utf-8"))
+        except Exception:
+            pass
+    return {}
+
+
+def save_state(state):
+    STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    STATE_PATH.write_text(json.dumps(state, indent=2), encoding="utf-8")
+
+
+def listing_date(lastmod):
+    """ISO lastmod → '3 March 2025', the date format of the listing pages."""
+    if not lastmod:
+        return None
+    dt = datetime.fromisoformat(lastmod)
+    return f"{dt.day} {dt.strftime('%B %Y')}"
+
+
+def make_item(source, url, lastmod, title, origin):
+    if source == "itu":
+        return {
+            "url": url,
+            "title": title or "",
+            "origin_site": "itu.int",
+            "source": "itu-news",
+        }
+    if source == "eu_ds":
+        return {
+            "url": url,
+            "title": title or "",
+            "content_type": "news",
+            "news_type": "News article",
+            "date_listing": listing_date(lastmod),
+            "source_page": origin,
+            "collected_at": datetime.now().isoformat(),
+        }
+    return {
+        "title": title or "",
+        "date": listing_date(lastmod),
+        "url": url,
+        "listing_page": origin,
+    }
+
+
+def discover(s, cfg, since):
+    """
+    ([(url, lastmod, title, origin)] for matching URLs, feeds first (newest);
+    [sitemap / feed URLs that failed]).
+    """
+    seen = {}
+    failed = []
+    readers = [(url, iter_feed(s, url)) for url in cfg["feeds"]]
+    readers += [(url, iter_sitemap(s, url, since=since)) for url in cfg["sitemaps"]]
+
+    for url, entries in readers:
+        try:
+            for loc, lastmod, title in entries:
+                if not cfg["match"].match(loc):
+                    continue
+                prev = seen.get(loc)
+                if prev is None:
+                    seen[loc] = (loc, lastmod, title, url)
+                elif lastmod and (not prev[1] or lastmod > prev[1]):
+                    seen[loc] = (loc, lastmod, prev[2] or title, prev[3])
+        except Exception as e:
+            print(f" ⚠ {url}: {e}")
+            failed.append(url)
+    return list(seen.values()), failed
+
+
+def write_items(cfg, path, known_items, new_items):
+    if cfg["format"] == "jsonl":
+        with path.open("a", encoding="utf-8") as f:
+            for obj in new_items:
+                f.write(json.dumps(obj, ensure_ascii=False) + "\n")
+        return
+
+    items = new_items + known_items
+    if cfg["format"] == "list":
+        data = items
+    else:
+        data = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+        data.setdefault("metadata", {})["total_urls"] = len(items)
+        data["items"] = items
+    path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--source", choices=sorted(SOURCES), required=True)
+    parser.add_argument(
+        "--out", type=Path, help="URL lista izvora (podrazumevano iz SOURCES)"
+    )
+    parser.add_argument(
+        "--full", action="store_true", help="ignoriši last_run, čitaj sve sitemape"
+    )
+    args = parser.parse_args()
+
+    cfg = SOURCES[args.source]
+    out = args.out or cfg["out"]
+    state = load_state()
+    since = None if args.full else state.get(args.source, {}).get("last_run")
+    started = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    s = requests.Session()
+    s.headers.update(HEADERS)
+    print(f"🔎 {args.source}: sitemap/feed discovery (since={since})")
+    found, failed = discover(s, cfg, since)
+    print(f" Pronađeno URL-ova: {len(found)}")
+
+    known_items = load_known_items(out)
+    known = {it.get("url") for it in known_items}
+    new_items = [
+        make_item(args.source, url, lastmod, title, origin)
+        for url, lastmod, title, origin in found
+        if url not in known
+    ]
+    if new_items:
+        write_items(cfg, out, known_items, new_items)
+    print(f" Novih URL-ova: {len(new_items)} → {out}")
+
+    if cfg["frontier"]:
+        frontier = Frontier(cfg["frontier"])
+        _, changed = frontier.refresh((url, lastmod) for url, lastmod, _, _ in found)
+        frontier.close()
+        print(f" Izmenjenih (lastmod noviji) → ponovo u frontier: {len(changed)}")
+
+    if failed:
+        # sledeći run ponovo čita i starije child sitemape
+        print(f" ⚠ Neuspelih sitemap/feed-ova: {len(failed)}, last_run ostaje isti")
+        return
+    state.setdefault(args.source, {})["last_run"] = started
+    save_state(state)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Helpers for incremental listing discovery.
+
+Listing pages (ITU hub search, EU DS /en/news, UN ODET news) are ordered
+newest first, so once a crawler has collected the archive a daily run only
+needs the first few pages. KnownUrlRun counts consecutive already-known URLs
+and tells the pager to stop after `stop_after` of them in a row.
+"""
+
+import json
+from pathlib import Path
+
+STOP_AFTER_KNOWN = 20
+
+
+def load_known_items(path):
+    """
+    Reads a stored URL list: JSON list, {"items": [...]} or JSONL.
+    Returns [] when the file does not exist.
+    """
+    path = Path(path)
+    if not path.exists():
+        return []
+
+    text = path.read_text(encoding="utf-8")
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    if isinstance(data, dict):
+        return data.get("items", [])
+    if isinstance(data, list):
+        return data
+    return [data]
+
+
+class KnownUrlRun:
+    def __init__(self, known=(), stop_after=STOP_AFTER_KNOWN):
+        self.known = set(known)
+        self.stop_after = stop_after
+        self.run = 0
+        self.new = 0
+
+    def check(self, url) -> bool:
+        """True for a new url (and remembers it); False for a known one."""
+        if url in self.known:
+            self.run += 1
+            return False
+        self.known.add(url)
+        self.run = 0
+        self.new += 1
+        return True
+
+    @property
+    def exhausted(self) -> bool:
+        return self.stop_after is not None and self.run >= self.stop_after
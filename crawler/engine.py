@@ -0,0 +1,368 @@
+"""
+Shared asyncio crawl engine for the article fetchers (EU DS, IETF, UN ...).
+
+Each source script stays a thin adapter: it loads its URL list, hands the items
+to CrawlEngine.crawl() together with an extract(item, html_text) function and
+writes the records it gets back. The engine takes care of:
+
+  - one pooled requests.Session (keep-alive, connection reuse)
+  - bounded concurrency overall and per host
+  - per-host pacing through the shared AIMD rate controller (crawler.rate)
+  - bounded retries on 429 / 5xx / network errors: a failed URL goes back to
+    the END of the queue after an exponential backoff (workers keep fetching
+    other URLs meanwhile); after max_retries it is written to the optional
+    crawler.dead_letter file and the adapter gets html_text=None
+  - optional conditional GETs through crawler.http_cache: on 304 the cached
+    record is reused and extraction is skipped
+  - optional recording of every raw response into crawler.archive, and a
+    replay mode that serves fetches from that archive without the network
+  - optional streaming reads (crawler.streaming): with stream_stop set, a 200
+    body is parsed while it downloads and the read stops at the article end;
+    such a truncated body is archived marked as cut off, and only replay of a
+    streaming source serves it
+  - optional telemetry (crawler.telemetry): per-host latency histograms,
+    bytes, status codes, retries and pages/min, dumped as JSON + Prometheus
+    text periodically and at the end of every run
+  - delivering results in INPUT ORDER, so state files (last_index ...) keep
+    their meaning and a crash never leaves holes behind the saved index
+"""
+
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from crawler.rate import RETRY_STATUSES, AIMDRateController
+from crawler.streaming import read_streaming
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/124.0.0.0 Safari/537.36"
+    ),
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+RETRY_BASE = 2.0  # seconds before the first retry, doubled per attempt
+RETRY_CAP = 60.0
+
+
+def retry_delay(attempt: int) -> float:
+    """Exponential backoff with jitter for the given (1-based) failed attempt."""
+    delay = min(RETRY_CAP, RETRY_BASE * 2 ** (attempt - 1))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def host_of(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+class CrawlEngine:
+    def __init__(
+        self,
+        headers=None,
+        concurrency=16,
+        per_host=4,
+        timeout=20,
+        max_retries=6,
+        rate=None,
+        cache=None,
+        archive=None,
+        replay=False,
+        dead_letter=None,
+        stream_stop=None,
+        telemetry=None,
+    ):
+        """
+        concurrency  – total number of fetches in flight
+        per_host     – max concurrent requests to a single host
+        max_retries  – attempts per URL (None = keep trying until it succeeds)
+        rate         – AIMDRateController (a default one is created if None)
+        cache        – HttpCache for ETag / Last-Modified revalidation (optional)
+        archive      – ResponseArchive every 200 response is recorded into
+        replay       – serve fetches from `archive` only (no network, no cache)
+        dead_letter  – DeadLetterQueue that receives URLs which failed for good
+        stream_stop  – factory for a per-response ArticleEndDetector; the body
+                       is then read only up to the end of the article
+        telemetry    – CrawlTelemetry that records every fetch and is dumped
+                       every telemetry.interval seconds and after each run
+        """
+        if replay and archive is None:
+            raise ValueError("replay=True requires an archive")
+
+        self.headers = dict(DEFAULT_HEADERS if headers is None else headers)
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.rate = rate or AIMDRateController()
+        self.archive = archive
+        self.replay = replay
+        self.cache = None if replay else cache
+        self.dead_letter = dead_letter
+        self.stream_stop = stream_stop
+        self.telemetry = telemetry
+        self.not_modified = 0
+        self.retries = 0
+        self.early_stops = 0
+        self.bytes_skipped = 0
+        self.archived_truncated = 0  # bodies archived as cut off (complete=0)
+
+        self.session = self._make_session()
+        self._host_slots = {}
+        self._executor = None
+
+    def _make_session(self):
+        s = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.concurrency, pool_maxsize=self.concurrency
+        )
+        s.mount("https://", adapter)
+        s.mount("http://", adapter)
+        s.headers.update(self.headers)
+        return s
+
+    def _slot(self, host: str) -> asyncio.Semaphore:
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self.per_host)
+        return self._host_slots[host]
+
+    async def _in_thread(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    def _get(self, url: str, headers=None):
+        if self.stream_stop is None:
+            return self.session.get(url, headers=headers, timeout=self.timeout)
+
+        r = self.session.get(url, headers=headers, timeout=self.timeout, stream=True)
+        r.early_stop, r.bytes_skipped, r.truncated = None, 0, False
+        if r.status_code != 200:
+            r.content  # errors / 304: read as usual
+            return r
+
+        detector = self.stream_stop()
+        r.bytes_skipped = read_streaming(r, detector)
+        r.early_stop = detector.reason
+        return r
+
+    async def fetch(self, url: str):
+        """Returns the HTML text, or None if the URL could not be fetched."""
+        r = await self.fetch_response(url)
+        return r.text if r is not None and r.status_code == 200 else None
+
+    async def fetch_response(self, url: str, headers=None):
+        """Returns the final 200/304 response, or None after failing."""
+        attempt = 0
+        while True:
+            attempt += 1
+            r, error, retryable = await self._attempt(url, headers)
+            if r is not None or not self._may_retry(retryable, attempt):
+                return r
+            await asyncio.sleep(retry_delay(attempt))
+
+    def _may_retry(self, retryable, attempt):
+        if not retryable:
+            return False
+        return self.max_retries is None or attempt < self.max_retries
+
+    async def _attempt(self, url: str, headers=None):
+        """
+        One GET (or archive lookup in replay mode).
+        Returns (response, error, retryable); response is None on failure.
+        """
+        if self.replay:
+            # a body cut off at the article end only serves a streaming read
+            truncated = self.stream_stop is not None
+            r = await self._in_thread(self.archive.lookup, url, truncated)
+            if r is None:
+                print(f"❌ Not in archive (or only a truncated body): {url}")
+                return None, "not_in_archive", False
+            return r, None, False
+
+        host = host_of(url)
+        queued = time.monotonic()
+        async with self._slot(host):
+            await self.rate.acquire(host)
+
+            started = time.monotonic()
+            if self.telemetry is not None:
+                self.telemetry.waited(host, started - queued)
+            try:
+                r = await self._in_thread(self._get, url, headers)
+            except Exception as e:
+                self.rate.on_error(host, e)
+                if self.telemetry is not None:
+                    self.telemetry.observe(host, "error", time.monotonic() - started)
+                print(f"⚠ Network error {e} ({url})")
+                return None, f"network_error: {e}", True
+
+            if self.telemetry is not None:
+                self.telemetry.observe(
+                    host, r.status_code, time.monotonic() - started, len(r.content)
+                )
+
+            self.rate.on_response(
+                host,
+                r.status_code,
+                time.monotonic() - started,
+                r.headers.get("Retry-After"),
+            )
+            if getattr(r, "early_stop", None):
+                self.early_stops += 1
+                self.bytes_skipped += r.bytes_skipped or 0
+
+            if r.status_code == 200 and self.archive is not None:
+                truncated = getattr(r, "truncated", False)
+                self.archived_truncated += truncated
+                await self._in_thread(
+                    self.archive.record,
+                    url,
+                    r.status_code,
+                    r.headers,
+                    r.content,
+                    not truncated,
+                )
+
+        if r.status_code in (200, 304):
+            return r, None, False
+
+        if r.status_code in RETRY_STATUSES:
+            return None, f"HTTP {r.status_code}", True
+
+        print(f"❌ HTTP {r.status_code} {url}")
+        return None, f"HTTP {r.status_code}", False
+
+    async def _process(self, item, attempt, extract, url_of):
+        """
+        Fetches and extracts one item. Returns (done, record); done=False
+        means the fetch failed with a retryable error and should be requeued.
+        """
+        url = url_of(item)
+        cached = self.cache.lookup(url) if self.cache else None
+
+        headers = self.cache.conditional_headers(cached) if cached else None
+        r, error, retryable = await self._attempt(url, headers)
+
+        if r is None and self._may_retry(retryable, attempt):
+            return False, None
+
+        if r is None and self.dead_letter is not None:
+            await self._in_thread(self.dead_letter.add, url, item, error, attempt)
+
+        if r is not None and r.status_code == 304 and cached:
+            self.not_modified += 1
+            return True, dict(cached["record"], not_modified=True)
+
+        html_text = r.text if r is not None and r.status_code == 200 else None
+        started = time.monotonic()
+        record = await self._in_thread(extract, item, html_text)
+        if self.telemetry is not None:
+            self.telemetry.extracted(time.monotonic() - started)
+
+        if self.cache and html_text is not None and record is not None:
+            self.cache.store(url, r.headers, record)
+        return True, record
+
+    def _requeue(self, queue, job, delay):
+        asyncio.get_running_loop().call_later(delay, queue.put_nowait, job)
+
+    async def _worker(self, queue, extract, url_of, done):
+        while True:
+            idx, item, attempt = await queue.get()
+            try:
+                finished, record = await self._process(item, attempt, extract, url_of)
+            except Exception as e:
+                # the adapter gets None and decides how to record the failure
+                print(f"💥 Extract error {url_of(item)}: {e}")
+                finished, record = True, None
+
+            if not finished:
+                # back to the end of the queue; this worker moves on meanwhile
+                delay = retry_delay(attempt)
+                self.retries += 1
+                if self.telemetry is not None:
+                    self.telemetry.retry(host_of(url_of(item)))
+                print(f"↻ retry {attempt} in {delay:.1f}s ({url_of(item)})")
+                self._requeue(queue, (idx, item, attempt + 1), delay)
+                continue
+
+            done.put_nowait((idx, item, record))
+
+    async def _dump_telemetry(self):
+        """Periodic telemetry dump while a run is in progress."""
+        while True:
+            await asyncio.sleep(self.telemetry.interval)
+            await self._in_thread(self.telemetry.dump, self.rate.snapshot())
+
+    async def run(self, items, extract, on_result, url_of=None):
+        """
+        Fetches all items concurrently; on_result(i, item, record) is called
+        in order of i (0..len-1) as soon as every earlier result is ready.
+        """
+        url_of = url_of or (lambda it: it["url"])
+        items = list(items)
+
+        queue = asyncio.Queue()
+        done = asyncio.Queue()
+        for idx, item in enumerate(items):
+            queue.put_nowait((idx, item, 1))
+
+        # workers run until every item is delivered (retries re-enter the queue)
+        workers_n = max(1, min(self.concurrency, len(items)))
+
+        self._host_slots = {}
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        workers = [
+            asyncio.create_task(self._worker(queue, extract, url_of, done))
+            for _ in range(workers_n)
+        ]
+        if self.telemetry is not None and self.telemetry.interval:
+            workers.append(asyncio.create_task(self._dump_telemetry()))
+
+        pending = {}
+        next_idx = 0
+        try:
+            while next_idx < len(items):
+                idx, item, record = await done.get()
+                pending[idx] = (item, record)
+                while next_idx in pending:
+                    item, record = pending.pop(next_idx)
+                    if self.telemetry is not None:
+                        self.telemetry.page(record is not None)
+                    on_result(next_idx, item, record)
+                    next_idx += 1
+        finally:
+            for w in workers:
+                w.cancel()
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+        if self.cache:
+            print(f"↺ 304 Not Modified (extraction skipped): {self.not_modified}")
+        if self.stream_stop is not None:
+            print(
+                f"✂ Early stop at article end: {self.early_stops} pages"
+                f" (≥{self.bytes_skipped // 1024} KB not downloaded)"
+            )
+            if self.archived_truncated:
+                print(f"  archived as cut off: {self.archived_truncated}")
+        if self.dead_letter is not None and self.dead_letter.added:
+            print(
+                f"☠ Dead-lettered: {self.dead_letter.added} → {self.dead_letter.path}"
+            )
+        if self.telemetry is not None:
+            snap = self.telemetry.dump(self.rate.snapshot())
+            print(
+                f"📊 Telemetry: {self.telemetry.summary(snap)}"
+                f" → {self.telemetry.json_path}"
+            )
+
+    def crawl(self, items, extract, on_result, url_of=None):
+        """Synchronous entry point for scripts: asyncio.run(self.run(...))."""
+        asyncio.run(self.run(items, extract, on_result, url_of=url_of))
@@ -0,0 +1,140 @@
+"""
+lxml extraction helpers shared by the crawlers, normalizers and chunkers.
+
+The extractors used to build BeautifulSoup trees (mostly with the pure-Python
+"html.parser" backend) just to walk a handful of tags. They now parse with
+lxml and use precompiled XPath expressions, while keeping BeautifulSoup's
+text semantics, so the extracted records stay the same:
+
+  - get_text(el, sep, strip) joins the text nodes under `el` like
+    Tag.get_text(): comments, processing instructions and the content of
+    <script>, <style> and <template> are skipped, and with strip=True every
+    node is stripped and empty ones are dropped
+  - outer_html(el) serializes an element like str(tag) does (minimal
+    formatter: void tags as <br/>, & < > escaped, class-like attributes
+    and whitespace-only strings normalized, no tail text)
+  - has_class(name) is the XPath predicate for a CSS `.name` selector
+
+The tree itself is libxml2's (as with BeautifulSoup(..., "lxml"), which
+chunk_updates_v1 already used). On well-formed markup it is the same tree
+html.parser builds; on broken nesting (<div> inside <p>, </main> with
+unclosed <div>s) the two parsers repair differently.
+
+crawler/bench_extract.py compares every extractor against the BeautifulSoup
+version it replaced and times both.
+"""
+
+from lxml import etree
+from lxml import html as lxml_html
+
+# text nodes BeautifulSoup's get_text() returns (see module docstring)
+TEXT_NODES = etree.XPath(
+    "descendant::text()"
+    "[not(ancestor::script) and not(ancestor::style) and not(ancestor::template)]"
+)
+
+# bs4 HTMLTreeBuilder.empty_element_tags
+VOID_TAGS = frozenset(
+    (
+        "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen",
+        "link", "menuitem", "meta", "param", "source", "track", "wbr",
+        "basefont", "bgsound", "command", "frame", "image", "isindex",
+        "nextid", "spacer",
+    )
+)
+RAW_TEXT_TAGS = frozenset(("script", "style"))
+PRESERVE_WHITESPACE_TAGS = frozenset(("pre", "textarea"))
+ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+# bs4 cdata_list_attributes: stored as token lists, re-joined with one space
+LIST_ATTRIBUTES = frozenset(
+    ("class", "rel", "rev", "accept-charset", "headers", "accesskey", "dropzone")
+)
+
+
+def has_class(name) -> str:
+    return f'contains(concat(" ", normalize-space(@class), " "), " {name} ")'
+
+
+def parse_html(markup):
+    """Whole-document lxml tree (fragments get <html><body>); None if empty."""
+    if not markup:
+        return None
+    try:
+        return lxml_html.document_fromstring(markup)
+    except ValueError:
+        # str input with an <?xml encoding=...?> declaration
+        if isinstance(markup, str):
+            return parse_html(markup.encode("utf-8"))
+        return None
+    except etree.ParserError:
+        return None
+
+
+def get_text(el, sep=" ", strip=True) -> str:
+    parts = TEXT_NODES(el)
+    if strip:
+        parts = [t.strip() for t in parts]
+        parts = [t for t in parts if t]
+    return sep.join(parts)
+
+
+def html_to_text(markup) -> str:
+    """BeautifulSoup(markup, ...).get_text(" ", strip=True)."""
+    doc = parse_html(markup)
+    return get_text(doc) if doc is not None else ""
+
+
+def _collapse(text) -> str:
+    # bs4 stores whitespace-only strings (outside <pre>/<textarea>) as " " / "\n"
+    if text.strip(ASCII_SPACES):
+        return text
+    return "\n" if "\n" in text else " "
+
+
+def _escape(text) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _attribute(name, value) -> str:
+    if name in LIST_ATTRIBUTES:
+        value = " ".join(value.split())
+    value = _escape(value)
+    quote = '"'
+    if '"' in value:
+        if "'" in value:
+            value = value.replace('"', "&quot;")
+        else:
+            quote = "'"
+    return f" {name}={quote}{value}{quote}"
+
+
+def _serialize(el, out, preserve=False):
+    if el.tag is etree.Comment:
+        out.append(f"<!--{el.text or ''}-->")
+        return
+    if not isinstance(el.tag, str):  # processing instructions, entities
+        return
+
+    # sorted like bs4's default formatter, so html_content matches byte for byte
+    attrs = "".join(_attribute(k, v) for k, v in sorted(el.attrib.items()))
+    if el.tag in VOID_TAGS:
+        out.append(f"<{el.tag}{attrs}/>")
+        return
+
+    out.append(f"<{el.tag}{attrs}>")
+    raw = el.tag in RAW_TEXT_TAGS
+    inner = preserve or el.tag in PRESERVE_WHITESPACE_TAGS
+    if el.text:
+        text = el.text if inner else _collapse(el.text)
+        out.append(text if raw else _escape(text))
+    for child in el:
+        _serialize(child, out, inner)
+        if child.tail:
+            out.append(_escape(child.tail if inner else _collapse(child.tail)))
+    out.append(f"</{el.tag}>")
+
+
+def outer_html(el) -> str:
+    out = []
+    _serialize(el, out)
+    return "".join(out)
@@ -1,113 +1,62 @@
-import json
-import sys
-import time
-from pathlib import Path
-
-import requests
-from requests.adapters import HTTPAdapter, Retry
-
-BASE = "https://dig.watch/wp-json/wp/v2"
-OUT_DIR = Path(__file__).resolve().parents[1] / "data" / "raw"
-OUT_DIR.mkdir(parents=True, exist_ok=True)
-
-CATS_PATH = OUT_DIR / "categories.json"
-TAGS_PATH = OUT_DIR / "tags.json"
-
-MAP_PATH = OUT_DIR / "taxonomy_map.json"
-
-
-def sess():
-    s = requests.Session()
-    r = Retry(
-        total=6,
-        backoff_factor=0.6,
-        status_forcelist=(429, 500, 502, 503, 504),
-        allowed_methods=frozenset(["GET"]),
-    )
-    s.mount("https://", HTTPAdapter(max_retries=r))
-    s.headers.update({"User-Agent": "DigwatchPilot/Taxonomies/1.1"})
-    return s
-
-
-def fetch_collection(url, name):
-    s = sess()
-    page, per_page = 1, 100
-    all_items = []
-    print(f"➡️  Fetching {name} ...")
-    while True:
-        params = {
-            "per_page": per_page,
-            "page": page,
-            "orderby": "id",
-            "order": "asc",
-            "hide_empty": "false",
-        }
-        try:
-            r = s.get(url, params=params, timeout=60)
-            r.raise_for_status()
-        except requests.RequestException as e:
-            print(f"   ⚠️  {name} page {page} failed: {e}")
-
-            time.sleep(0.8)
-            page += 1
-            continue
-        try:
-            arr = r.json()
-        except ValueError:
-            arr = []
-        n = len(arr) if isinstance(arr, list) else 0
-        print(f"   ✅ {name} page {page}: {n} items")
-        if not isinstance(arr, list) or n == 0:
-            break
-        all_items.extend(arr)
-        if n < per_page:
-            break
-        page += 1
-        time.sleep(0.25)
-    print(f" {name} total: {len(all_items)}\n")
-    return all_items
-
-
-def to_id_name_map(items):
-    m = {}
-    for it in items:
-        _id = it.get("id")
-        name = (it.get("name") or "").strip()
-        if isinstance(_id, int) and name:
-            m[_id] = name
-    return m
-
-
-def main():
-    try:
-        cats = fetch_collection(f"{BASE}/categories", "categories")
-        tags = fetch_collection(f"{BASE}/tags", "tags")
-    except Exception as e:
-        print("GREŠKA pri fetch-u:", e)
-        sys.exit(1)
-
-    CATS_PATH.write_text(
-        json.dumps(cats, ensure_ascii=False, indent=2), encoding="utf-8"
-    )
-    TAGS_PATH.write_text(
-        json.dumps(tags, ensure_ascii=False, indent=2), encoding="utf-8"
-    )
-
-    cat_map = to_id_name_map(cats)
-    tag_map = to_id_name_map(tags)
-
-    MAP_PATH.write_text(
-        json.dumps(
-            {"categories": cat_map, "tags": tag_map}, ensure_ascii=False, indent=2
-        ),
-        encoding="utf-8",
-    )
-
-    print(" Sačuvano:")
-    print(f"   - {CATS_PATH}  ({len(cats)} raw)")
-    print(f"   - {TAGS_PATH}  ({len(tags)} raw)")
-    print(f"   - {MAP_PATH}   (cats: {len(cat_map)}, tags: {len(tag_map)})")
-
-
-if __name__ == "__main__":
-    main()
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import requests
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from crawler.raw_store import iter_raw_updates  # noqa: E402
+from crawler.wordpress import WordPressSource, load_sources  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--source", default="digwatch")
+    parser.add_argument(
+        "--config", type=Path, help="JSON sa dodatnim WordPress izvorima"
+    )
+    parser.add_argument(
+        "--missing",
+        action="store_true",
+        help="bez punog prolaza: preko include= dohvati samo ID-jeve iz raw "
+        "store-a koji nisu u taxonomy_map.json",
+    )
+    args = parser.parse_args()
+
+    sources = load_sources(args.config)
+    if args.source not in sources:
+        parser.error(f"nepoznat izvor {args.source!r} (ima: {', '.join(sources)})")
+    source = WordPressSource(args.source, sources[args.source])
+    cache = source.taxonomy()
+    map_path = source.taxonomy_path
+
+    if args.missing:
+        before = len(cache)
+        cache.ensure_posts(iter_raw_updates(source.store_path, source.legacy))
+        print(f" Dopunjeno: {len(cache) - before} → {map_path}")
+        return
+
+    try:
+        raw = cache.refresh_all()
+    except (requests.RequestException, ValueError) as e:
+        # nepotpun refresh se ne upisuje (postojeća mapa ostaje netaknuta)
+        print("GREŠKA pri fetch-u:", e)
+        sys.exit(1)
+
+    print(" Sačuvano:")
+    for kind, items in raw.items():
+        # sirovi termini pored mape (za DigWatch: data/raw/categories.json, tags.json)
+        path = map_path.parent / f"{kind}.json"
+        path.write_text(
+            json.dumps(items, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        print(f"   - {path}  ({len(items)} raw)")
+    counts = ", ".join(f"{kind}: {len(m)}" for kind, m in cache.maps.items())
+    print(f"   - {map_path}   ({counts})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Normalized content fingerprints, computed by the crawlers at fetch time.
+
+Every article record gets a "fingerprint" over the fields that end up in the
+chunks (title, dates, body text). The text is normalized first (NFKC, no
+zero-width characters, collapsed whitespace), so markup or spacing noise
+between two crawls does not count as a change.
+
+Downstream stages compare it with what they processed last time:
+chunker/incremental.py re-uses the previous chunks of unchanged articles and
+scripts/ingest_state.py skips their chunks on ingest. The frontier stores it
+as the row's content_hash.
+"""
+
+import hashlib
+import re
+import unicodedata
+
+ZERO_WIDTH_RE = re.compile("[\u200b\u200c\u200d\u2060\ufeff\u00ad]")
+WS_RE = re.compile(r"\s+")
+
+
+def normalize_text(text) -> str:
+    text = unicodedata.normalize("NFKC", str(text or ""))
+    text = ZERO_WIDTH_RE.sub("", text)
+    return WS_RE.sub(" ", text).strip()
+
+
+def fingerprint(*parts) -> str:
+    """sha256 (first 32 hex chars) over the normalized parts, in order."""
+    joined = "\x1f".join(normalize_text(p) for p in parts)
+    return hashlib.sha256(joined.encode("utf-8")).hexdigest()[:32]
+
+
+def record_fingerprint(record, fields) -> str:
+    return fingerprint(*(record.get(f) for f in fields))
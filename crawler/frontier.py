@@ -0,0 +1,501 @@
+"""
+Transactional crawl frontier in SQLite, shared by all sources.
+
+One row per (source, url): status, attempts, last fetch time, content hash and
+the position it was added at (claims follow input order). It replaces the
+per-crawler state files (last_index / next_index / done_urls): completing a
+URL is a single-row UPDATE instead of rewriting a JSON file, and resuming is
+just "claim the next pending rows".
+
+    frontier = Frontier("itu")
+    frontier.add(urls)
+    for batch in frontier.batches(items_by_url):
+        engine.crawl(batch, extract, on_result)   # on_result → complete()/fail()
+
+claim() runs in a BEGIN IMMEDIATE transaction, so several processes (or
+machines sharing the database file) can crawl the same source without handing
+out a URL twice. Every claim is a lease: the row records its owner (worker id,
+host:pid by default) and `lease_until`. While a worker is alive keep_leases()
+renews its leases from a background thread; when a worker dies its leases
+expire after `lease` seconds and the rows are handed to the next claim().
+A worker whose lease was reassigned cannot finish the row anymore: complete()
+/ fail() only apply to in_progress rows it still owns, so a late worker never
+overwrites a row another worker has finished.
+
+    with frontier.keep_leases():
+        for batch in frontier.batches(items_by_url):
+            ...
+
+A worker writes its records to worker_output() (out.<worker>.jsonl) and at
+the end finish_output() appends them to the main output, which is all the
+downstream stages read.
+
+Statuses: pending → in_progress → done | failed; `dropped` marks URLs that
+are no longer in the source's input list. refresh() takes (url, lastmod)
+pairs from sitemaps/feeds and sends done URLs whose lastmod moved forward
+back to pending.
+
+Claims are ordered by priority, then by lastmod (most recent first), then by
+input position: URLs refresh() re-queued because their lastmod moved forward
+go first, then URLs newly found by discovery, then the rest. complete()
+records `changed_at` when the content hash differs from the stored one, so
+changed_since() tells a scheduler whether downstream stages have work.
+"""
+
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+# CRAWL_FRONTIER_DB points several workers at one shared database file
+DEFAULT_PATH = Path(
+    os.environ.get("CRAWL_FRONTIER_DB") or ROOT / "data" / "raw" / "frontier.sqlite"
+)
+
+BATCH_SIZE = 200
+PRIORITY_NEW = 1  # found by sitemap / feed discovery
+PRIORITY_CHANGED = 2  # lastmod moved forward since the last fetch
+LEASE = 120  # seconds; renewed every LEASE / 3 by keep_leases()
+MERGE_TIMEOUT = 600  # seconds to wait for another worker's merge
+
+
+def content_hash(text):
+    if not text:
+        return None
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def default_owner():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def worker_output(path, worker):
+    """Per-worker output file: out.jsonl → out.<worker>.jsonl (None = unchanged)."""
+    if not worker:
+        return Path(path)
+    path = Path(path)
+    return path.with_name(f"{path.stem}.{worker}{path.suffix}")
+
+
+@contextmanager
+def output_lock(path):
+    """
+    Exclusive lock on a crawler's output across processes: a write
+    transaction on a small SQLite file next to it (<output>.lock).
+    """
+    path = Path(path)
+    conn = sqlite3.connect(
+        str(path.with_name(path.name + ".lock")),
+        timeout=MERGE_TIMEOUT,
+        isolation_level=None,
+    )
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        finally:
+            conn.execute("ROLLBACK")
+    finally:
+        conn.close()
+
+
+def finish_output(path, worker=None, key="url"):
+    """
+    End of a crawler run. A worker appends its file (worker_output()) to the
+    main output and removes it, so the chunkers, learn_boilerplate, reextract
+    and the scheduler, which only read the main output, see its records. Then
+    the main output is deduped by `key` (the latest record wins). Runs under
+    output_lock(), so workers that finish together do not interleave. Returns
+    the number of records dropped.
+    """
+    path = Path(path)
+    with output_lock(path):
+        own = worker_output(path, worker)
+        if own != path and own.exists():
+            with own.open("rb") as src, path.open("ab") as out:
+                shutil.copyfileobj(src, out)
+            own.unlink()
+        return dedupe_jsonl(path, key)
+
+
+def dedupe_jsonl(path, key="url"):
+    """
+    Keeps only the LAST record per `key` in a crawler's append-mode output
+    (a URL whose lastmod moved forward is fetched again and appended), so the
+    chunkers never see two versions of an article. Streams the file twice;
+    the latest record stays where it was appended. Returns records dropped.
+    """
+    path = Path(path)
+    if not path.exists():
+        return 0
+
+    last = {}
+    with path.open("r", encoding="utf-8") as f:
+        for n, line in enumerate(f):
+            try:
+                value = json.loads(line).get(key)
+            except (json.JSONDecodeError, AttributeError):
+                continue
+            if value:
+                last[value] = n
+
+    dropped = 0
+    tmp = path.with_name(path.name + ".tmp")
+    with path.open("r", encoding="utf-8") as f, tmp.open("w", encoding="utf-8") as out:
+        for n, line in enumerate(f):
+            try:
+                value = json.loads(line).get(key)
+            except (json.JSONDecodeError, AttributeError):
+                value = None
+            if value and last[value] != n:
+                dropped += 1
+                continue
+            out.write(line)
+
+    if dropped:
+        tmp.replace(path)
+    else:
+        tmp.unlink()
+    return dropped
+
+
+class LeaseKeeper:
+    """Heartbeat thread that renews the owner's leases until stopped."""
+
+    def __init__(self, frontier, interval=None):
+        self.frontier = frontier
+        self.interval = interval or frontier.lease / 3
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.frontier.heartbeat()
+            except sqlite3.Error as e:
+                print(f"⚠ frontier heartbeat failed: {e}")
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+class Frontier:
+    def __init__(self, source, path=DEFAULT_PATH, lease=LEASE, owner=None):
+        """
+        lease – seconds a claim stays valid without a heartbeat
+        owner – worker id recorded on claimed rows (default host:pid)
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.source = source
+        self.lease = lease
+        self.owner = owner or default_owner()
+        self.reassigned = 0
+        self._lock = threading.Lock()
+
+        # autocommit; claim() opens its own IMMEDIATE transaction
+        self.conn = sqlite3.connect(
+            str(path), timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS frontier (
+                source       TEXT NOT NULL,
+                url          TEXT NOT NULL,
+                status       TEXT NOT NULL DEFAULT 'pending',
+                attempts     INTEGER NOT NULL DEFAULT 0,
+                position     INTEGER,
+                claimed_at   REAL,
+                last_fetch   REAL,
+                content_hash TEXT,
+                lastmod      TEXT,
+                error        TEXT,
+                owner        TEXT,
+                lease_until  REAL,
+                priority     INTEGER NOT NULL DEFAULT 0,
+                changed_at   REAL,
+                PRIMARY KEY (source, url)
+            );
+            CREATE INDEX IF NOT EXISTS frontier_claim
+                ON frontier (source, status, position);
+            """
+        )
+        # databases created before refresh() / leases / priorities
+        columns = {r[1] for r in self.conn.execute("PRAGMA table_info(frontier)")}
+        added_columns = (
+            ("lastmod", "TEXT"),
+            ("owner", "TEXT"),
+            ("lease_until", "REAL"),
+            ("priority", "INTEGER NOT NULL DEFAULT 0"),
+            ("changed_at", "REAL"),
+        )
+        for name, kind in added_columns:
+            if name not in columns:
+                self.conn.execute(f"ALTER TABLE frontier ADD COLUMN {name} {kind}")
+
+    def add(self, urls):
+        """Registers urls (input order is kept); returns how many were new."""
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.conn.execute(
+                    "SELECT COALESCE(MAX(position), -1) FROM frontier WHERE source = ?",
+                    (self.source,),
+                ).fetchone()
+                position = row[0] + 1
+                added = 0
+                for url in urls:
+                    cur = self.conn.execute(
+                        "INSERT OR IGNORE INTO frontier (source, url, position) "
+                        "VALUES (?, ?, ?)",
+                        (self.source, url, position),
+                    )
+                    if cur.rowcount:
+                        added += 1
+                        position += 1
+                    else:
+                        self.conn.execute(
+                            "UPDATE frontier SET status = 'pending' "
+                            "WHERE source = ? AND url = ? AND status = 'dropped'",
+                            (self.source, url),
+                        )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return added
+
+    def refresh(self, entries):
+        """
+        Takes (url, lastmod) pairs from a sitemap or feed. New urls are added
+        as pending; known urls whose lastmod is newer than the stored one go
+        back to pending. Returns (new_urls, changed_urls).
+        """
+        new, changed = [], []
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.conn.execute(
+                    "SELECT COALESCE(MAX(position), -1) FROM frontier WHERE source = ?",
+                    (self.source,),
+                ).fetchone()
+                position = row[0] + 1
+                for url, lastmod in entries:
+                    row = self.conn.execute(
+                        "SELECT status, lastmod FROM frontier "
+                        "WHERE source = ? AND url = ?",
+                        (self.source, url),
+                    ).fetchone()
+                    if row is None:
+                        self.conn.execute(
+                            "INSERT INTO frontier "
+                            "(source, url, position, lastmod, priority) "
+                            "VALUES (?, ?, ?, ?, ?)",
+                            (self.source, url, position, lastmod, PRIORITY_NEW),
+                        )
+                        position += 1
+                        new.append(url)
+                        continue
+
+                    status, known = row
+                    if not lastmod or (known and lastmod <= known):
+                        continue
+                    # without a stored lastmod this is only the baseline
+                    requeue = known is not None and status in ("done", "failed")
+                    self.conn.execute(
+                        "UPDATE frontier SET lastmod = ?, "
+                        "status = CASE WHEN ? THEN 'pending' ELSE status END, "
+                        "priority = CASE WHEN ? THEN ? ELSE priority END "
+                        "WHERE source = ? AND url = ?",
+                        (
+                            lastmod,
+                            requeue,
+                            requeue,
+                            PRIORITY_CHANGED,
+                            self.source,
+                            url,
+                        ),
+                    )
+                    if requeue:
+                        changed.append(url)
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return new, changed
+
+    def claim(self, limit=BATCH_SIZE):
+        """
+        Atomically leases up to `limit` pending urls (or urls whose lease has
+        expired) to this owner.
+        """
+        now = time.time()
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self.conn.execute(
+                    """
+                    SELECT url, status FROM frontier
+                    WHERE source = ?
+                      AND (status = 'pending'
+                           OR (status = 'in_progress'
+                               AND COALESCE(lease_until, claimed_at + ?) < ?))
+                    ORDER BY priority DESC, lastmod DESC, position
+                    LIMIT ?
+                    """,
+                    (self.source, self.lease, now, limit),
+                ).fetchall()
+                self.conn.executemany(
+                    "UPDATE frontier SET status = 'in_progress', claimed_at = ?, "
+                    "lease_until = ?, owner = ?, attempts = attempts + 1 "
+                    "WHERE source = ? AND url = ?",
+                    [
+                        (now, now + self.lease, self.owner, self.source, url)
+                        for url, _ in rows
+                    ],
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        self.reassigned += sum(1 for _, status in rows if status == "in_progress")
+        return [u for u, _ in rows]
+
+    def heartbeat(self):
+        """Extends every lease this owner holds; returns how many were renewed."""
+        with self._lock:
+            cur = self.conn.execute(
+                "UPDATE frontier SET lease_until = ? "
+                "WHERE source = ? AND owner = ? AND status = 'in_progress'",
+                (time.time() + self.lease, self.source, self.owner),
+            )
+        return cur.rowcount
+
+    def keep_leases(self, interval=None):
+        """Context manager running heartbeat() in the background."""
+        return LeaseKeeper(self, interval)
+
+    def _finish(self, url, status, content_hash=None, error=None):
+        """
+        Records the outcome of a row this owner holds. A row that is no longer
+        leased to us (our lease expired and another worker claimed or already
+        finished it) is left alone. Returns False in that case.
+        """
+        now = time.time()
+        with self._lock:
+            cur = self.conn.execute(
+                "UPDATE frontier SET status = ?, last_fetch = ?, claimed_at = NULL, "
+                "lease_until = NULL, priority = 0, "
+                "changed_at = CASE WHEN ? IS NOT NULL AND content_hash IS NOT ? "
+                "THEN ? ELSE changed_at END, "
+                "content_hash = COALESCE(?, content_hash), "
+                "error = ? WHERE source = ? AND url = ? "
+                "AND status = 'in_progress' AND owner = ?",
+                (
+                    status,
+                    now,
+                    content_hash,
+                    content_hash,
+                    now,
+                    content_hash,
+                    error,
+                    self.source,
+                    url,
+                    self.owner,
+                ),
+            )
+        return cur.rowcount > 0
+
+    def complete(self, url, content_hash=None):
+        return self._finish(url, "done", content_hash=content_hash)
+
+    def fail(self, url, error=None):
+        return self._finish(url, "failed", error=error)
+
+    def drop(self, url):
+        return self._finish(url, "dropped")
+
+    def release(self, urls):
+        """Returns claimed urls to pending without counting the attempt."""
+        with self._lock:
+            self.conn.executemany(
+                "UPDATE frontier SET status = 'pending', claimed_at = NULL, "
+                "lease_until = NULL, attempts = MAX(attempts - 1, 0) "
+                "WHERE source = ? AND url = ? AND status = 'in_progress' "
+                "AND owner = ?",
+                [(self.source, u, self.owner) for u in urls],
+            )
+
+    def mark_done(self, urls):
+        """Marks urls done without fetching (e.g. progress from an old state file)."""
+        with self._lock:
+            self.conn.executemany(
+                "UPDATE frontier SET status = 'done' WHERE source = ? AND url = ?",
+                [(self.source, u) for u in urls],
+            )
+
+    def batches(self, items_by_url, size=BATCH_SIZE, limit=None):
+        """
+        Claims urls in batches and yields the matching input items.
+        Claimed urls missing from items_by_url are marked dropped.
+        """
+        claimed = 0
+        while limit is None or claimed < limit:
+            n = size if limit is None else min(size, limit - claimed)
+            urls = self.claim(n)
+            if not urls:
+                return
+            claimed += len(urls)
+
+            batch = []
+            for url in urls:
+                if url in items_by_url:
+                    batch.append(items_by_url[url])
+                else:
+                    self.drop(url)
+            if batch:
+                yield batch
+
+    def workers(self):
+        """{owner: (urls leased, latest lease_until)} for live in_progress rows."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT owner, COUNT(*), MAX(lease_until) FROM frontier "
+                "WHERE source = ? AND status = 'in_progress' AND lease_until >= ? "
+                "GROUP BY owner",
+                (self.source, time.time()),
+            ).fetchall()
+        return {owner: (n, until) for owner, n, until in rows}
+
+    def changed_since(self, since):
+        """Number of urls whose content hash changed at or after `since`."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT COUNT(*) FROM frontier WHERE source = ? AND changed_at >= ?",
+                (self.source, since),
+            ).fetchone()
+        return row[0]
+
+    def counts(self):
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT status, COUNT(*) FROM frontier WHERE source = ? GROUP BY status",
+                (self.source,),
+            ).fetchall()
+        return dict(rows)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
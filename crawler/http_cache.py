@@ -0,0 +1,152 @@
+"""
+On-disk HTTP revalidation cache for re-crawls.
+
+For every URL we keep the validators the server sent (ETag / Last-Modified)
+together with the record the extractor produced from that response. On the
+next run the engine sends a conditional GET; a 304 answer means the page is
+unchanged, so the stored record is reused as-is (flagged "not_modified") and
+extraction – and downstream chunking – is skipped for that page.
+
+Entries are scoped per crawler (several crawlers fetch the same URLs and
+build differently shaped records from them) and carry the extractor version
+(code_version(): a hash of the crawler script and the shared extraction
+code), so a fixed extractor never gets an old record back on 304. Only
+successful records are stored (`ok`); a failed extraction is retried on
+the next run instead of being replayed on every 304.
+
+    cache = HttpCache(FRONTIER_SOURCE, code_version(__file__))
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_PATH = ROOT / "data" / "raw" / "http_cache.sqlite"
+
+# extraction code shared by the crawlers: a change here changes every version
+SHARED_CODE = [
+    ROOT / "crawler" / "extract.py",
+    ROOT / "crawler" / "boilerplate.py",
+    ROOT / "crawler" / "streaming.py",
+]
+
+
+def code_version(*scripts) -> str:
+    """Hash of the given extractor sources plus SHARED_CODE."""
+    h = hashlib.sha256()
+    for path in [*scripts, *SHARED_CODE]:
+        h.update(Path(path).read_bytes())
+    return h.hexdigest()[:16]
+
+
+def succeeded(record) -> bool:
+    return record.get("success") is True
+
+
+class HttpCache:
+    def __init__(self, scope, version="", path=DEFAULT_PATH, ok=succeeded):
+        """
+        scope    – the crawler (FRONTIER_SOURCE); entries of other scopes are
+                   never returned
+        version  – extractor version (code_version()); entries stored by
+                   another version are ignored and overwritten
+        ok       – record → bool, whether the record may be cached
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = Path(path)
+        self.scope = scope
+        self.version = version
+        self.ok = ok
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        columns = {r[1] for r in self.conn.execute("PRAGMA table_info(http_cache)")}
+        if columns and "scope" not in columns:
+            # unscoped entries from before: their record shape is unknown
+            self.conn.execute("DROP TABLE http_cache")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS http_cache (
+                scope         TEXT,
+                url           TEXT,
+                version       TEXT,
+                etag          TEXT,
+                last_modified TEXT,
+                record        TEXT,
+                fetched_at    TEXT,
+                PRIMARY KEY (scope, url)
+            )
+            """
+        )
+        self.conn.commit()
+
+    def lookup(self, url):
+        """Returns {"etag", "last_modified", "record"} or None."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified, record, version FROM http_cache "
+                "WHERE scope = ? AND url = ?",
+                (self.scope, url),
+            ).fetchone()
+        if not row or not row[2] or row[3] != self.version:
+            return None
+        return {"etag": row[0], "last_modified": row[1], "record": json.loads(row[2])}
+
+    @staticmethod
+    def conditional_headers(entry):
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url, headers, record):
+        """
+        Saves validators + record. Pages without validators and unsuccessful
+        records are not cached (a stale entry for the url is dropped).
+        """
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if (not etag and not last_modified) or not self.ok(record):
+            with self._lock:
+                self.conn.execute(
+                    "DELETE FROM http_cache WHERE scope = ? AND url = ?",
+                    (self.scope, url),
+                )
+                self.conn.commit()
+            return
+
+        record = {k: v for k, v in record.items() if k != "not_modified"}
+        with self._lock:
+            self.conn.execute(
+                """
+                INSERT INTO http_cache
+                    (scope, url, version, etag, last_modified, record, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(scope, url) DO UPDATE SET
+                    version = excluded.version,
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    record = excluded.record,
+                    fetched_at = excluded.fetched_at
+                """,
+                (
+                    self.scope,
+                    url,
+                    self.version,
+                    etag,
+                    last_modified,
+                    json.dumps(record, ensure_ascii=False),
+                    datetime.now(timezone.utc).isoformat(),
+                ),
+            )
+            self.conn.commit()
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -1,42 +1,37 @@
 print("RUNNING FILE:", __file__)
 
+import argparse
 import json
-import time
+import sys
+from contextlib import nullcontext
 from pathlib import Path
 
-import requests
-from bs4 import BeautifulSoup, NavigableString
-from requests.adapters import HTTPAdapter, Retry
+from lxml import etree
 
 ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from crawler.archive import ResponseArchive  # noqa: E402
+from crawler.dead_letter import DeadLetterQueue  # noqa: E402
+from crawler.engine import CrawlEngine  # noqa: E402
+from crawler.extract import get_text, has_class, outer_html, parse_html  # noqa: E402
+from crawler.fingerprint import record_fingerprint  # noqa: E402
+from crawler.frontier import Frontier, finish_output, worker_output  # noqa: E402
+from crawler.http_cache import HttpCache, code_version  # noqa: E402
+from crawler.rate import AIMDRateController  # noqa: E402
+from crawler.telemetry import CrawlTelemetry  # noqa: E402
+
 RAW_DIR = ROOT / "data" / "raw" / "ietf"
 RAW_DIR.mkdir(parents=True, exist_ok=True)
 
 URLS_PATH = RAW_DIR / "ietf_urls.json"
 OUT_PATH = RAW_DIR / "ietf_articles_all.jsonl"
-STATE_PATH = RAW_DIR / "ietf_articles_state.json"
-
-
-def make_session():
-    s = requests.Session()
-    retries = Retry(
-        total=6,
-        backoff_factor=0.8,
-        status_forcelist=[429, 500, 502, 503, 504],
-        allowed_methods=["GET"],
-    )
-    s.mount("https://", HTTPAdapter(max_retries=retries))
-    s.headers.update(
-        {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/122.0.0.0 Safari/537.36"
-            ),
-            "Accept-Language": "en-US,en;q=0.9",
-        }
-    )
-    return s
+STATE_PATH = RAW_DIR / "ietf_articles_state.json"  # legacy next_index, read once
+FRONTIER_SOURCE = "ietf"
+MAX_RETRIES = 6  # then the URL goes to data/raw/dead_letter/ietf.jsonl
+USE_HTTP_CACHE = True  # conditional GETs; 304 reuses the stored record
+# fields that end up in the chunks; an unchanged fingerprint skips chunk/ingest
+FINGERPRINT_FIELDS = ("title", "date", "text_content")
 
 
 def load_state():
@@ -48,10 +43,6 @@ def load_state():
     return {"next_index": 0}
 
 
-def save_state(state):
-    STATE_PATH.write_text(json.dumps(state, indent=2), encoding="utf-8")
-
-
 def clean_text(x):
     return " ".join(x.split())
 
@@ -67,61 +58,53 @@ def dedupe_paragraphs(paragraphs):
     return out
 
 
+MAIN_XPATH = etree.XPath("(//main)[1]")
+H1_XPATH = etree.XPath("(.//h1)[1]")
+# element siblings after the title (text nodes and comments are skipped)
+AFTER_H1_XPATH = etree.XPath("following-sibling::*")
+SHARE_ICONS_XPATH = etree.XPath(
+    f".//i[{has_class('bi-twitter')} or {has_class('bi-linkedin')}]"
+)
+
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun",
+          "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+ALLOWED_TAGS = {"p", "h2", "h3", "pre", "div"}
+
+
 def extract_article(html):
-    soup = BeautifulSoup(html, "html.parser")
-    main = soup.find("main")
+    empty = {"title": None, "date": None, "html_content": "", "text_content": ""}
+    doc = parse_html(html)
+    main = MAIN_XPATH(doc) if doc is not None else []
     if not main:
-        return {"title": None, "date": None, "html_content": "", "text_content": ""}
+        return empty
 
-    h1 = main.find("h1")
+    h1 = H1_XPATH(main[0])
     if not h1:
-        return {"title": None, "date": None, "html_content": "", "text_content": ""}
-
-    title = h1.get_text(strip=True)
+        return empty
 
-    after_nodes = []
-    for node in h1.next_siblings:
-        if isinstance(node, NavigableString):
-            continue
-        after_nodes.append(node)
+    title = get_text(h1[0], "")
+    after_nodes = AFTER_H1_XPATH(h1[0])
 
     date = None
-    months = [
-        "Jan",
-        "Feb",
-        "Mar",
-        "Apr",
-        "May",
-        "Jun",
-        "Jul",
-        "Aug",
-        "Sep",
-        "Oct",
-        "Nov",
-        "Dec",
-    ]
-
     for node in after_nodes:
-        if node.name == "p":
-            txt = node.get_text(strip=True)
-            if any(m in txt for m in months):
+        if node.tag == "p":
+            txt = get_text(node, "")
+            if any(m in txt for m in MONTHS):
                 date = txt
                 break
 
-    allowed = {"p", "h2", "h3", "pre", "div"}
-
     clean_nodes = []
     for node in after_nodes:
-        if node.name not in allowed:
+        if node.tag not in ALLOWED_TAGS:
             continue
 
-        if node.find("i", class_="bi-twitter") or node.find("i", class_="bi-linkedin"):
+        if SHARE_ICONS_XPATH(node):
             continue
 
         clean_nodes.append(node)
 
-    html_content = "".join(str(x) for x in clean_nodes)
-    paragraphs = [clean_text(x.get_text(" ", strip=True)) for x in clean_nodes]
+    html_content = "".join(outer_html(x) for x in clean_nodes)
+    paragraphs = [clean_text(get_text(x)) for x in clean_nodes]
     paragraphs = dedupe_paragraphs(paragraphs)
     text_content = "\n".join(paragraphs)
 
@@ -133,6 +116,16 @@ def extract_article(html):
     }
 
 
+def build_record(entry, html_text):
+    if html_text is None:
+        return None
+    return {
+        "url": entry["url"],
+        "topics": entry.get("topics", []),
+        **extract_article(html_text),
+    }
+
+
 def load_urls():
     if not URLS_PATH.exists():
         print("❌ URLs file not found:", URLS_PATH)
@@ -145,56 +138,115 @@ def load_urls():
 
 
 def main():
-    urls = load_urls()
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="serve pages from data/raw/archive (no network); rewrites the output "
+        "from index 0 and leaves the frontier alone",
+    )
+    parser.add_argument(
+        "--redrive",
+        action="store_true",
+        help="retry only the URLs from the dead-letter file",
+    )
+    parser.add_argument(
+        "--worker",
+        help="worker name: processes/machines share the frontier "
+        "(CRAWL_FRONTIER_DB) through leases; output goes to <OUT>.<name>.jsonl",
+    )
+    args = parser.parse_args()
+    if args.worker and args.replay:
+        parser.error("--worker cannot be combined with --replay (no frontier)")
+    out_path = worker_output(OUT_PATH, args.worker)
+
+    dead_letter = None if args.replay else DeadLetterQueue(FRONTIER_SOURCE)
+    urls = dead_letter.take() if args.redrive else load_urls()
     if not urls:
         print("No URLs loaded.")
         return
 
     total = len(urls)
-    state = load_state()
-    start_index = state.get("next_index", 0)
-    print(f"→ Resuming from index {start_index} / {total}")
-
-    s = make_session()
-    added_total = 0
-    f = OUT_PATH.open("a", encoding="utf-8")
-
-    for i in range(start_index, total):
-        entry = urls[i]
-        url = entry["url"]
-
-        print(f"\n→ [{i+1}/{total}] Fetching {url}")
-
-        delay = 0.5
-        while True:
-            try:
-                r = s.get(url, timeout=30)
-                r.raise_for_status()
-                break
-            except Exception as e:
-                print(f"⚠ Fetch error: {e} | retry in {delay}s")
-                time.sleep(delay)
-                delay = min(delay + 0.5, 3.0)
-
-        article = extract_article(r.text)
-
-        record = {
-            "url": url,
-            "topics": entry.get("topics", []),
-            **article,
-        }
-
+    if args.replay:
+        frontier = None
+        batches = [urls]
+    elif args.redrive:
+        print(f"→ Re-driving {total} dead-lettered URLs")
+        frontier = Frontier(FRONTIER_SOURCE, owner=args.worker)
+        batches = [urls]
+    else:
+        frontier = Frontier(FRONTIER_SOURCE, owner=args.worker)
+        by_url = {entry["url"]: entry for entry in urls}
+        if frontier.add(by_url) == len(by_url):
+            # first run on the frontier: carry over the old next_index
+            next_index = load_state().get("next_index", 0)
+            frontier.mark_done([entry["url"] for entry in urls[:next_index]])
+        counts = frontier.counts()
+        print(
+            f"→ Frontier: {counts.get('done', 0)} done, "
+            f"{counts.get('pending', 0)} pending / {total}"
+        )
+        batches = frontier.batches(by_url)
+
+    added = {"total": 0}
+    f = out_path.open("w" if args.replay else "a", encoding="utf-8")
+
+    def on_result(i, entry, record):
+        if record is None:
+            print(f"✖ failed: {entry['url']}")
+            if frontier:
+                frontier.fail(entry["url"], "fetch_or_extract_error")
+            return
+
+        added["total"] += 1
+        print(f"→ [{added['total']}] {entry['url']}")
+        record["fingerprint"] = record_fingerprint(record, FINGERPRINT_FIELDS)
         f.write(json.dumps(record, ensure_ascii=False) + "\n")
-        added_total += 1
-
-        save_state({"next_index": i + 1})
-        time.sleep(0.5)
-
-    f.close()
+        f.flush()
+
+        if frontier:
+            frontier.complete(entry["url"], record["fingerprint"])
+
+    engine = CrawlEngine(
+        concurrency=8,
+        per_host=4,
+        timeout=30,
+        max_retries=MAX_RETRIES,
+        rate=AIMDRateController(initial_rate=2.0),
+        cache=(
+            HttpCache(
+                FRONTIER_SOURCE,
+                code_version(__file__),
+                ok=lambda r: bool(r.get("text_content")),
+            )
+            if USE_HTTP_CACHE
+            else None
+        ),
+        archive=ResponseArchive(),
+        replay=args.replay,
+        dead_letter=dead_letter,
+        telemetry=CrawlTelemetry(FRONTIER_SOURCE, worker=args.worker),
+    )
+    try:
+        # the heartbeat renews our leases; a dead worker's leases expire
+        with frontier.keep_leases() if frontier else nullcontext():
+            for batch in batches:
+                engine.crawl(batch, build_record, on_result)
+    finally:
+        f.close()
+        # a worker appends its file to the main output; a URL fetched again
+        # (lastmod moved forward) keeps only its latest record
+        deduped = finish_output(OUT_PATH, args.worker)
+        if deduped:
+            print(f"→ Dropped superseded records: {deduped}")
+        if frontier:
+            if frontier.reassigned:
+                print(f"→ Taken over from expired leases: {frontier.reassigned}")
+            frontier.close()
+    added_total = added["total"]
 
     print(f"\n✔ DONE: total saved: {added_total}")
     print(f"→ Output: {OUT_PATH}")
-    print(f"→ State saved: {STATE_PATH}")
 
 
 if __name__ == "__main__":
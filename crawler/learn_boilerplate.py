@@ -0,0 +1,110 @@
+"""
+Learns cross-page boilerplate per source: normalized lines that repeat on
+many pages of one source (footers, navigation, newsletter / contact blurbs)
+and so slip past the hand-written SKIP_LINES / BLACKLIST_PHRASES.
+
+    python crawler/learn_boilerplate.py --source eu_ds
+    python crawler/learn_boilerplate.py --source digwatch --min-pages 20 --show 40
+
+A line is boilerplate when it occurs on at least --min-pages pages and on at
+least --min-share of the source's pages. The table goes to
+data/processed/boilerplate/<source>.json (crawler/boilerplate.py,
+LearnedBoilerplate). un_ode_clean.py and the EU DS, ITU and chunk_updates_v1
+chunkers drop those lines. The JSON can be edited by hand; a line removed
+from "lines" is kept again.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from crawler.boilerplate import (  # noqa: E402
+    MIN_PAGES,
+    MIN_SHARE,
+    LearnedBoilerplate,
+    learn_lines,
+)
+
+# crawler izlaz po izvoru (isti fajlovi iz kojih čitaju cleaner / chunkeri)
+SOURCES = {
+    "eu_ds": {
+        "input": ROOT
+        / "scripts"
+        / "eu_digital_strategy"
+        / "eu_news_FULL_REBUILT.jsonl",
+        "field": "content",
+    },
+    "itu": {
+        "input": ROOT / "scripts" / "itu" / "itu_all_clean.jsonl",
+        "field": "content",
+    },
+    "un": {
+        "input": ROOT / "scripts" / "un" / "un_ode_news_full.jsonl",
+        "field": "text",
+    },
+    # paragrafi chunk_updates_v1 iz raw store-a
+    "digwatch": {"input": None},
+}
+
+
+def jsonl_pages(path, field):
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                obj = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            text = obj.get(field) or ""
+            if text.strip():
+                yield text.split("\n")
+
+
+def digwatch_pages():
+    sys.path.append(str(ROOT / "chunker"))
+    from chunk_updates_v1 import extract_chunks_from_html
+
+    from crawler.raw_store import iter_raw_updates
+
+    for post in iter_raw_updates():
+        html_body = (post.get("content") or {}).get("rendered") or ""
+        paras = [c["paragraph_text"] for c in extract_chunks_from_html(html_body)]
+        if paras:
+            yield paras
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--source", choices=sorted(SOURCES), required=True)
+    parser.add_argument("--min-pages", type=int, default=MIN_PAGES)
+    parser.add_argument("--min-share", type=float, default=MIN_SHARE)
+    parser.add_argument("--show", type=int, default=20, help="koliko linija ispisati")
+    args = parser.parse_args()
+
+    cfg = SOURCES[args.source]
+    if cfg["input"] is None:
+        pages = digwatch_pages()
+    elif cfg["input"].exists():
+        pages = jsonl_pages(cfg["input"], cfg["field"])
+    else:
+        print(f"❌ Nema ulaza: {cfg['input']}")
+        return
+
+    n, lines = learn_lines(pages, args.min_pages, args.min_share)
+    path = LearnedBoilerplate.save(
+        args.source, n, lines, args.min_pages, args.min_share
+    )
+
+    print(f"{args.source}: {n} strana → {len(lines)} boilerplate linija → {path}")
+    for line, count in list(lines.items())[: args.show]:
+        print(f"  {count:>6}  {line[:100]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Adaptive per-host rate controller (AIMD) shared by all crawlers.
+
+Every host starts at `initial_rate` requests/second. While the host answers
+quickly the rate grows additively (+increase per fast response); on 429,
+Retry-After or 5xx it is cut multiplicatively (×decrease) and Retry-After
+pushes the next allowed request out. Callers reserve a slot before each
+request (wait() for plain scripts, acquire() inside asyncio) and report the
+outcome with on_response()/on_error().
+
+HostBudget caps the requests per host in a rolling window. The scheduler
+(crawler/scheduler.py) hands the remaining budget to its fetch stages in the
+CRAWL_HOST_BUDGET environment variable; a controller created there picks it up
+and holds a request back until the host's window has room, so a single run
+cannot go over the budget either.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+BUDGET_ENV = "CRAWL_HOST_BUDGET"
+
+
+def parse_retry_after(value):
+    """Retry-After header (seconds or HTTP-date) → seconds, or None."""
+    if not value:
+        return None
+    value = str(value).strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class HostBudget:
+    """Requests per host in a rolling window: ledger of [timestamp, count]."""
+
+    def __init__(self, ledger=None, window=3600, budgets=None, default=None):
+        """
+        budgets – {host: requests per window}; other hosts get `default`
+                  (None = no limit)
+        """
+        self.ledger = ledger if ledger is not None else {}
+        self.window = window
+        self.budgets = budgets or {}
+        self.default = default
+        self._lock = threading.Lock()
+        self._held = set()
+
+    @classmethod
+    def from_env(cls):
+        """Budget handed over by the scheduler, or None."""
+        value = os.environ.get(BUDGET_ENV)
+        if not value:
+            return None
+        data = json.loads(value)
+        return cls(data["ledger"], data["window"], data["budgets"], data["default"])
+
+    def to_env(self):
+        return json.dumps(
+            {
+                "ledger": self.ledger,
+                "window": self.window,
+                "budgets": self.budgets,
+                "default": self.default,
+            }
+        )
+
+    def _entries(self, host, now):
+        entries = [e for e in self.ledger.get(host, []) if e[0] > now - self.window]
+        self.ledger[host] = entries
+        return entries
+
+    def book(self, host, requests, now=None):
+        now = now or time.time()
+        self._entries(host, now).append([now, requests])
+
+    def used(self, host, now=None):
+        return sum(n for _, n in self._entries(host, now or time.time()))
+
+    def wait(self, hosts, now=None):
+        """Seconds until every host has budget left (0 = can run now)."""
+        now = now or time.time()
+        wait = 0
+        for host in hosts:
+            budget = self.budgets.get(host, self.default)
+            if budget is None:
+                continue
+            entries = self._entries(host, now)
+            used = sum(n for _, n in entries)
+            # oldest bookings leave the window first
+            for ts, n in entries:
+                if used < budget:
+                    break
+                used -= n
+                wait = max(wait, ts + self.window - now)
+        return wait
+
+    def reserve(self, host) -> float:
+        """Books one request for host; returns how long to hold it back."""
+        with self._lock:
+            now = time.time()
+            delay = self.wait([host], now)
+            self.book(host, 1, now + delay)
+            if not delay:
+                self._held.discard(host)
+                return 0.0
+            if host in self._held:
+                return delay
+            self._held.add(host)
+        print(f"⏸ {host}: request budget used up, holding requests {delay:.0f}s")
+        return delay
+
+
+class AIMDRateController:
+    def __init__(
+        self,
+        initial_rate=1.0,
+        min_rate=0.05,
+        max_rate=8.0,
+        increase=0.1,
+        decrease=0.5,
+        fast_latency=2.0,
+        max_events=1000,
+        budget=None,
+    ):
+        """
+        budget – HostBudget checked before every request (default: the one
+                 the scheduler passes in CRAWL_HOST_BUDGET, if any)
+        """
+        self.budget = budget if budget is not None else HostBudget.from_env()
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.fast_latency = fast_latency
+        self.max_events = max_events
+
+        self._hosts = {}
+        self._events = []
+        self._lock = threading.Lock()
+
+    def _host(self, host):
+        if host not in self._hosts:
+            self._hosts[host] = {
+                "rate": self.initial_rate,
+                "next_at": 0.0,
+                "requests": 0,
+                "backoffs": 0,
+            }
+        return self._hosts[host]
+
+    def reserve(self, host) -> float:
+        """Books the next slot for host and returns how long to wait for it."""
+        with self._lock:
+            h = self._host(host)
+            now = time.monotonic()
+            slot = max(now, h["next_at"])
+            h["next_at"] = slot + 1.0 / h["rate"]
+            h["requests"] += 1
+        delay = slot - now
+        if self.budget is not None:
+            delay = max(delay, self.budget.reserve(host))
+        return delay
+
+    def wait(self, host):
+        time.sleep(self.reserve(host))
+
+    async def acquire(self, host):
+        await asyncio.sleep(self.reserve(host))
+
+    def on_response(self, host, status, latency, retry_after=None):
+        retry_after = parse_retry_after(retry_after)
+        if status in RETRY_STATUSES or retry_after is not None:
+            self._backoff(host, f"http_{status}", retry_after)
+        elif status < 400 and latency <= self.fast_latency:
+            with self._lock:
+                h = self._host(host)
+                h["rate"] = min(self.max_rate, h["rate"] + self.increase)
+
+    def on_error(self, host, error=None):
+        self._backoff(host, f"error: {error}" if error else "error", None)
+
+    def _backoff(self, host, reason, retry_after):
+        with self._lock:
+            h = self._host(host)
+            old = h["rate"]
+            h["rate"] = max(self.min_rate, old * self.decrease)
+            h["backoffs"] += 1
+
+            pause = retry_after if retry_after is not None else 1.0 / h["rate"]
+            h["next_at"] = max(h["next_at"], time.monotonic() + pause)
+
+            self._events.append(
+                {
+                    "host": host,
+                    "at": datetime.now(timezone.utc).isoformat(),
+                    "reason": reason,
+                    "old_rate": round(old, 3),
+                    "new_rate": round(h["rate"], 3),
+                    "retry_after": retry_after,
+                }
+            )
+            del self._events[: -self.max_events]
+
+        print(
+            f"⏳ {host}: {reason} → rate {old:.2f} → {h['rate']:.2f} req/s"
+            + (f", Retry-After {retry_after:.0f}s" if retry_after else "")
+        )
+
+    def rate(self, host) -> float:
+        with self._lock:
+            return self._host(host)["rate"]
+
+    @property
+    def events(self):
+        with self._lock:
+            return list(self._events)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                host: {
+                    "rate": round(h["rate"], 3),
+                    "requests": h["requests"],
+                    "backoffs": h["backoffs"],
+                }
+                for host, h in self._hosts.items()
+            }
@@ -0,0 +1,324 @@
+"""
+Append-only, segmented JSONL store for raw WordPress posts (DigWatch updates
+and other crawler/wordpress.py sources).
+
+Each post version is one JSON line appended to the current segment
+(segment-00001.jsonl, ...; a new segment starts after SEGMENT_BYTES). A small
+SQLite index keeps, per post id, where its LATEST version lives and its
+`modified` value, so:
+
+  - a crawl page costs one append + one index transaction (no rewrite of the
+    whole archive like updates_all.json used to)
+  - readers stream posts one by one with iter_posts()
+  - superseded versions are dropped by compact(), which rewrites only the live
+    lines into fresh segments
+  - writers (the sync, push_ingest threads, compact) may run in parallel, in
+    several processes: each write holds SQLite's write lock on the index
+    (BEGIN IMMEDIATE) while it appends, so offsets are taken at the real end
+    of the segment and never shared by two posts
+
+Layout (data/raw/updates_store/):
+    index.sqlite
+    segment-00001.jsonl
+    ...
+"""
+
+import json
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_DIR = ROOT / "data" / "raw" / "updates_store"
+LEGACY_JSON = ROOT / "data" / "raw" / "updates_all.json"
+
+SEGMENT_BYTES = 64 * 1024 * 1024
+WRITE_TIMEOUT = 120  # s čekanja na write lock drugog pisca
+READ_BYTES = 1024 * 1024
+_SEPARATOR_RE = re.compile(r"[\s,]*")
+COMPACT_DEAD_RATIO = 0.3
+
+
+class SegmentedJsonlStore:
+    def __init__(self, path=DEFAULT_DIR, segment_bytes=SEGMENT_BYTES):
+        self.dir = Path(path)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+
+        self.conn = sqlite3.connect(
+            str(self.dir / "index.sqlite"), timeout=WRITE_TIMEOUT
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS posts (
+                id       INTEGER PRIMARY KEY,
+                segment  INTEGER,
+                offset   INTEGER,
+                length   INTEGER,
+                modified TEXT
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key   TEXT PRIMARY KEY,
+                value TEXT
+            );
+            """
+        )
+        self.conn.commit()
+        self._segment = int(self._meta("segment") or 1)
+
+    def _meta(self, key, value=None):
+        if value is None:
+            row = self.conn.execute(
+                "SELECT value FROM meta WHERE key = ?", (key,)
+            ).fetchone()
+            return row[0] if row else None
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value))
+        )
+
+    def _segment_path(self, n):
+        return self.dir / f"segment-{n:05d}.jsonl"
+
+    @contextmanager
+    def _writing(self):
+        """
+        Exclusive write transaction across threads and processes: BEGIN
+        IMMEDIATE blocks until no other writer holds the index. The current
+        segment is re-read inside it (another writer may have rolled over).
+        """
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._segment = int(self._meta("segment") or 1)
+            yield
+        except BaseException:
+            # already appended lines stay as unindexed (dead) bytes
+            self.conn.rollback()
+            raise
+        self.conn.commit()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+
+    def ids(self):
+        return {r[0] for r in self.conn.execute("SELECT id FROM posts")}
+
+    def max_modified(self):
+        return self.conn.execute("SELECT MAX(modified) FROM posts").fetchone()[0]
+
+    def put_many(self, posts):
+        """
+        Appends posts that are new or whose `modified` changed.
+        Returns (added, updated); unchanged posts are not written again.
+        """
+        posts = list(posts)
+        ids = [p.get("id") for p in posts if isinstance(p.get("id"), int)]
+        added = updated = 0
+
+        with self._writing():
+            known = {}
+            for i in range(0, len(ids), 500):
+                chunk = ids[i : i + 500]
+                marks = ",".join("?" * len(chunk))
+                for pid, modified in self.conn.execute(
+                    f"SELECT id, modified FROM posts WHERE id IN ({marks})", chunk
+                ):
+                    known[pid] = modified
+
+            path = self._segment_path(self._segment)
+            if path.exists() and path.stat().st_size >= self.segment_bytes:
+                self._segment += 1
+                self._meta("segment", self._segment)
+                path = self._segment_path(self._segment)
+
+            with path.open("ab") as f:
+                f.seek(0, os.SEEK_END)
+                for raw in posts:
+                    pid = raw.get("id")
+                    if not isinstance(pid, int):
+                        continue
+                    if pid in known and known[pid] == raw.get("modified"):
+                        continue
+
+                    line = (json.dumps(raw, ensure_ascii=False) + "\n").encode("utf-8")
+                    offset = f.tell()
+                    f.write(line)
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO posts VALUES (?, ?, ?, ?, ?)",
+                        (pid, self._segment, offset, len(line), raw.get("modified")),
+                    )
+                    if pid in known:
+                        updated += 1
+                    else:
+                        added += 1
+                    known[pid] = raw.get("modified")
+
+        return added, updated
+
+    def get(self, pid):
+        row = self.conn.execute(
+            "SELECT segment, offset, length FROM posts WHERE id = ?", (pid,)
+        ).fetchone()
+        if not row:
+            return None
+        with self._segment_path(row[0]).open("rb") as f:
+            f.seek(row[1])
+            return json.loads(f.read(row[2]))
+
+    def iter_posts(self):
+        """Streams the latest version of every post, in storage order."""
+        rows = self.conn.execute(
+            "SELECT segment, offset, length FROM posts ORDER BY segment, offset"
+        )
+        current, f = None, None
+        try:
+            for segment, offset, length in rows:
+                if segment != current:
+                    if f:
+                        f.close()
+                    f = self._segment_path(segment).open("rb")
+                    current = segment
+                f.seek(offset)
+                yield json.loads(f.read(length))
+        finally:
+            if f:
+                f.close()
+
+    def dead_ratio(self):
+        live = self.conn.execute("SELECT COALESCE(SUM(length), 0) FROM posts")
+        live = live.fetchone()[0]
+        total = sum(p.stat().st_size for p in self.dir.glob("segment-*.jsonl"))
+        return 0.0 if total == 0 else 1.0 - live / total
+
+    def compact(self):
+        """Rewrites only live post versions into new segments and drops old ones."""
+        with self._writing():
+            old_segments = sorted(self.dir.glob("segment-*.jsonl"))
+            self._segment += 1
+
+            moved = []
+            out_path = self._segment_path(self._segment)
+            out = out_path.open("ab")
+            try:
+                for post in self.iter_posts():
+                    line = (json.dumps(post, ensure_ascii=False) + "\n").encode("utf-8")
+                    if out.tell() >= self.segment_bytes:
+                        out.close()
+                        self._segment += 1
+                        out = self._segment_path(self._segment).open("ab")
+                    moved.append((self._segment, out.tell(), len(line), post.get("id")))
+                    out.write(line)
+            finally:
+                out.close()
+
+            self.conn.executemany(
+                "UPDATE posts SET segment = ?, offset = ?, length = ? WHERE id = ?",
+                moved,
+            )
+            self._meta("segment", self._segment)
+
+        for p in old_segments:
+            p.unlink()
+        return len(moved)
+
+    def maybe_compact(self, threshold=COMPACT_DEAD_RATIO):
+        ratio = self.dead_ratio()
+        if ratio < threshold:
+            return 0
+        print(f"Compaction: {ratio:.0%} superseded bytes → rewriting segments")
+        return self.compact()
+
+    def import_legacy(self, path=LEGACY_JSON):
+        """One-off import of the legacy updates_all.json into an empty store."""
+        if len(self) or not Path(path).exists():
+            return 0
+        added = 0
+        batch = []
+        for post in iter_json_array(path):
+            batch.append(post)
+            if len(batch) >= 1000:
+                added += self.put_many(batch)[0]
+                batch = []
+        if batch:
+            added += self.put_many(batch)[0]
+        return added
+
+    def close(self):
+        self.conn.close()
+
+
+def iter_json_array(path, read_bytes=READ_BYTES):
+    """
+    Streams the elements of a top-level JSON array file (the legacy
+    updates_all.json) without loading the whole file: the text is read in
+    blocks and decoded one element at a time with raw_decode().
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf, eof = "", False
+
+        def fill(pos):
+            nonlocal buf, eof
+            more = f.read(read_bytes)
+            eof = not more
+            buf = buf[pos:] + more
+            return 0
+
+        pos = fill(0)
+        pos = _SEPARATOR_RE.match(buf, pos).end()
+        if not buf.startswith("[", pos):
+            raise ValueError(f"{path}: expected a JSON array")
+        pos += 1
+        while True:
+            pos = _SEPARATOR_RE.match(buf, pos).end()
+            if pos == len(buf):
+                if eof:
+                    raise ValueError(f"{path}: unterminated JSON array")
+                pos = fill(pos)
+                continue
+            if buf[pos] == "]":
+                return
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                pos = fill(pos)
+                continue
+            if end == len(buf) and not eof:
+                pos = fill(pos)  # a number may continue in the next block
+                continue
+            yield obj
+            pos = end
+
+
+def open_updates_store(path=DEFAULT_DIR, legacy=LEGACY_JSON):
+    """
+    WordPress post store (DigWatch by default); imports the legacy JSON dump
+    the first time it is opened (legacy=None: nothing to import).
+    """
+    store = SegmentedJsonlStore(path)
+    imported = store.import_legacy(legacy) if legacy else 0
+    if imported:
+        print(f"Imported {imported} posts from {Path(legacy).name} into {store.dir}")
+    return store
+
+
+def iter_raw_updates(path=DEFAULT_DIR, legacy=LEGACY_JSON):
+    """
+    Streams raw WordPress posts (DigWatch by default) from the segmented store
+    when it exists, otherwise from the legacy updates_all.json.
+    """
+    path = Path(path)
+    if (path / "index.sqlite").exists():
+        store = SegmentedJsonlStore(path)
+        try:
+            yield from store.iter_posts()
+        finally:
+            store.close()
+        return
+
+    if legacy and Path(legacy).exists():
+        yield from iter_json_array(legacy)
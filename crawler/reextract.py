@@ -0,0 +1,288 @@
+"""
+Parallel re-extraction of a source's articles from the response archive.
+
+Every crawler persists each fetched page (200 responses, compressed and
+content-addressed) in data/raw/archive/, next to the clean JSONL it writes.
+After an extractor fix (an XPath, a stop phrase...) the clean output can be
+rebuilt from those pages instead of re-crawling:
+
+    python crawler/reextract.py --source eu_ds
+    python crawler/reextract.py --source itu --workers 8 --limit 500
+    python crawler/reextract.py --source ietf --output /tmp/ietf_new.jsonl
+
+The source's URL list is split over a process pool. Each worker opens the
+archive itself, so decompression and parsing run on all cores. Records are
+written in input order, with the same fields, fingerprints and failure
+records as the crawler's --replay mode. The output (by default the crawler's
+own output file) is replaced atomically at the end. Unchanged fingerprints
+keep downstream chunking / ingest skipping those articles, and the summary
+shows how many articles the extractor change actually touched.
+
+A URL that is not re-extracted keeps its previous record from the crawler's
+output: no archived page, beyond --limit, or no record from the extractor.
+Records of URLs no longer in the input are kept at the end.
+
+EU DS and ITU pages fetched with STREAM_FETCH are archived as they were read,
+up to the article end, and marked as cut off (crawler/archive.py). Their
+extractors never look past that point, so a fix inside the article (e.g.
+XPATH_UPDATED in novo_crawlovanje.py) is re-extracted from them as well. A
+change that needs the rest of the page (dropping a STOP_PHRASES entry) needs
+one crawl with STREAM_FETCH = False first.
+
+The frontier, HTTP cache and dead-letter files are not touched.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from crawler.archive import ResponseArchive  # noqa: E402
+from crawler.fingerprint import record_fingerprint  # noqa: E402
+
+CHUNKSIZE = 16  # stranica po zadatku procesa
+
+
+class Source:
+    def __init__(self, load_items, extract, output, streamed=False):
+        """
+        load_items – () → input items in crawler order (dicts with "url")
+        extract    – (item, html or None) → clean record, or None when the
+                     crawler writes nothing for the item
+        output     – the crawler's clean JSONL
+        streamed   – the crawler uses STREAM_FETCH: pages archived as cut off
+                     at the article end are re-extracted too
+        """
+        self.load_items = load_items
+        self.extract = extract
+        self.output = output
+        self.streamed = streamed
+
+
+def read_jsonl(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def eu_ds():
+    from scripts.eu_digital_strategy import novo_crawlovanje as m
+
+    cwd = ROOT / "scripts" / "eu_digital_strategy"
+
+    def load_items():
+        raw = json.loads((cwd / m.INPUT_URLS_FILE).read_text(encoding="utf-8"))
+        return raw.get("items", [])
+
+    def extract(obj, html_text):
+        try:
+            record = m.extract_article(dict(obj), html_text)
+        except Exception:
+            record = m.extract_article(dict(obj), None)
+            record["error"] = "extract_error"
+        if record["success"]:
+            record["fingerprint"] = record_fingerprint(record, m.FINGERPRINT_FIELDS)
+        return record
+
+    return Source(load_items, extract, cwd / m.OUTPUT_FILE, streamed=True)
+
+
+def itu():
+    from scripts.itu import itu_news_full_crawling_state_najnovnije as m
+
+    cwd = ROOT / "scripts" / "itu"
+    extract_article = m.make_extractor(None)  # bez browser fallback-a, kao --replay
+
+    def extract(obj, html_text):
+        try:
+            record = extract_article(obj, html_text)
+        except Exception:
+            record = {
+                "url": obj["url"],
+                "success": False,
+                "error": "extract_error",
+                "date": "",
+                "content": "",
+            }
+        if record["success"]:
+            record["fingerprint"] = record_fingerprint(record, m.FINGERPRINT_FIELDS)
+        return record
+
+    return Source(
+        lambda: read_jsonl(cwd / m.INPUT_FILE),
+        extract,
+        cwd / m.OUTPUT_FILE,
+        streamed=True,
+    )
+
+
+def ietf():
+    from crawler import ietf_collect_articles_full as m
+
+    def extract(entry, html_text):
+        try:
+            record = m.build_record(entry, html_text)
+        except Exception:
+            return None
+        if record is not None:
+            record["fingerprint"] = record_fingerprint(record, m.FINGERPRINT_FIELDS)
+        return record
+
+    return Source(m.load_urls, extract, m.OUT_PATH)
+
+
+def un():
+    from scripts.un import un_ode_news_crawl_full as m
+
+    cwd = ROOT / "scripts" / "un"
+
+    def load_items():
+        return json.loads((cwd / m.INPUT_URLS).read_text(encoding="utf-8"))
+
+    def extract(item, html_text):
+        try:
+            record = m.crawl_article(item, html_text)
+        except Exception:
+            return None
+        if record:
+            record["fingerprint"] = record_fingerprint(record, m.FINGERPRINT_FIELDS)
+        return record
+
+    return Source(load_items, extract, cwd / m.OUTPUT_FILE)
+
+
+SOURCES = {"eu_ds": eu_ds, "itu": itu, "ietf": ietf, "un": un}
+
+# ---- worker process ----
+
+_worker = {}
+
+
+def _init_worker(name):
+    _worker["source"] = SOURCES[name]()
+    _worker["archive"] = ResponseArchive()
+
+
+def _reextract(item):
+    """(record or None, page found in the archive, page cut off at article end)"""
+    source = _worker["source"]
+    r = _worker["archive"].lookup(item["url"], truncated=source.streamed)
+    if r is None or r.status_code != 200:
+        return None, False, False
+    return source.extract(item, r.text), True, r.truncated
+
+
+# ---- main ----
+
+
+def previous_records(path):
+    """{url: record} from the crawler's output; a later line wins."""
+    records = {}
+    if not path.exists():
+        return records
+    for record in read_jsonl(path):
+        if record.get("url"):
+            records[record["url"]] = record
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--source", choices=sorted(SOURCES), required=True)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--limit",
+        type=int,
+        help="re-ekstrahuje samo prvih N URL-ova (ostali zadržavaju prethodni zapis)",
+    )
+    parser.add_argument(
+        "--output", type=Path, help="izlazni JSONL (podrazumevano izlaz crawlera)"
+    )
+    args = parser.parse_args()
+
+    source = SOURCES[args.source]()
+    items = [item for item in source.load_items() if item.get("url")]
+    todo = items[: args.limit] if args.limit else items
+    if not todo:
+        print("Nema URL-ova za re-ekstrakciju.")
+        return
+
+    output = args.output or source.output
+    # prethodni zapisi iz izlaza crawlera: ostaju za sve što se ne re-ekstrahuje
+    before = previous_records(source.output)
+    tmp = output.with_name(output.name + ".tmp")
+
+    print(f"Re-ekstrakcija {args.source}: {len(todo)} URL-ova, {args.workers} procesa")
+    started = time.monotonic()
+    stats = {
+        "written": 0,
+        "ok": 0,
+        "missing": 0,
+        "cut": 0,
+        "kept": 0,
+        "changed": 0,
+        "new": 0,
+    }
+    written = set()
+
+    def write(out, record):
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        written.add(record.get("url"))
+        stats["written"] += 1
+
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        initializer=_init_worker,
+        initargs=(args.source,),
+    ) as pool, open(tmp, "w", encoding="utf-8") as out:
+        results = pool.map(_reextract, todo, chunksize=CHUNKSIZE)
+        for n, (item, (record, archived, cut)) in enumerate(zip(todo, results), 1):
+            url = item["url"]
+            if n % 500 == 0:
+                print(f"  {n}/{len(todo)}")
+            if url in written:
+                continue  # isti URL dvaput u ulazu: jedan zapis
+            if not archived:
+                stats["missing"] += 1
+            stats["cut"] += cut
+            if not archived or record is None:
+                if url in before and url not in written:
+                    write(out, before[url])
+                    stats["kept"] += 1
+                continue
+            write(out, record)
+            if record.get("fingerprint"):
+                stats["ok"] += 1
+                if url not in before:
+                    stats["new"] += 1
+                elif before[url].get("fingerprint") != record["fingerprint"]:
+                    stats["changed"] += 1
+
+        # van --limit i URL-ovi kojih više nema u ulazu: prethodni zapis ostaje
+        for url in [item["url"] for item in items[len(todo) :]] + list(before):
+            if url in before and url not in written:
+                write(out, before[url])
+                stats["kept"] += 1
+
+    tmp.replace(output)
+    elapsed = time.monotonic() - started
+    print(
+        f"✔ {output}: {stats['written']} zapisa, re-ekstrahovano "
+        f"{len(todo) - stats['missing']} ({stats['ok']} uspešnih) za {elapsed:.1f}s "
+        f"({len(todo) / max(elapsed, 1e-9):.0f} strana/s)"
+    )
+    print(
+        f"  izmenjen fingerprint: {stats['changed']} | novi: {stats['new']} "
+        f"| nema u arhivi: {stats['missing']} "
+        f"| iz strane skraćene na kraju članka: {stats['cut']} "
+        f"| prethodni zapis zadržan: {stats['kept']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,427 @@
+"""
+Long-running crawl scheduler with per-source freshness policies.
+
+    python crawler/scheduler.py                     # daemon, all sources
+    python crawler/scheduler.py --source itu --source un
+    python crawler/scheduler.py --once              # every source once, then exit
+
+Each entry in PIPELINES is one source:
+
+    discover    – finds new / updated URLs (sitemaps, feeds, listing pages);
+                  discover_urls.py refreshes the frontier with lastmod, so the
+                  crawler claims changed and newly found URLs first
+    fetch       – the article crawler (only pending URLs are fetched)
+    downstream  – normalize / chunk / ingest, run only when the fetch changed
+                  content; the chunkers and ingest scripts then skip unchanged
+                  articles by fingerprint
+    frontier    – frontier source: "changed" = rows whose content hash changed
+                  during the fetch (Frontier.changed_since)
+    watch       – sources without a frontier (UN: its crawler re-fetches the
+                  whole URL list with conditional GETs, so lastmod-based
+                  priority does not apply to it): files / directories whose size
+                  or mtime change means new content; a watched .jsonl crawler
+                  output is compared by the fingerprints of its records, since
+                  the crawler rewrites it on every run
+    telemetry   – CrawlTelemetry name of the fetch (requests per host)
+    hosts       – hosts the crawl hits, for the request budgets
+    interval    – (min, max) seconds between two runs
+
+Freshness policy: a run that found changed content halves the source's
+interval (down to min), a run without changes doubles it (up to max), so busy
+sources are polled often and quiet ones back off. A failed stage keeps the
+interval and retries after `min`.
+
+Request budgets: HOST_BUDGETS caps the requests per host in a rolling hour.
+After each fetch the per-host request counts are read from the telemetry dump
+(data/raw/telemetry/<name>.json) and booked; a source whose hosts have no
+budget left is deferred until the window has room again. Inside a run the
+budget is enforced too: discover and fetch get the ledger in CRAWL_HOST_BUDGET
+(crawler/rate.py HostBudget), and the crawlers' AIMD rate controllers and the
+WordPress sync hold requests back once a host has used it up.
+
+Stages run one after another as subprocesses, each in the folder its script
+expects (several scripts use paths relative to their own folder). A tuple in
+`downstream` is one stage whose commands run side by side (the DigWatch
+chunker follows the normalizer's output while it is being written). Next run,
+interval, budget ledger and the last result per source are kept in
+data/raw/scheduler_state.json, so a restart continues where it left off.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from crawler.frontier import Frontier  # noqa: E402
+from crawler.rate import BUDGET_ENV, HostBudget  # noqa: E402
+from crawler.telemetry import DEFAULT_DIR as TELEMETRY_DIR  # noqa: E402
+
+STATE_PATH = ROOT / "data" / "raw" / "scheduler_state.json"
+
+PY = sys.executable
+MINUTE = 60
+HOUR = 60 * MINUTE
+
+TICK = 30  # seconds between checks while nothing is due
+STAGE_TIMEOUT = 6 * HOUR
+BUDGET_WINDOW = HOUR
+DEFAULT_BUDGET = 3000  # requests per host per BUDGET_WINDOW
+HOST_BUDGETS = {
+    "dig.watch": 2000,
+    "digital-strategy.ec.europa.eu": 1500,
+    "www.itu.int": 1500,
+    "www.ietf.org": 1500,
+    "www.un.org": 1000,
+}
+
+
+def script(path, *args, cwd=""):
+    return {"cwd": cwd, "args": [PY, str(ROOT / path), *args]}
+
+
+def module(name, *args):
+    return {"cwd": "", "args": [PY, "-m", name, *args]}
+
+
+PIPELINES = {
+    "digwatch": {
+        # REST incremental sync je sam po sebi discovery
+        "fetch": script("crawler/collect_updates_full.py", "--incremental"),
+        "downstream": [
+            (
+                script("scripts/digwatch/normalize_digwatch.py"),
+                script("chunker/chunk_digwatch_v2_pro.py", "--follow", cwd="chunker"),
+            ),
+            module("scripts.ingest_digwatch_unified"),
+        ],
+        "watch": ["data/raw/updates_store"],
+        "telemetry": "digwatch",
+        "hosts": ["dig.watch"],
+        "interval": (30 * MINUTE, 12 * HOUR),
+    },
+    "eu_ds": {
+        "discover": script("crawler/discover_urls.py", "--source", "eu_ds"),
+        "fetch": script(
+            "scripts/eu_digital_strategy/novo_crawlovanje.py",
+            cwd="scripts/eu_digital_strategy",
+        ),
+        "downstream": [
+            script("crawler/learn_boilerplate.py", "--source", "eu_ds"),
+            script("chunker/chunk_eu_news_v3_pro.py"),
+            module("scripts.ingest_eu_digital"),
+        ],
+        "frontier": "eu_ds",
+        "telemetry": "eu_ds",
+        "hosts": ["digital-strategy.ec.europa.eu"],
+        "interval": (HOUR, 24 * HOUR),
+    },
+    "itu": {
+        "discover": script("crawler/discover_urls.py", "--source", "itu"),
+        "fetch": script(
+            "scripts/itu/itu_news_full_crawling_state_najnovnije.py",
+            cwd="scripts/itu",
+        ),
+        "downstream": [
+            script("crawler/learn_boilerplate.py", "--source", "itu"),
+            script("chunker/chunk_itu_news_v3_pro.py"),
+            script("scripts/itu/normalize_itu_categories.py", cwd="scripts/itu"),
+            module("scripts.ingest_itu_unified"),
+        ],
+        "frontier": "itu",
+        "telemetry": "itu",
+        "hosts": ["www.itu.int"],
+        "interval": (HOUR, 24 * HOUR),
+    },
+    "ietf": {
+        "discover": script("crawler/ietf_collect_urls.py"),
+        "fetch": script("crawler/ietf_collect_articles_full.py"),
+        "downstream": [
+            script("scripts/ietf/normalize_ietf_categories.py", cwd="scripts/ietf"),
+            script("chunker/chunk_ietf_v2_pro.py", cwd="chunker"),
+            module("scripts.ingest_ietf_unified"),
+        ],
+        "frontier": "ietf",
+        "telemetry": "ietf",
+        "hosts": ["www.ietf.org"],
+        "interval": (2 * HOUR, 48 * HOUR),
+    },
+    "un": {
+        # bez frontier-a (van --worker moda): svaki fetch prolazi celu URL listu
+        # uz 304 revalidaciju, pa lastmod prioritet ne važi; promena = novi
+        # fingerprint u izlazu ("watch")
+        "discover": script("crawler/discover_urls.py", "--source", "un"),
+        "fetch": script("scripts/un/un_ode_news_crawl_full.py", cwd="scripts/un"),
+        # chunkovi ostaju u scripts/un; filter_un.py / ingest_un_unified.py
+        # čitaju data/processed/ i za sada se pokreću ručno
+        "downstream": [
+            script("crawler/learn_boilerplate.py", "--source", "un"),
+            script("scripts/un/un_ode_clean.py", cwd="scripts/un"),
+            script("chunker/un_ode_news_chunk_v2.py", cwd="scripts/un"),
+        ],
+        "watch": ["scripts/un/un_ode_news_full.jsonl"],
+        "telemetry": "un",
+        "hosts": ["www.un.org"],
+        "interval": (2 * HOUR, 48 * HOUR),
+    },
+}
+
+
+def fingerprint_digest(path):
+    """Digest of the (url, fingerprint) pairs in a JSONL crawler output."""
+    pairs = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(record, dict):
+                pairs.add(f"{record.get('url')}\t{record.get('fingerprint')}")
+    return hashlib.sha256("\n".join(sorted(pairs)).encode("utf-8")).hexdigest()
+
+
+def signature(paths):
+    """
+    Change marker for watched files / directories: size + mtime, or the
+    record fingerprints for .jsonl outputs (same articles = no change).
+    """
+    sig = []
+    for rel in paths:
+        path = ROOT / rel
+        if path.is_dir():
+            for f in sorted(path.iterdir()):
+                if f.is_file():
+                    st = f.stat()
+                    sig.append((str(f), st.st_size, st.st_mtime_ns))
+        elif path.suffix == ".jsonl" and path.exists():
+            sig.append((str(path), fingerprint_digest(path)))
+        elif path.exists():
+            st = path.stat()
+            sig.append((str(path), st.st_size, st.st_mtime_ns))
+    return sig
+
+
+class Scheduler:
+    def __init__(self, pipelines=PIPELINES, state_path=STATE_PATH):
+        self.pipelines = pipelines
+        self.state_path = Path(state_path)
+        self.state = self._load()
+        self.budget = HostBudget(
+            self.state.setdefault("budget", {}),
+            BUDGET_WINDOW,
+            HOST_BUDGETS,
+            DEFAULT_BUDGET,
+        )
+
+    def _load(self):
+        if self.state_path.exists():
+            try:
+                return json.loads(self.state_path.read_text(encoding="utf-8"))
+            except Exception:
+                pass
+        return {"sources": {}, "budget": {}}
+
+    def save(self):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_name(self.state_path.name + ".tmp")
+        tmp.write_text(
+            json.dumps(self.state, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        os.replace(tmp, self.state_path)
+
+    def source_state(self, name):
+        lo, _ = self.pipelines[name]["interval"]
+        sources = self.state.setdefault("sources", {})
+        return sources.setdefault(name, {"next_run": 0, "interval": lo})
+
+    # ---- stages ----
+
+    def budget_env(self):
+        """
+        Environment for discover / fetch: the crawlers' rate controllers hold
+        requests back once a host's remaining budget is used up.
+        """
+        return dict(os.environ, **{BUDGET_ENV: self.budget.to_env()})
+
+    def run_stage(self, name, stage, cmd, env=None):
+        print(f"▶ {name}/{stage}: {' '.join(cmd['args'][1:])}", flush=True)
+        try:
+            proc = subprocess.run(
+                cmd["args"], cwd=ROOT / cmd["cwd"], timeout=STAGE_TIMEOUT, env=env
+            )
+        except subprocess.TimeoutExpired:
+            print(f"  ⚠ {name}/{stage}: timeout posle {STAGE_TIMEOUT}s")
+            return False
+        if proc.returncode != 0:
+            print(f"  ⚠ {name}/{stage}: exit {proc.returncode}")
+            return False
+        return True
+
+    def run_parallel(self, name, stage, cmds):
+        for cmd in cmds:
+            print(f"▶ {name}/{stage} ∥ {' '.join(cmd['args'][1:])}", flush=True)
+        procs = [subprocess.Popen(cmd["args"], cwd=ROOT / cmd["cwd"]) for cmd in cmds]
+        deadline = time.monotonic() + STAGE_TIMEOUT
+        ok = True
+        for proc in procs:
+            try:
+                code = proc.wait(timeout=max(0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+                print(f"  ⚠ {name}/{stage}: timeout posle {STAGE_TIMEOUT}s")
+                ok = False
+                continue
+            if code != 0:
+                print(f"  ⚠ {name}/{stage}: exit {code}")
+                ok = False
+        return ok
+
+    def book_requests(self, cfg, started):
+        """Books the fetch's requests per host from its telemetry dump."""
+        path = TELEMETRY_DIR / f"{cfg.get('telemetry')}.json"
+        if not cfg.get("telemetry") or not path.exists():
+            return 0
+        snap = json.loads(path.read_text(encoding="utf-8"))
+        if datetime.fromisoformat(snap["started_at"]).timestamp() < started - 1:
+            return 0  # dump from an earlier run: the fetch recorded nothing
+        total = 0
+        for host, stats in snap.get("hosts", {}).items():
+            self.budget.book(host, stats["requests"])
+            total += stats["requests"]
+        return total
+
+    def changed(self, cfg, started, before):
+        if cfg.get("frontier"):
+            frontier = Frontier(cfg["frontier"])
+            try:
+                return frontier.changed_since(started)
+            finally:
+                frontier.close()
+        return int(signature(cfg.get("watch", ())) != before)
+
+    def run_source(self, name):
+        cfg = self.pipelines[name]
+        st = self.source_state(name)
+        lo, hi = cfg["interval"]
+        started = time.time()
+        before = signature(cfg.get("watch", ()))
+
+        ok = all(
+            self.run_stage(name, stage, cfg[stage], env=self.budget_env())
+            for stage in ("discover", "fetch")
+            if cfg.get(stage)
+        )
+        requests = self.book_requests(cfg, started)
+        changed = self.changed(cfg, started, before) if ok else 0
+
+        if ok and changed:
+            ok = all(
+                (
+                    self.run_parallel(name, "downstream", cmd)
+                    if isinstance(cmd, tuple)
+                    else self.run_stage(name, "downstream", cmd)
+                )
+                for cmd in cfg.get("downstream", ())
+            )
+
+        if not ok:
+            next_in = lo
+        elif changed:
+            st["interval"] = max(lo, st["interval"] / 2)
+            next_in = st["interval"]
+        else:
+            st["interval"] = min(hi, st["interval"] * 2)
+            next_in = st["interval"]
+
+        now = time.time()
+        st.update(
+            {
+                "last_run": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "last_ok": ok,
+                "last_changed": changed,
+                "last_requests": requests,
+                "last_seconds": round(now - started, 1),
+                "next_run": now + next_in,
+            }
+        )
+        self.save()
+        print(
+            f"✔ {name}: ok={ok} | promenjeno: {changed} | zahteva: {requests} "
+            f"| sledeći za {next_in / MINUTE:.0f} min",
+            flush=True,
+        )
+
+    # ---- loop ----
+
+    def next_due(self, names, now):
+        """Most overdue source that is due and within its hosts' budget."""
+        due = sorted(
+            (self.source_state(n)["next_run"], n)
+            for n in names
+            if self.source_state(n)["next_run"] <= now
+        )
+        for _, name in due:
+            wait = self.budget.wait(self.pipelines[name]["hosts"], now)
+            if wait <= 0:
+                return name
+            self.source_state(name)["next_run"] = now + wait
+            print(f"⏸ {name}: budžet hosta potrošen, odlaže se {wait / MINUTE:.0f} min")
+            self.save()
+        return None
+
+    def run(self, names, once=False):
+        if once:
+            for name in names:
+                wait = self.budget.wait(self.pipelines[name]["hosts"])
+                if wait > 0:
+                    print(f"⏸ {name}: budžet hosta potrošen još {wait / MINUTE:.0f} min")
+                    continue
+                self.run_source(name)
+            return
+
+        print(f"🕒 Scheduler: {', '.join(names)}", flush=True)
+        while True:
+            now = time.time()
+            name = self.next_due(names, now)
+            if name:
+                self.run_source(name)
+                continue
+            upcoming = min(self.source_state(n)["next_run"] for n in names)
+            time.sleep(max(1, min(TICK, upcoming - now)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--source",
+        action="append",
+        choices=sorted(PIPELINES),
+        help="samo ovi izvori (može više puta); podrazumevano svi",
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="svaki izvor jednom, bez obzira na raspored, pa izlaz",
+    )
+    args = parser.parse_args()
+
+    scheduler = Scheduler()
+    try:
+        scheduler.run(args.source or sorted(PIPELINES), once=args.once)
+    except KeyboardInterrupt:
+        print("\n Scheduler zaustavljen.")
+    finally:
+        scheduler.save()
+
+
+if __name__ == "__main__":
+    main()
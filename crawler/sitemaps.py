@@ -0,0 +1,119 @@
+"""
+Streaming readers for sitemap.xml (incl. sitemap indexes, .xml.gz) and
+RSS / Atom feeds.
+
+Responses are read with stream=True and parsed with lxml.etree.iterparse, so
+a 50k-URL sitemap is never held in memory as a tree: each <url>/<item>/<entry>
+element is yielded and cleared as soon as it closes.
+
+All readers yield (url, lastmod, title); lastmod is a normalized UTC ISO
+string (or None), so values compare correctly as plain strings.
+"""
+
+import gzip
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from lxml import etree
+
+
+def parse_lastmod(value):
+    """W3C datetime / RFC 822 date → 'YYYY-MM-DDTHH:MM:SS+00:00' (UTC) or None."""
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            dt = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).isoformat(timespec="seconds")
+
+
+def _localname(el):
+    return etree.QName(el).localname if isinstance(el.tag, str) else ""
+
+
+def _child_text(el, *names):
+    for child in el:
+        if _localname(child) in names:
+            return (child.text or "").strip()
+    return ""
+
+
+def _release(el):
+    """Frees a processed element and its already-parsed previous siblings."""
+    el.clear()
+    parent = el.getparent()
+    if parent is not None:
+        while el.getprevious() is not None:
+            del parent[0]
+
+
+def _open_stream(session, url, timeout):
+    r = session.get(url, stream=True, timeout=timeout)
+    r.raise_for_status()
+    r.raw.decode_content = True
+    if url.endswith(".gz"):
+        return r, gzip.GzipFile(fileobj=r.raw)
+    return r, r.raw
+
+
+def iter_sitemap(session, url, since=None, timeout=30):
+    """
+    Yields (loc, lastmod, None) for every <url> in a sitemap. Sitemap indexes
+    are followed recursively; child sitemaps whose <lastmod> is older than
+    `since` (UTC ISO string) are not downloaded at all.
+    """
+    children = []
+    r, stream = _open_stream(session, url, timeout)
+    try:
+        for _, el in etree.iterparse(stream, events=("end",)):
+            name = _localname(el)
+            if name == "url":
+                loc = _child_text(el, "loc")
+                if loc:
+                    yield loc, parse_lastmod(_child_text(el, "lastmod")), None
+                _release(el)
+            elif name == "sitemap":
+                loc = _child_text(el, "loc")
+                lastmod = parse_lastmod(_child_text(el, "lastmod"))
+                if loc and not (since and lastmod and lastmod < since):
+                    children.append(loc)
+                _release(el)
+    finally:
+        r.close()
+
+    for child in children:
+        yield from iter_sitemap(session, child, since=since, timeout=timeout)
+
+
+def iter_feed(session, url, timeout=30):
+    """Yields (link, updated, title) for RSS <item> and Atom <entry> elements."""
+    r, stream = _open_stream(session, url, timeout)
+    try:
+        for _, el in etree.iterparse(stream, events=("end",)):
+            name = _localname(el)
+            if name == "item":  # RSS 2.0 / RDF
+                link = _child_text(el, "link")
+                date = _child_text(el, "pubDate", "date", "updated")
+            elif name == "entry":  # Atom
+                link = ""
+                for child in el:
+                    rel = child.get("rel", "alternate")
+                    if _localname(child) == "link" and rel == "alternate":
+                        link = (child.get("href") or "").strip()
+                        break
+                date = _child_text(el, "updated", "published")
+            else:
+                continue
+
+            if link:
+                yield link, parse_lastmod(date), _child_text(el, "title")
+            _release(el)
+    finally:
+        r.close()
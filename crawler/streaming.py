@@ -0,0 +1,177 @@
+"""
+Streaming page fetch that stops reading once the article is over.
+
+ArticleEndDetector feeds response chunks into an lxml HTMLPullParser and
+reports "done" when
+
+  - the article container (e.g. the first <article> inside <main>) closes, or
+  - a text element inside the container starts with one of the source's
+    STOP_PHRASES ("Related content", "Header image credit" ...) and has closed,
+    together with its enclosing text elements, and every `require_xpaths`
+    expression already matches (so fields that sit further down, like the EU
+    "updated" date, are never cut off).
+
+Everything after that point is ignored by the extractors anyway, so the
+truncated HTML produces the same record while the rest of a long page is
+neither downloaded nor parsed.
+
+read_streaming() is what CrawlEngine(stream_stop=...) runs for each 200
+response. If the unread remainder is known to be small it is drained instead
+of dropping the connection, so keep-alive reuse is not lost for a few KB.
+"""
+
+from lxml import etree
+from lxml import html as lxml_html
+
+from crawler.boilerplate import phrase_regex
+
+CHUNK_SIZE = 16 * 1024
+MIN_SAVING = 64 * 1024  # below this, finish the body and keep the connection
+
+TEXT_TAGS = ("p", "h2", "h3", "li")
+
+
+class ArticleEndDetector:
+    def __init__(
+        self,
+        container="article",
+        inside="main",
+        stop_phrases=(),
+        text_tags=TEXT_TAGS,
+        require_xpaths=(),
+    ):
+        """
+        container      – tag of the article element (first one is used)
+        inside         – the container must have an ancestor with this tag
+                         (None = any container element)
+        stop_phrases   – text prefixes after which the extractor stops
+        require_xpaths – must all match before a stop phrase may end the read
+        """
+        self.container = container
+        self.inside = inside
+        self.stop_phrases = tuple(stop_phrases)
+        self._stop_re = phrase_regex(self.stop_phrases)
+        self.text_tags = set(text_tags)
+        self.require_xpaths = [etree.XPath(x) for x in require_xpaths]
+
+        self.parser = etree.HTMLPullParser(events=("start", "end"))
+        self.parser.set_element_class_lookup(lxml_html.HtmlElementClassLookup())
+        self._article = None
+        self._stop_at = None
+        self.done = False
+        self.reason = None
+
+    def _in_article(self, el):
+        return self._article is not None and any(
+            a is self._article for a in el.iterancestors()
+        )
+
+    def _is_container(self, el):
+        if el.tag != self.container:
+            return False
+        if self.inside is None:
+            return True
+        return any(a.tag == self.inside for a in el.iterancestors())
+
+    def _outermost_text_ancestor(self, el):
+        top = el
+        for a in el.iterancestors():
+            if a is self._article:
+                break
+            if a.tag in self.text_tags:
+                top = a
+        return top
+
+    def _starts_with_stop(self, el):
+        # lxml text_content() (EU extractor) and crawler.extract.get_text()
+        # (ITU extractor) join inline text differently; only stop when both
+        # forms start with the phrase, so neither extractor could read further
+        raw = el.text_content().strip()
+        if not self._stop_re.match(raw):  # one compiled check for most elements
+            return False
+        spaced = " ".join(t.strip() for t in el.itertext() if t.strip())
+        return any(
+            raw.startswith(stop) and spaced.startswith(stop)
+            for stop in self.stop_phrases
+        )
+
+    def _required_present(self, el):
+        root = el.getroottree()
+        return all(xp(root) for xp in self.require_xpaths)
+
+    def feed(self, data: bytes) -> bool:
+        """Feeds one chunk; returns True once the rest of the page is not needed."""
+        if self.done:
+            return True
+
+        self.parser.feed(data)
+        for event, el in self.parser.read_events():
+            if not isinstance(el.tag, str):
+                continue
+
+            if event == "start":
+                if self._article is None and self._is_container(el):
+                    self._article = el
+                continue
+
+            if el is self._article:
+                self.done, self.reason = True, "article_end"
+                return True
+
+            if el is self._stop_at:
+                self._stop_at = None
+                if self._required_present(el):
+                    self.done, self.reason = True, "stop_phrase"
+                    return True
+                continue
+
+            if (
+                self._stop_at is None
+                and self.stop_phrases
+                and el.tag in self.text_tags
+                and self._in_article(el)
+            ):
+                if self._starts_with_stop(el):
+                    top = self._outermost_text_ancestor(el)
+                    if top is not el:
+                        # wait for the enclosing text element to close as well
+                        self._stop_at = top
+                    elif self._required_present(el):
+                        self.done, self.reason = True, "stop_phrase"
+                        return True
+        return False
+
+
+def read_streaming(r, detector, chunk_size=CHUNK_SIZE, min_saving=MIN_SAVING):
+    """
+    Reads a stream=True response until the detector is done. Sets r._content
+    to the bytes read, so r.text / r.content work as usual, and r.truncated
+    when the rest of the body was not downloaded (r.content is then NOT the
+    whole page and must not be archived as one).
+    Returns the number of body bytes not downloaded (None if unknown).
+    """
+    total = int(r.headers.get("Content-Length") or 0) or None
+    chunks = []
+    skipped = 0
+    stopped = False
+    r.truncated = False
+
+    for chunk in r.iter_content(chunk_size):
+        chunks.append(chunk)
+        if detector.feed(chunk):
+            stopped = True
+            break
+
+    if stopped:
+        remaining = total - r.raw.tell() if total else None
+        if remaining is not None and remaining < min_saving:
+            for chunk in r.iter_content(chunk_size):  # cheap: keep the connection
+                chunks.append(chunk)
+        else:
+            skipped = remaining
+            r.truncated = True
+            r.close()
+
+    r._content = b"".join(chunks)
+    r._content_consumed = True
+    return skipped
@@ -0,0 +1,261 @@
+"""
+Persistent id → name cache for WordPress taxonomies (DigWatch categories and
+tags by default).
+
+The DigWatch cache lives in data/raw/taxonomy_map.json (same layout
+fetch_taxonomies always wrote: {"categories": {id: name}, "tags": {id: name}}),
+so existing readers keep working. Other WordPress sources (crawler/wordpress.py)
+pass their own map path and `taxonomies` ({post field: REST endpoint}, e.g.
+{"topics": "topic"} for a custom taxonomy). Two ways to fill it:
+
+  - refresh_all(): full walk of /categories and /tags; page 1 gives
+    X-WP-TotalPages, the remaining pages are fetched concurrently and a page
+    that still fails after the session retries aborts the refresh (no silent
+    gaps in the map)
+  - resolve() / ensure_posts(): only the ids that are not in the map yet are
+    requested, 100 per call, via the REST `include=` parameter
+
+so new posts never need a full taxonomy walk. Ids the API does not return
+(deleted terms) are not asked for again for MISSING_TTL seconds, and in memory
+only. After a network error resolve() stays offline for OFFLINE_RETRY seconds
+and then tries again, so one failure does not leave a long-running process
+(scripts/push_ingest.py) with 'unknown:<id>' labels until restart.
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter, Retry
+
+BASE = "https://dig.watch/wp-json/wp/v2"
+RAW_DIR = Path(__file__).resolve().parents[1] / "data" / "raw"
+MAP_PATH = RAW_DIR / "taxonomy_map.json"
+
+KINDS = ("categories", "tags")
+PER_PAGE = 100  # WP REST max, also the max length of include=
+WORKERS = 4
+USER_AGENT = "DigwatchPilot/Taxonomies/1.2"
+OFFLINE_RETRY = 300  # seconds without include= calls after a network error
+MISSING_TTL = 6 * 3600  # seconds before an id the API did not return is retried
+
+
+def sess(workers=WORKERS, user_agent=USER_AGENT):
+    s = requests.Session()
+    r = Retry(
+        total=6,
+        backoff_factor=0.6,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET"]),
+    )
+    adapter = HTTPAdapter(max_retries=r, pool_maxsize=workers)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    s.headers.update({"User-Agent": user_agent})
+    return s
+
+
+def to_id_name_map(items):
+    m = {}
+    for it in items:
+        _id = it.get("id")
+        name = (it.get("name") or "").strip()
+        if isinstance(_id, int) and name:
+            m[_id] = name
+    return m
+
+
+class TaxonomyCache:
+    def __init__(
+        self,
+        path=MAP_PATH,
+        base=BASE,
+        session=None,
+        workers=WORKERS,
+        taxonomies=None,
+        user_agent=USER_AGENT,
+    ):
+        """
+        taxonomies – {post field: REST endpoint}; default categories and tags
+        """
+        self.path = Path(path)
+        self.base = base
+        self.workers = workers
+        self.user_agent = user_agent
+        if taxonomies is None:
+            taxonomies = {kind: kind for kind in KINDS}
+        self.taxonomies = dict(taxonomies)
+        self.kinds = tuple(self.taxonomies)
+        self._session = session
+        self._lock = threading.Lock()
+        self.maps = {kind: {} for kind in self.kinds}
+        self._missing = {kind: {} for kind in self.kinds}  # id → expiry
+        self._offline_until = 0.0
+        self.fetched = 0
+        self._load()
+
+    @property
+    def offline(self):
+        return time.monotonic() < self._offline_until
+
+    @property
+    def session(self):
+        if self._session is None:
+            self._session = sess(self.workers, self.user_agent)
+        return self._session
+
+    def _load(self):
+        if self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            for kind in self.kinds:
+                stored = data.get(kind) or {}
+                self.maps[kind] = {int(k): v for k, v in stored.items()}
+            return
+
+        # older fetch_taxonomies output (categories.json / tags.json) as a seed
+        for kind in self.kinds:
+            raw = self.path.parent / f"{kind}.json"
+            if raw.exists():
+                items = json.loads(raw.read_text(encoding="utf-8"))
+                self.maps[kind] = to_id_name_map(items)
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            data = {
+                kind: {str(k): v for k, v in sorted(self.maps[kind].items())}
+                for kind in self.kinds
+            }
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(
+            json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        os.replace(tmp, self.path)
+
+    def __len__(self):
+        return sum(len(m) for m in self.maps.values())
+
+    # ---- lookups ----
+
+    def name(self, kind, term_id):
+        return self.maps[kind].get(term_id)
+
+    def names(self, kind, ids, resolve=True):
+        """Names for ids in order; unknown ids are fetched first (resolve=True)."""
+        if resolve:
+            self.resolve(kind, ids)
+        return [self.maps[kind][i] for i in ids if i in self.maps[kind]]
+
+    def labels(self, kind, ids):
+        """Like names(), but unresolvable ids stay in place as 'unknown:<id>'."""
+        self.resolve(kind, ids)
+        return [self.maps[kind].get(i, f"unknown:{i}") for i in ids]
+
+    def resolve(self, kind, ids):
+        """
+        Fetches names for ids not in the cache (include=, 100 per request) and
+        saves the map if anything new arrived. Returns the number of new names.
+        """
+        now = time.monotonic()
+        with self._lock:
+            missing = self._missing[kind]
+            todo = sorted(
+                {
+                    i
+                    for i in ids
+                    if isinstance(i, int)
+                    and i not in self.maps[kind]
+                    and missing.get(i, 0) <= now
+                }
+            )
+        if not todo or self.offline:
+            return 0
+
+        found = {}
+        for start in range(0, len(todo), PER_PAGE):
+            part = todo[start : start + PER_PAGE]
+            params = {
+                "include": ",".join(map(str, part)),
+                "per_page": PER_PAGE,
+                "hide_empty": "false",
+            }
+            try:
+                found.update(to_id_name_map(self._get(kind, params)))
+            except requests.RequestException as e:
+                # no network: ids stay unknown until the next retry window
+                print(f"⚠ {kind} include= failed: {e}")
+                self._offline_until = time.monotonic() + OFFLINE_RETRY
+                break
+            expires = time.monotonic() + MISSING_TTL
+            with self._lock:
+                self._missing[kind].update(
+                    (i, expires) for i in part if i not in found
+                )
+
+        if found:
+            with self._lock:
+                self.maps[kind].update(found)
+                self.fetched += len(found)
+            self.save()
+        return len(found)
+
+    def ensure_posts(self, posts):
+        """Resolves every taxonomy term id used by the given WP posts."""
+        ids = {kind: set() for kind in self.kinds}
+        for p in posts:
+            for kind in self.kinds:
+                ids[kind].update(p.get(kind) or [])
+        return sum(self.resolve(kind, ids[kind]) for kind in self.kinds)
+
+    def _url(self, kind):
+        return f"{self.base}/{self.taxonomies[kind]}"
+
+    def _get(self, kind, params):
+        r = self.session.get(self._url(kind), params=params, timeout=60)
+        r.raise_for_status()
+        arr = r.json()
+        return arr if isinstance(arr, list) else []
+
+    # ---- full refresh ----
+
+    def _page(self, kind, page):
+        params = {
+            "per_page": PER_PAGE,
+            "page": page,
+            "orderby": "id",
+            "order": "asc",
+            "hide_empty": "false",
+        }
+        r = self.session.get(self._url(kind), params=params, timeout=60)
+        r.raise_for_status()
+        total_pages = int(r.headers.get("X-WP-TotalPages") or 1)
+        arr = r.json()
+        return (arr if isinstance(arr, list) else []), total_pages
+
+    def fetch_collection(self, kind, pool):
+        """All terms of one kind: page 1, then pages 2..N through the pool."""
+        first, total_pages = self._page(kind, 1)
+        print(f"➡️  {kind}: {total_pages} pages")
+        items = list(first)
+        rest = pool.map(lambda p: self._page(kind, p)[0], range(2, total_pages + 1))
+        for arr in rest:  # an exception from any page aborts the refresh
+            items.extend(arr)
+        print(f"   ✅ {kind}: {len(items)} items")
+        return items
+
+    def refresh_all(self):
+        """Full walk of both taxonomies; returns {kind: raw items}."""
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            raw = {kind: self.fetch_collection(kind, pool) for kind in self.kinds}
+
+        with self._lock:
+            for kind in self.kinds:
+                self.maps[kind] = to_id_name_map(raw[kind])
+                self._missing[kind].clear()
+        self._offline_until = 0.0
+        self.save()
+        return raw
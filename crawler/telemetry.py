@@ -0,0 +1,318 @@
+"""
+Crawl telemetry shared by all crawlers.
+
+CrawlTelemetry collects, per host:
+
+  - a request latency histogram (fixed buckets, Prometheus style)
+  - bytes downloaded
+  - response counts per status code ("error" for network failures)
+  - retries and time spent waiting for the rate limiter / host slot
+
+and, per run, delivered pages (ok / failed), time spent in extraction and
+pages per minute. dump() writes two files that are rewritten in place:
+
+    data/raw/telemetry/<source>.json   – snapshot for humans / scripts
+    data/raw/telemetry/<source>.prom   – Prometheus text format (node_exporter
+                                         textfile collector can pick it up)
+
+A --worker process writes <source>.<worker>.json / .prom instead (with a
+`worker` label), so workers of one source do not overwrite each other.
+
+CrawlEngine(telemetry=...) records every fetch and dumps every `interval`
+seconds and at the end of run(). Plain requests scripts can use
+attach(session), which records responses through a session hook and dumps
+periodically from there.
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlsplit
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_DIR = ROOT / "data" / "raw" / "telemetry"
+
+DUMP_INTERVAL = 60  # seconds
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _write_atomic(path: Path, text: str):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+class HostStats:
+    def __init__(self, buckets):
+        self.buckets = [0] * (len(buckets) + 1)  # last one = +Inf
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.requests = 0
+        self.bytes = 0
+        self.statuses = {}
+        self.retries = 0
+        self.wait_seconds = 0.0
+
+
+class CrawlTelemetry:
+    def __init__(
+        self,
+        source,
+        path=DEFAULT_DIR,
+        interval=DUMP_INTERVAL,
+        buckets=LATENCY_BUCKETS,
+        worker=None,
+    ):
+        """
+        source   – name used for the output files and the `source` label
+        interval – seconds between periodic dumps (None = only at the end)
+        worker   – --worker name; added to the file names and as a label
+        """
+        self.source = source
+        self.worker = worker
+        self.dir = Path(path)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.interval = interval
+        self.buckets = tuple(sorted(buckets))
+
+        self._hosts = {}
+        self._lock = threading.Lock()
+        self.started_at = datetime.now(timezone.utc)
+        self._started = time.monotonic()
+        self._last_dump = self._started
+        self.pages_ok = 0
+        self.pages_failed = 0
+        self.extract_seconds = 0.0
+
+    @property
+    def name(self) -> str:
+        return f"{self.source}.{self.worker}" if self.worker else self.source
+
+    @property
+    def json_path(self) -> Path:
+        return self.dir / f"{self.name}.json"
+
+    @property
+    def prom_path(self) -> Path:
+        return self.dir / f"{self.name}.prom"
+
+    def _host(self, host) -> HostStats:
+        if host not in self._hosts:
+            self._hosts[host] = HostStats(self.buckets)
+        return self._hosts[host]
+
+    # ---- recording ----
+
+    def observe(self, host, status, latency, nbytes=0):
+        """One finished request; status is the HTTP code or "error"."""
+        with self._lock:
+            h = self._host(host)
+            h.requests += 1
+            h.bytes += nbytes or 0
+            h.statuses[str(status)] = h.statuses.get(str(status), 0) + 1
+            h.latency_sum += latency
+            h.latency_max = max(h.latency_max, latency)
+            h.buckets[bisect_left(self.buckets, latency)] += 1
+
+    def retry(self, host):
+        with self._lock:
+            self._host(host).retries += 1
+
+    def waited(self, host, seconds):
+        with self._lock:
+            self._host(host).wait_seconds += seconds
+
+    def extracted(self, seconds):
+        with self._lock:
+            self.extract_seconds += seconds
+
+    def page(self, ok: bool):
+        with self._lock:
+            if ok:
+                self.pages_ok += 1
+            else:
+                self.pages_failed += 1
+
+    def attach(self, session):
+        """
+        Records every response of a requests.Session (for non-engine scripts):
+        each response counts as a page (ok if status < 400) and urllib3 Retry
+        attempts behind it count as retries.
+        """
+
+        def hook(r, *args, **kwargs):
+            body = r.headers.get("Content-Length")
+            if not kwargs.get("stream"):
+                body = len(r.content)  # read anyway right after the hook
+            host = urlsplit(r.url).netloc.lower()
+            latency = r.elapsed.total_seconds()
+            self.observe(host, r.status_code, latency, int(body or 0))
+
+            history = getattr(getattr(r.raw, "retries", None), "history", ())
+            for _ in history:
+                self.retry(host)
+            self.page(r.status_code < 400)
+            self.maybe_dump()
+
+        session.hooks["response"].append(hook)
+        return session
+
+    # ---- output ----
+
+    def snapshot(self, rates=None) -> dict:
+        """JSON-ready view of all counters; `rates` = AIMDRateController.snapshot()."""
+        with self._lock:
+            elapsed = time.monotonic() - self._started
+            pages = self.pages_ok + self.pages_failed
+            now = datetime.now(timezone.utc)
+            hosts = {}
+            for host, h in sorted(self._hosts.items()):
+                cumulative, total = {}, 0
+                for le, n in zip(self.buckets + ("+Inf",), h.buckets):
+                    total += n
+                    cumulative[str(le)] = total
+                hosts[host] = {
+                    "requests": h.requests,
+                    "bytes": h.bytes,
+                    "statuses": dict(sorted(h.statuses.items())),
+                    "retries": h.retries,
+                    "wait_seconds": round(h.wait_seconds, 3),
+                    "latency": {
+                        "mean": round(h.latency_sum / h.requests, 4)
+                        if h.requests
+                        else None,
+                        "max": round(h.latency_max, 4),
+                        "sum": round(h.latency_sum, 3),
+                        "buckets": cumulative,
+                    },
+                }
+                if rates and host in rates:
+                    hosts[host]["rate"] = rates[host]
+
+            return {
+                "source": self.source,
+                "worker": self.worker,
+                "started_at": self.started_at.isoformat(timespec="seconds"),
+                "updated_at": now.isoformat(timespec="seconds"),
+                "elapsed_seconds": round(elapsed, 1),
+                "pages": {"ok": self.pages_ok, "failed": self.pages_failed},
+                "pages_per_minute": round(pages / elapsed * 60, 2) if elapsed else 0,
+                "extract_seconds": round(self.extract_seconds, 3),
+                "bytes": sum(h["bytes"] for h in hosts.values()),
+                "hosts": hosts,
+            }
+
+    def to_prometheus(self, snap=None) -> str:
+        snap = snap or self.snapshot()
+        src = f'source="{_label(self.source)}"'
+        if self.worker:
+            src += f',worker="{_label(self.worker)}"'
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{{{labels}}} {value}")
+
+        hosts = [(f'{src},host="{_label(h)}"', s) for h, s in snap["hosts"].items()]
+
+        name = "crawl_request_duration_seconds"
+        lines.append(f"# HELP {name} Request latency per host.")
+        lines.append(f"# TYPE {name} histogram")
+        for labels, s in hosts:
+            for le, n in s["latency"]["buckets"].items():
+                lines.append(f'{name}_bucket{{{labels},le="{le}"}} {n}')
+            lines.append(f"{name}_sum{{{labels}}} {s['latency']['sum']}")
+            lines.append(f"{name}_count{{{labels}}} {s['requests']}")
+
+        metric(
+            "crawl_response_bytes_total",
+            "counter",
+            "Response body bytes downloaded.",
+            [(labels, s["bytes"]) for labels, s in hosts],
+        )
+        metric(
+            "crawl_responses_total",
+            "counter",
+            "Responses per status code (error = network failure).",
+            [
+                (f'{labels},status="{_label(code)}"', n)
+                for labels, s in hosts
+                for code, n in s["statuses"].items()
+            ],
+        )
+        metric(
+            "crawl_retries_total",
+            "counter",
+            "Requests re-queued for another attempt.",
+            [(labels, s["retries"]) for labels, s in hosts],
+        )
+        metric(
+            "crawl_wait_seconds_total",
+            "counter",
+            "Time spent waiting for the rate limiter and host slots.",
+            [(labels, s["wait_seconds"]) for labels, s in hosts],
+        )
+        metric(
+            "crawl_pages_total",
+            "counter",
+            "Delivered pages by result.",
+            [
+                (f'{src},result="ok"', snap["pages"]["ok"]),
+                (f'{src},result="failed"', snap["pages"]["failed"]),
+            ],
+        )
+        metric(
+            "crawl_extract_seconds_total",
+            "counter",
+            "Time spent in the extract functions.",
+            [(src, snap["extract_seconds"])],
+        )
+        metric(
+            "crawl_pages_per_minute",
+            "gauge",
+            "Delivered pages per minute since the start of the run.",
+            [(src, snap["pages_per_minute"])],
+        )
+        metric(
+            "crawl_elapsed_seconds",
+            "gauge",
+            "Seconds since the start of the run.",
+            [(src, snap["elapsed_seconds"])],
+        )
+        return "\n".join(lines) + "\n"
+
+    def dump(self, rates=None) -> dict:
+        snap = self.snapshot(rates)
+        _write_atomic(
+            self.json_path, json.dumps(snap, indent=2, ensure_ascii=False) + "\n"
+        )
+        _write_atomic(self.prom_path, self.to_prometheus(snap))
+        self._last_dump = time.monotonic()
+        return snap
+
+    def maybe_dump(self, rates=None):
+        """Dumps if `interval` seconds passed since the last dump."""
+        if self.interval is None:
+            return None
+        if time.monotonic() - self._last_dump < self.interval:
+            return None
+        return self.dump(rates)
+
+    def summary(self, snap=None) -> str:
+        snap = snap or self.snapshot()
+        mb = snap["bytes"] / (1024 * 1024)
+        requests = sum(h["requests"] for h in snap["hosts"].values())
+        return (
+            f"{snap['pages']['ok']} ok / {snap['pages']['failed']} failed, "
+            f"{snap['pages_per_minute']} pages/min, {requests} requests, {mb:.1f} MB"
+        )
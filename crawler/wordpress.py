@@ -0,0 +1,327 @@
+"""
+Generic WordPress REST source adapter.
+
+Any WordPress-based site can be crawled through its JSON API
+(<base>/<post_type>?_fields=...) instead of an HTML scraper:
+
+    python crawler/wordpress.py --source digwatch --incremental
+    python crawler/wordpress.py --config data/wp_sources.json --source mysite
+
+A source is a dict in SOURCES (or in a JSON file given with --config, which
+may add new sources or override existing ones):
+
+    base         – REST root, e.g. https://dig.watch/wp-json/wp/v2
+    post_type    – REST base of the post type ("posts", "pages", "updates"...)
+    fields       – _fields projection; "id" and "modified" are always added
+                   (the raw store keys and versions posts by them)
+    taxonomies   – {post field: REST endpoint}; term ids of new posts are
+                   resolved into the source's taxonomy map (crawler/taxonomy.py)
+    embed        – also request _embed (authors, media, terms inline)
+    user_agent   – User-Agent header
+
+plus optional `store`, `state`, `taxonomy_map` and `legacy` paths. By default
+they live under data/raw/wp/<name>/; DigWatch keeps its historical paths, so
+the normalize and chunk scripts read the same files as before.
+
+Runs are resumable: a full walk remembers the next page in the state file,
+and an incremental run only requests posts modified after the high-water mark
+of the previous run (page 1 → X-WP-TotalPages → remaining pages in parallel).
+Each page is appended to an append-only store (crawler/raw_store.py), which
+skips posts whose `modified` did not change.
+"""
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter, Retry
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from crawler import raw_store, taxonomy  # noqa: E402
+from crawler.rate import HostBudget  # noqa: E402
+from crawler.telemetry import CrawlTelemetry  # noqa: E402
+
+OUT_DIR = ROOT / "data" / "raw"
+
+DEFAULT_FIELDS = ["id", "date", "modified", "link", "slug", "status", "type",
+                  "author", "title", "content", "excerpt"]
+REQUIRED_FIELDS = ["id", "modified"]
+
+PER_PAGE = 100
+SYNC_WORKERS = 4
+# preklapanje pri incremental upitu: ne gubimo postove izmenjene tokom sync-a
+SYNC_OVERLAP = timedelta(minutes=10)
+PAGE_DELAY = 0.25  # pauza između strana u punom prolazu
+
+SOURCES = {
+    "digwatch": {
+        "base": taxonomy.BASE,
+        "post_type": "updates",
+        "fields": DEFAULT_FIELDS + ["categories", "tags"],
+        "taxonomies": {"categories": "categories", "tags": "tags"},
+        # downstream (normalize / chunk) koristi samo ID-jeve kategorija i
+        # tagova, pa _embed (autori, media, termini) ne treba
+        "embed": False,
+        "user_agent": "DigwatchPilot/1.0",
+        "store": raw_store.DEFAULT_DIR,
+        "state": OUT_DIR / "updates_state.json",
+        "taxonomy_map": taxonomy.MAP_PATH,
+        "legacy": raw_store.LEGACY_JSON,
+    },
+}
+
+
+def load_sources(config=None):
+    """SOURCES, extended / overridden by the sources in a JSON config file."""
+    sources = {name: dict(cfg) for name, cfg in SOURCES.items()}
+    if config:
+        extra = json.loads(Path(config).read_text(encoding="utf-8"))
+        for name, cfg in extra.items():
+            sources.setdefault(name, {}).update(cfg)
+    return sources
+
+
+def max_modified(posts, current=None):
+    best = current
+    for p in posts:
+        m = p.get("modified")
+        if m and (best is None or m > best):
+            best = m
+    return best
+
+
+class WordPressSource:
+    def __init__(self, name, cfg, workers=SYNC_WORKERS):
+        self.name = name
+        self.base = cfg["base"].rstrip("/")
+        self.post_type = cfg.get("post_type", "posts")
+        self.url = f"{self.base}/{self.post_type}"
+        fields = list(cfg.get("fields") or DEFAULT_FIELDS)
+        self.fields = fields + [f for f in REQUIRED_FIELDS if f not in fields]
+        self.taxonomies = dict(cfg.get("taxonomies") or {})
+        self.embed = bool(cfg.get("embed", False))
+        self.user_agent = cfg.get("user_agent", "PolicyPilot/WordPress/1.0")
+        self.workers = workers
+        # budžet zahteva po hostu koji scheduler prosleđuje (CRAWL_HOST_BUDGET)
+        self.host = urlsplit(self.base).netloc
+        self.budget = HostBudget.from_env()
+
+        out = OUT_DIR / "wp" / name
+        self.store_path = Path(cfg.get("store") or out / "store")
+        self.state_path = Path(cfg.get("state") or out / "state.json")
+        self.taxonomy_path = Path(cfg.get("taxonomy_map") or out / "taxonomy_map.json")
+        self.legacy = cfg.get("legacy")
+
+    def session(self):
+        s = requests.Session()
+        r = Retry(total=6, backoff_factor=0.8,
+                  status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=frozenset(["GET"]))
+        adapter = HTTPAdapter(max_retries=r, pool_maxsize=self.workers)
+        s.mount("https://", adapter)
+        s.mount("http://", adapter)
+        s.headers.update({"User-Agent": self.user_agent})
+        return s
+
+    def taxonomy(self, session=None):
+        return taxonomy.TaxonomyCache(
+            path=self.taxonomy_path,
+            base=self.base,
+            session=session,
+            workers=self.workers,
+            taxonomies=self.taxonomies,
+        )
+
+    def open_store(self):
+        return raw_store.open_updates_store(self.store_path, legacy=self.legacy)
+
+    # ---- state ----
+
+    def load_state(self):
+        if self.state_path.exists():
+            try:
+                return json.loads(self.state_path.read_text(encoding="utf-8"))
+            except Exception:
+                pass
+        return {"next_page": 1}
+
+    def update_state(self, **changes):
+        state = self.load_state()
+        state.update(changes)
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        self.state_path.write_text(json.dumps(
+            state, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    # ---- REST ----
+
+    def hold(self):
+        """Čeka dok host ne dobije mesta u budžetu zahteva (ako ga ima)."""
+        if self.budget is not None:
+            time.sleep(self.budget.reserve(self.host))
+
+    def page_params(self, page, modified_after=None):
+        fields = self.fields + (["_embedded"] if self.embed else [])
+        params = {
+            "per_page": PER_PAGE,
+            "page": page,
+            "status": "publish",
+            "_fields": ",".join(fields),
+        }
+        if self.embed:
+            params["_embed"] = "1"
+        if modified_after:
+            params.update({"modified_after": modified_after,
+                           "orderby": "modified", "order": "asc"})
+        else:
+            params.update({"orderby": "date", "order": "desc"})
+        return params
+
+    def fetch_page(self, s, page, modified_after=None):
+        """Vraća (lista postova, X-WP-TotalPages)."""
+        self.hold()
+        r = s.get(self.url, params=self.page_params(page, modified_after), timeout=60)
+        if r.status_code == 400 and page > 1:
+            # WP vraća 400 rest_post_invalid_page_number iza poslednje strane
+            return [], page - 1
+        r.raise_for_status()
+        arr = r.json()
+        total_pages = int(r.headers.get("X-WP-TotalPages") or 0)
+        return (arr if isinstance(arr, list) else []), total_pages
+
+    def fetch_by_link(self, s, link):
+        """Jedan post po permalinku (REST `slug=`); None ako ga API ne vraća."""
+        link = link.split("?", 1)[0].split("#", 1)[0].rstrip("/")
+        params = {
+            "slug": link.rsplit("/", 1)[-1],
+            "status": "publish",
+            "_fields": ",".join(self.fields),
+        }
+        self.hold()
+        r = s.get(self.url, params=params, timeout=60)
+        r.raise_for_status()
+        posts = r.json()
+        if not isinstance(posts, list):
+            posts = []
+        for p in posts:
+            if (p.get("link") or "").rstrip("/") == link:
+                return p
+        return posts[0] if posts else None
+
+    # ---- crawl ----
+
+    def sync_incremental(self, s, store, hwm, terms=None):
+        """
+        Preuzima samo postove izmenjene posle high-water mark-a:
+        strana 1 → X-WP-TotalPages → ostale strane paralelno → append u store.
+        """
+        since = (datetime.fromisoformat(hwm) - SYNC_OVERLAP).isoformat()
+        print(f"Incremental sync: modified_after={since}")
+
+        first, total_pages = self.fetch_page(s, 1, since)
+        posts = list(first)
+        print(f"Strana 1/{max(total_pages, 1)}: {len(first)} zapisa")
+
+        if total_pages > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                pages = pool.map(lambda p: self.fetch_page(s, p, since)[0],
+                                 range(2, total_pages + 1))
+                for page_no, arr in enumerate(pages, start=2):
+                    print(f"Strana {page_no}/{total_pages}: {len(arr)} zapisa")
+                    posts.extend(arr)
+
+        added, updated = store.put_many(posts)
+        if terms is not None:
+            # novi termini se dohvataju odmah (include=), bez punog fetch_taxonomies
+            terms.ensure_posts(posts)
+        return added, updated, max_modified(posts, hwm)
+
+    def full_walk(self, s, store, terms=None):
+        page = int(self.load_state().get("next_page", 1))
+        added_total = 0
+
+        while True:
+            try:
+                arr, _ = self.fetch_page(s, page)
+            except Exception:
+                self.update_state(next_page=page)
+                raise
+
+            n = len(arr)
+            print(f"Strana {page}: {n} zapisa")
+            if n == 0:
+                break
+
+            # append-only: upisuje se samo ova strana (novi/izmenjeni postovi)
+            added, _ = store.put_many(arr)
+            added_total += added
+            if terms is not None:
+                terms.ensure_posts(arr)
+
+            page += 1
+            self.update_state(next_page=page)
+            time.sleep(PAGE_DELAY)
+
+        return added_total
+
+    def run(self, incremental=False):
+        s = self.session()
+        telemetry = CrawlTelemetry(self.name)
+        telemetry.attach(s)
+        terms = self.taxonomy(s) if self.taxonomies else None
+        store = self.open_store()
+        hwm = self.load_state().get("modified_hwm") or store.max_modified()
+        print(f"🌐 {self.name}: {self.url}")
+
+        try:
+            if incremental and hwm:
+                added, updated, hwm = self.sync_incremental(s, store, hwm, terms)
+                print(f"\nOK: ukupno u store-u: {len(store)} | novo: {added} "
+                      f"| izmenjeno: {updated}")
+            else:
+                if incremental:
+                    print("Nema high-water mark-a → radim pun prolaz.")
+                added = self.full_walk(s, store, terms)
+                print(f"\nOK: ukupno u store-u: {len(store)} | novo dodato: {added}")
+                hwm = max(filter(None, [hwm, store.max_modified()]), default=None)
+        except Exception as e:
+            print(f" Greška ({self.name}): {e}")
+            store.close()
+            sys.exit(1)
+
+        self.update_state(modified_hwm=hwm)
+        store.maybe_compact()
+        print(f"High-water mark: {hwm}")
+        print(f"Raw izlaz: {store.dir}")
+        print(f"Telemetrija: {telemetry.summary(telemetry.dump())}")
+        store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--source", default="digwatch")
+    parser.add_argument(
+        "--config", type=Path, help="JSON sa dodatnim WordPress izvorima"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="samo postovi izmenjeni od poslednjeg sync-a (modified high-water mark)",
+    )
+    args = parser.parse_args()
+
+    sources = load_sources(args.config)
+    if args.source not in sources:
+        parser.error(f"nepoznat izvor {args.source!r} (ima: {', '.join(sources)})")
+    WordPressSource(args.source, sources[args.source]).run(args.incremental)
+
+
+if __name__ == "__main__":
+    main()
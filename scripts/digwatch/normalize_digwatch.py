@@ -1,29 +1,26 @@
 import json
+import sys
 from datetime import datetime
 from pathlib import Path
 
-from bs4 import BeautifulSoup
-
 ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(ROOT))
 
-RAW_UPDATES = ROOT / "data" / "raw" / "updates_all.json"
-RAW_CATEGORIES = ROOT / "data" / "raw" / "categories.json"
-RAW_TAGS = ROOT / "data" / "raw" / "tags.json"
-
-OUT_FILE = ROOT / "data" / "processed" / "digwatch_clean_full.json"
-
+from crawler.extract import html_to_text  # noqa: E402
+from crawler.raw_store import DEFAULT_DIR as RAW_STORE, iter_raw_updates  # noqa: E402
+from crawler.taxonomy import TaxonomyCache  # noqa: E402
 
-def load_json(path):
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+# JSONL, jedan post po liniji; dok normalizacija traje piše se u .partial fajl
+# (chunk_digwatch_v2_pro.py može da ga prati), na kraju se preimenuje u OUT_FILE
+OUT_FILE = ROOT / "data" / "processed" / "digwatch_clean_full.jsonl"
+PARTIAL_FILE = OUT_FILE.with_name(OUT_FILE.name + ".partial")
 
 
 def strip_html(html):
     """Pretvara HTML → čist tekst (uklanja tagove)."""
     if not html:
         return ""
-    soup = BeautifulSoup(html, "html.parser")
-    return soup.get_text(" ", strip=True)
+    return html_to_text(html)
 
 
 def extract_quarter(date_str):
@@ -38,63 +35,64 @@ def extract_quarter(date_str):
         return None
 
 
-def main():
-
-    print("[INFO] Loading raw files...")
-
-    updates = load_json(RAW_UPDATES)
-    categories = load_json(RAW_CATEGORIES)
-    tags = load_json(RAW_TAGS)
+def normalize_post(u, taxonomy):
+    """Sirovi WP post → očišćen DigWatch zapis (tekst, kvartal, nazivi termina)."""
+    content_html = u.get("content", {}).get("rendered", "")
+    excerpt_html = u.get("excerpt", {}).get("rendered", "")
+
+    return {
+        "id": u.get("id"),
+        "url": u.get("link"),
+        "title": u.get("title", {}).get("rendered", "").strip(),
+        "text": strip_html(content_html),
+        "excerpt": strip_html(excerpt_html),
+        "date": u.get("date"),
+        "modified": u.get("modified"),
+        "quarter": extract_quarter(u.get("date")),
+        "source": "digwatch",
+        "origin_site": "digwatch",
+        "node_type": u.get("type"),
+        "category_ids": u.get("categories", []),
+        "category_names": taxonomy.labels("categories", u.get("categories", [])),
+        "tag_ids": u.get("tags", []),
+        "tag_names": taxonomy.labels("tags", u.get("tags", [])),
+    }
 
-    category_map = {c["id"]: c["name"] for c in categories}
-    tag_map = {t["id"]: t["name"] for t in tags}
 
-    print(f"[INFO] Loaded {len(updates)} updates")
-    print(f"[INFO] Loaded {len(category_map)} categories")
-    print(f"[INFO] Loaded {len(tag_map)} tags")
-
-    processed = []
-
-    for u in updates:
-
-        content_html = u.get("content", {}).get("rendered", "")
-        excerpt_html = u.get("excerpt", {}).get("rendered", "")
-
-        clean_text = strip_html(content_html)
-        clean_excerpt = strip_html(excerpt_html)
+def main():
 
-        quarter = extract_quarter(u.get("date"))
+    print("[INFO] Streaming raw posts...")
 
-        item = {
-            "id": u.get("id"),
-            "url": u.get("link"),
-            "title": u.get("title", {}).get("rendered", "").strip(),
-            "text": clean_text,
-            "excerpt": clean_excerpt,
-            "date": u.get("date"),
-            "modified": u.get("modified"),
-            "quarter": quarter,
-            "source": "digwatch",
-            "origin_site": "digwatch",
-            "node_type": u.get("type"),
-            "category_ids": u.get("categories", []),
-            "category_names": [
-                category_map.get(cid, f"unknown:{cid}")
-                for cid in u.get("categories", [])
-            ],
-            "tag_ids": u.get("tags", []),
-            "tag_names": [
-                tag_map.get(tid, f"unknown:{tid}") for tid in u.get("tags", [])
-            ],
-        }
+    # nepoznati ID-jevi se dohvataju na zahtev (include=) i čuvaju u mapi
+    taxonomy = TaxonomyCache()
 
-        processed.append(item)
+    print(f"[INFO] Loaded {len(taxonomy.maps['categories'])} categories")
+    print(f"[INFO] Loaded {len(taxonomy.maps['tags'])} tags")
 
     OUT_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(OUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(processed, f, ensure_ascii=False, indent=2)
+    count = 0
 
-    print(f"[SUCCESS] Saved {len(processed)} cleaned updates → {OUT_FILE}")
+    # postovi se čitaju i upisuju jedan po jedan (memorija ne raste sa arhivom);
+    # flush posle svakog zapisa da chunker koji prati .partial odmah vidi post
+    try:
+        with open(PARTIAL_FILE, "w", encoding="utf-8") as f:
+            for u in iter_raw_updates(RAW_STORE):
+                item = normalize_post(u, taxonomy)
+                f.write(json.dumps(item, ensure_ascii=False) + "\n")
+                f.flush()
+                count += 1
+    except BaseException:
+        # nestao .partial bez rename-a → chunker koji prati zna da izlaz nije ceo
+        PARTIAL_FILE.unlink(missing_ok=True)
+        raise
+
+    PARTIAL_FILE.replace(OUT_FILE)
+
+    print(f"[INFO] Processed {count} updates")
+    if taxonomy.fetched:
+        print(f"[INFO] Resolved {taxonomy.fetched} new taxonomy terms on demand")
+
+    print(f"[SUCCESS] Saved {count} cleaned updates → {OUT_FILE}")
 
 
 if __name__ == "__main__":
@@ -1,18 +1,39 @@
+import argparse
 import json
-import random
 import re
-import time
+import sys
+from contextlib import nullcontext
 from pathlib import Path
 
-import requests
 from lxml import html
 
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(ROOT))
+
+from crawler.archive import ResponseArchive  # noqa: E402
+from crawler.boilerplate import BoilerplateFilter  # noqa: E402
+from crawler.dead_letter import DeadLetterQueue  # noqa: E402
+from crawler.engine import CrawlEngine  # noqa: E402
+from crawler.fingerprint import record_fingerprint  # noqa: E402
+from crawler.frontier import Frontier, finish_output, worker_output  # noqa: E402
+from crawler.http_cache import HttpCache, code_version  # noqa: E402
+from crawler.rate import AIMDRateController  # noqa: E402
+from crawler.streaming import ArticleEndDetector  # noqa: E402
+from crawler.telemetry import CrawlTelemetry  # noqa: E402
+
 INPUT_URLS_FILE = "eu_news_full_20251120_0008.json"
 OUTPUT_FILE = "eu_news_FULL_REBUILT.jsonl"
-STATE_FILE = "eu_ds_state.json"
+STATE_FILE = "eu_ds_state.json"  # stari last_index, samo za prelazak na frontier
+FRONTIER_SOURCE = "eu_ds"
 
 
 TEST_LIMIT = None
+USE_HTTP_CACHE = True  # ETag/Last-Modified revalidacija (304 → bez ekstrakcije)
+# polja koja ulaze u chunkove; nepromenjen fingerprint → chunker/ingest preskaču članak
+FINGERPRINT_FIELDS = ("title", "date_published", "date_updated", "content")
+STREAM_FETCH = True  # čitanje stranice prekida se na kraju <article> / STOP_PHRASES
+# skraćena strana se arhivira označena kao skraćena (reextract / --replay je
+# koriste); izmena koja traži ostatak strane traži jedan crawl sa False
 
 HEADERS = {
     "User-Agent": (
@@ -23,6 +44,8 @@ HEADERS = {
 }
 
 MAX_RETRIES = 6
+CONCURRENCY = 8
+PER_HOST = 4
 
 
 SKIP_LINES = [
@@ -63,6 +86,17 @@ GLOBAL_REMOVE_PATTERNS = [
     r"Article Category",
 ]
 
+# sve od potpisa "European Union, 20xx" do kraja teksta
+FOOTER_PATTERN = r"European Union, 20\d{2}.*$"
+
+# jedan kompajliran filter umesto petlji po listama (crawler/boilerplate.py)
+BOILERPLATE = BoilerplateFilter(
+    skip_contains=SKIP_LINES,
+    stop_prefixes=STOP_PHRASES,
+    remove_patterns=GLOBAL_REMOVE_PATTERNS + [FOOTER_PATTERN],
+    flags=re.DOTALL,
+)
+
 XPATH_PUBLISHED = '//*[@id="block-cnt-theme-pageheader"]/div/div/div/ul/li[2]'
 XPATH_UPDATED = '//*[@id="block-cnt-theme-main-page-content"]/article/div/div[2]/div/div/div/section/div[2]/div[1]/p'
 
@@ -76,20 +110,11 @@ def is_footer_date(text: str) -> bool:
 
 
 def global_clean(text: str) -> str:
-    if not text:
-        return ""
-    cleaned = text
-    for p in GLOBAL_REMOVE_PATTERNS:
-        cleaned = re.sub(p, "", cleaned, flags=re.DOTALL)
-
-    cleaned = re.sub(r"European Union, 20\d{2}.*$", "", cleaned, flags=re.DOTALL)
-
-    cleaned = re.sub(r"\n\s*\n\s*\n+", "\n\n", cleaned)
-    return cleaned.strip()
+    return BOILERPLATE.clean(text)
 
 
 def load_state() -> int:
-    """Učitava last_index iz STATE_FILE. Ako ne postoji → 0."""
+    """Učitava stari last_index iz STATE_FILE. Ako ne postoji → 0."""
     if not Path(STATE_FILE).exists():
         return 0
     try:
@@ -100,43 +125,6 @@ def load_state() -> int:
         return 0
 
 
-def save_state(index: int) -> None:
-    """Upisuje last_index u STATE_FILE."""
-    with open(STATE_FILE, "w", encoding="utf-8") as f:
-        json.dump({"last_index": index}, f, ensure_ascii=False, indent=2)
-
-
-def fetch_html(url: str):
-    for attempt in range(1, MAX_RETRIES + 1):
-        try:
-            r = requests.get(url, headers=HEADERS, timeout=15)
-
-            if r.status_code == 200:
-                return r.text
-
-            if r.status_code == 429:
-                sleep = min(90, random.uniform(5, 15) * attempt)
-                print(f"⚠️ 429 → sleep {sleep:.1f}s")
-                time.sleep(sleep)
-                continue
-
-            if 500 <= r.status_code < 600:
-                sleep = 4 + attempt * 3
-                print(f"⚠️ {r.status_code} → sleep {sleep}s")
-                time.sleep(sleep)
-                continue
-
-            print(f"❌ HTTP {r.status_code} {url}")
-            return None
-
-        except Exception as e:
-            sleep = 4 + attempt * 3
-            print(f"❌ Network error {e} → sleep {sleep}s")
-            time.sleep(sleep)
-
-    return None
-
-
 def extract_dates(doc: html.HtmlElement):
     """Pokušaj izvlačenja datuma iz header/template polja."""
     try:
@@ -197,10 +185,10 @@ def extract_content(doc: html.HtmlElement) -> str:
         if not txt:
             continue
 
-        if any(txt.startswith(stop) for stop in STOP_PHRASES):
+        if BOILERPLATE.stops(txt):
             break
 
-        if any(skip in txt for skip in SKIP_LINES):
+        if BOILERPLATE.skips(txt):
             continue
 
         txt = clean_spaces(txt)
@@ -225,14 +213,83 @@ def extract_content(doc: html.HtmlElement) -> str:
     return global_clean("\n\n".join(lines))
 
 
+def extract_article(obj: dict, html_text):
+    """Popunjava obj (ulazni item) datumima i sadržajem iz preuzetog HTML-a."""
+    if not html_text:
+        obj["success"] = False
+        obj["content"] = ""
+        obj["date_published"] = ""
+        obj["date_updated"] = ""
+        obj["error"] = "fetch_failed"
+        return obj
+
+    try:
+        doc = html.fromstring(html_text)
+    except Exception as e:
+        obj["success"] = False
+        obj["content"] = ""
+        obj["date_published"] = ""
+        obj["date_updated"] = ""
+        obj["error"] = f"html_parse_error: {e}"
+        return obj
+
+    pub, upd = extract_dates(doc)
+    content = extract_content(doc)
+
+    obj["date_published"] = pub
+    obj["date_updated"] = upd
+    obj["content"] = content
+    obj["success"] = bool(content)
+    obj["error"] = None if content else "empty_content"
+    return obj
+
+
+def stream_stop():
+    """
+    Detektor kraja članka za streaming fetch: prva <article> u <main>, ili
+    STOP_PHRASES — ali tek kada su oba datuma (XPATH_PUBLISHED/UPDATED) već stigla.
+    """
+    return ArticleEndDetector(
+        container="article",
+        inside="main",
+        stop_phrases=STOP_PHRASES,
+        require_xpaths=(XPATH_PUBLISHED, XPATH_UPDATED),
+    )
+
+
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="bez mreže: stranice se čitaju iz arhive (data/raw/archive), od indexa 0",
+    )
+    parser.add_argument(
+        "--redrive",
+        action="store_true",
+        help="ponovo samo URL-ovi iz dead-letter fajla; izlaz se dopisuje",
+    )
+    parser.add_argument(
+        "--worker",
+        help="ime radnika: više procesa/mašina deli frontier (CRAWL_FRONTIER_DB) "
+        "preko lease-ova, izlaz ide u <OUTPUT>.<ime>.jsonl",
+    )
+    args = parser.parse_args()
+    if args.worker and args.replay:
+        parser.error("--worker ne radi sa --replay (replay ne koristi frontier)")
+    output_file = worker_output(OUTPUT_FILE, args.worker)
+
+    dead_letter = None if args.replay else DeadLetterQueue(FRONTIER_SOURCE)
+
+    if args.replay:
+        print("REPLAY MODE (iz arhive, state se ne menja)")
 
     if TEST_LIMIT:
         print(f"TEST MODE: limit = {TEST_LIMIT} URL-ova")
-        print(f"Output: {OUTPUT_FILE}")
+        print(f"Output: {output_file}")
     else:
         print("FULL CRAWL MODE (bez limita)")
-        print(f"Output: {OUTPUT_FILE}")
+        print(f"Output: {output_file}")
 
     if not Path(INPUT_URLS_FILE).exists():
         print("INPUT not found:", INPUT_URLS_FILE)
@@ -250,77 +307,103 @@ def main():
 
     print(f"✔ Učitan fajl {INPUT_URLS_FILE} | ukupno URL-ova: {total_items}")
 
-    start_index = load_state()
-    if start_index >= total_items:
-        print(f"STATE ({start_index}) >= total_items ({total_items}) → ništa za rad.")
-        return
-
-    mode = "a" if Path(OUTPUT_FILE).exists() and start_index > 0 else "w"
-    fout = open(OUTPUT_FILE, mode, encoding="utf-8")
-
-    print(f"▶ Krećem od indexa {start_index} (0-based). Output mode: {mode}")
-
-    success_count = 0
-    fail_count = 0
-    processed_in_this_run = 0
-
-    for idx in range(start_index, total_items):
-
-        if TEST_LIMIT and processed_in_this_run >= TEST_LIMIT:
-            print(f"\n Test limit dostignut: {TEST_LIMIT} URL-ova")
-            save_state(idx)
-            break
-
-        obj = items[idx]
-        url = obj.get("url")
-
+    if args.replay:
+        frontier = None
+        done_before = 0
+        batches = [items[:TEST_LIMIT] if TEST_LIMIT else items]
+        todo = len(batches[0])
+    elif args.redrive:
+        frontier = Frontier(FRONTIER_SOURCE, owner=args.worker)
+        done_before = 0
+        batches = [dead_letter.take()]
+        todo = len(batches[0])
+        print(f"Dead-letter re-drive: {todo} URL-ova")
+    else:
+        frontier = Frontier(FRONTIER_SOURCE, owner=args.worker)
+        by_url = {obj["url"]: obj for obj in items if obj.get("url")}
+        if frontier.add(by_url) == len(by_url):
+            # prvi put na frontier-u: preuzmi napredak iz starog eu_ds_state.json
+            frontier.mark_done([obj.get("url") for obj in items[: load_state()]])
+
+        counts = frontier.counts()
+        done_before = counts.get("done", 0) + counts.get("failed", 0)
+        todo = counts.get("pending", 0) + counts.get("in_progress", 0)
+        if TEST_LIMIT:
+            todo = min(todo, TEST_LIMIT)
+        if todo == 0:
+            print(f"Frontier: {done_before}/{total_items} obrađeno → ništa za rad.")
+            frontier.close()
+            return
+        batches = frontier.batches(by_url, limit=TEST_LIMIT)
+
+    append = done_before > 0 or args.redrive or args.worker
+    mode = "a" if append and output_file.exists() else "w"
+    fout = open(output_file, mode, encoding="utf-8")
+
+    print(f"▶ Za obradu: {todo} (obrađeno ranije: {done_before}). Output mode: {mode}")
+
+    stats = {"success": 0, "fail": 0, "processed": 0}
+
+    def on_result(i, obj, record):
+        if record is None:
+            record = extract_article(obj, None)
+            record["error"] = "extract_error"
+
+        stats["processed"] += 1
         print(
-            f"\n[{processed_in_this_run + 1}/{TEST_LIMIT if TEST_LIMIT else total_items}] Fetching: {url}"
+            f"[{stats['processed']}/{todo}] "
+            f"{'✔' if record['success'] else '✖'} {obj.get('url')}"
         )
-
-        html_text = fetch_html(url)
-
-        if not html_text:
-            obj["success"] = False
-            obj["content"] = ""
-            obj["date_published"] = ""
-            obj["date_updated"] = ""
-            obj["error"] = "fetch_failed"
-            fail_count += 1
+        if record["success"]:
+            stats["success"] += 1
+            record["fingerprint"] = record_fingerprint(record, FINGERPRINT_FIELDS)
         else:
-            try:
-                doc = html.fromstring(html_text)
-            except Exception as e:
-                obj["success"] = False
-                obj["content"] = ""
-                obj["date_published"] = ""
-                obj["date_updated"] = ""
-                obj["error"] = f"html_parse_error: {e}"
-                fail_count += 1
-            else:
-                pub, upd = extract_dates(doc)
-                content = extract_content(doc)
-
-                obj["date_published"] = pub
-                obj["date_updated"] = upd
-                obj["content"] = content
-                obj["success"] = bool(content)
-                obj["error"] = None if content else "empty_content"
+            stats["fail"] += 1
 
-                if obj["success"]:
-                    success_count += 1
-                else:
-                    fail_count += 1
-
-        fout.write(json.dumps(obj, ensure_ascii=False) + "\n")
+        fout.write(json.dumps(record, ensure_ascii=False) + "\n")
         fout.flush()
+        if frontier:
+            if record["success"]:
+                frontier.complete(obj["url"], record["fingerprint"])
+            else:
+                frontier.fail(obj["url"], record["error"])
+
+    engine = CrawlEngine(
+        headers=HEADERS,
+        concurrency=CONCURRENCY,
+        per_host=PER_HOST,
+        timeout=15,
+        max_retries=MAX_RETRIES,
+        rate=AIMDRateController(initial_rate=1.5),
+        cache=(
+            HttpCache(FRONTIER_SOURCE, code_version(__file__))
+            if USE_HTTP_CACHE
+            else None
+        ),
+        archive=ResponseArchive(),
+        replay=args.replay,
+        dead_letter=dead_letter,
+        telemetry=CrawlTelemetry(FRONTIER_SOURCE, worker=args.worker),
+        stream_stop=stream_stop if STREAM_FETCH else None,
+    )
+    # heartbeat obnavlja lease-ove dok radnik živi; mrtvom radniku ističu
+    with frontier.keep_leases() if frontier else nullcontext():
+        for batch in batches:
+            engine.crawl(batch, extract_article, on_result)
 
-        save_state(idx + 1)
-        processed_in_this_run += 1
+    if TEST_LIMIT and stats["processed"] >= TEST_LIMIT:
+        print(f"\n Test limit dostignut: {TEST_LIMIT} URL-ova")
 
-        time.sleep(random.uniform(0.3, 0.9))
+    success_count = stats["success"]
+    fail_count = stats["fail"]
+    processed_in_this_run = stats["processed"]
 
     fout.close()
+    # radnik svoj fajl dopisuje u glavni izlaz; URL ponovo preuzet (lastmod se
+    # pomerio) → ostaje samo najnoviji zapis
+    deduped = finish_output(OUTPUT_FILE, args.worker)
+    if deduped:
+        print(f"Uklonjeno starih verzija članaka: {deduped}")
 
     print("\n" + "=" * 50)
     if TEST_LIMIT:
@@ -333,15 +416,26 @@ def main():
     print(f"   ✔ success: {success_count}")
     print(f"   ✖ fail:    {fail_count}")
     print(f"   Σ processed: {processed_in_this_run}")
+    for host, st in engine.rate.snapshot().items():
+        print(
+            f"   ⏱ {host}: {st['rate']} req/s | zahteva: {st['requests']}"
+            f" | backoff: {st['backoffs']}"
+        )
+    if not frontier:
+        return
+
+    counts = frontier.counts()
+    frontier.close()
     print(
-        f" Ukupno do sada (sa state-om): {start_index + processed_in_this_run}/{total_items}"
+        f" Frontier: done {counts.get('done', 0)} | failed {counts.get('failed', 0)}"
+        f" | pending {counts.get('pending', 0)} / {total_items}"
     )
+    if frontier.reassigned:
+        print(f" Preuzeto od radnika sa isteklim lease-om: {frontier.reassigned}")
 
-    if TEST_LIMIT and (start_index + processed_in_this_run) < total_items:
+    if TEST_LIMIT and counts.get("pending", 0):
         print("Za full crawl, postavi TEST_LIMIT = None i pokreni ponovo")
-        print(
-            f"State je sačuvan, nastavlja se od indexa {start_index + processed_in_this_run}"
-        )
+        print("Napredak je u frontier-u, sledeće pokretanje nastavlja od pending URL-ova")
 
 
 if __name__ == "__main__":
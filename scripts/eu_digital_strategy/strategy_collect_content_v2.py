@@ -1,14 +1,26 @@
+import argparse
 import json
-import random
-import time
+import sys
+from contextlib import nullcontext
 from pathlib import Path
 
-import requests
 from lxml import html
 
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(ROOT))
+
+from crawler.archive import ResponseArchive  # noqa: E402
+from crawler.dead_letter import DeadLetterQueue  # noqa: E402
+from crawler.engine import CrawlEngine  # noqa: E402
+from crawler.frontier import Frontier, content_hash  # noqa: E402
+from crawler.http_cache import HttpCache, code_version  # noqa: E402
+from crawler.rate import AIMDRateController  # noqa: E402
+from crawler.telemetry import CrawlTelemetry  # noqa: E402
+
 INPUT_FILE = "eu_news_full_20251120_0008.json"
 OUTPUT_DIR = Path("content_output")
-STATE_FILE = Path("content_state.json")
+STATE_FILE = Path("content_state.json")  # stari done_urls, samo za prelazak na frontier
+FRONTIER_SOURCE = "eu_ds_content"
 
 OUTPUT_DIR.mkdir(exist_ok=True)
 
@@ -21,7 +33,9 @@ HEADERS = {
 }
 
 MAX_RETRIES = 7
-BASE_SLEEP = 1.5
+CONCURRENCY = 8
+PER_HOST = 4
+USE_HTTP_CACHE = True  # ETag/Last-Modified revalidacija (304 → bez ekstrakcije)
 
 
 def load_urls(path: str):
@@ -61,45 +75,6 @@ def load_state():
         return st
 
 
-def save_state(state):
-    state_copy = dict(state)
-    state_copy["done_urls"] = list(state_copy["done_urls"])
-    with open(STATE_FILE, "w", encoding="utf-8") as f:
-        json.dump(state_copy, f, indent=2, ensure_ascii=False)
-
-
-def fetch_page(url: str):
-    for attempt in range(1, MAX_RETRIES + 1):
-        try:
-            r = requests.get(url, headers=HEADERS, timeout=12)
-            if r.status_code == 200:
-                return r.text
-
-            if r.status_code == 429:
-                wait = min(60, BASE_SLEEP * attempt * random.uniform(1.3, 2.2))
-                print(f"⚠️ 429 → čekam {wait:.1f}s (pokušaj {attempt}/{MAX_RETRIES})")
-                time.sleep(wait)
-                continue
-
-            if 500 <= r.status_code < 600:
-                wait = 2 + attempt * 2
-                print(
-                    f" {r.status_code} → pauza {wait}s (pokušaj {attempt}/{MAX_RETRIES})"
-                )
-                time.sleep(wait)
-                continue
-
-            print(f" HTTP {r.status_code} → {url}")
-            return None
-
-        except Exception as e:
-            wait = 2 + attempt * 2
-            print(f" Greška: {e} → čekam {wait}s")
-            time.sleep(wait)
-
-    return None
-
-
 def extract_content(html_text: str):
     try:
         doc = html.fromstring(html_text)
@@ -110,46 +85,120 @@ def extract_content(html_text: str):
         return None
 
 
+def fill_item(job, html_text):
+    _, obj = job
+    if not html_text:
+        obj["success"] = False
+        obj["error"] = "fetch_failed"
+        return obj
+
+    content = extract_content(html_text)
+    if not content:
+        obj["success"] = False
+        obj["error"] = "parse_failed"
+    else:
+        obj["success"] = True
+        obj["content"] = content
+    return obj
+
+
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="bez mreže: stranice se čitaju iz arhive (data/raw/archive), od početka",
+    )
+    parser.add_argument(
+        "--redrive",
+        action="store_true",
+        help="ponovo samo URL-ovi iz dead-letter fajla",
+    )
+    parser.add_argument(
+        "--worker",
+        help="ime radnika: više procesa/mašina deli frontier (CRAWL_FRONTIER_DB) "
+        "preko lease-ova; izlaz je već po fajlu (content_NNNNN.json)",
+    )
+    args = parser.parse_args()
+    if args.worker and args.replay:
+        parser.error("--worker ne radi sa --replay (replay ne koristi frontier)")
+
+    dead_letter = None if args.replay else DeadLetterQueue(FRONTIER_SOURCE)
+
     items = load_urls(INPUT_FILE)
     total = len(items)
 
     print(f" Ukupno URL-ova za obradu: {total}")
 
-    state = load_state()
-
-    for idx in range(state["last_index"], total):
-        obj = items[idx]
-        url = obj.get("url")
+    jobs = {}
+    for idx, item in enumerate(items):
+        if item.get("url"):
+            jobs.setdefault(item["url"], (idx, item))
+
+    if args.replay:
+        print("REPLAY MODE (iz arhive, frontier se ne menja)")
+        frontier = None
+        batches = [sorted(jobs.values(), key=lambda job: job[0])]
+    elif args.redrive:
+        frontier = Frontier(FRONTIER_SOURCE, owner=args.worker)
+        batches = [[tuple(job) for job in dead_letter.take()]]
+        print(f" Dead-letter re-drive: {len(batches[0])} URL-ova")
+    else:
+        frontier = Frontier(FRONTIER_SOURCE, owner=args.worker)
+        if frontier.add(jobs) == len(jobs):
+            # prvi put na frontier-u: preuzmi done_urls iz starog content_state.json
+            frontier.mark_done(load_state()["done_urls"])
+        counts = frontier.counts()
+        print(
+            f" Frontier: urađeno {counts.get('done', 0)} | "
+            f"za obradu {counts.get('pending', 0)}"
+        )
+        batches = frontier.batches(jobs)
 
+    def on_result(_, job, obj):
+        idx, item = job
+        url = item.get("url")
         print(f"[{idx+1}/{total}] → {url}")
-
-        if url in state["done_urls"]:
-            print("   ↳ preskačem (već urađeno)")
-            continue
-
-        html_text = fetch_page(url)
-        if not html_text:
-            obj["success"] = False
-            obj["error"] = "fetch_failed"
-        else:
-            content = extract_content(html_text)
-            if not content:
-                obj["success"] = False
-                obj["error"] = "parse_failed"
-            else:
-                obj["success"] = True
-                obj["content"] = content
+        if obj is None:
+            obj = dict(item, success=False, error="extract_error")
 
         out_path = OUTPUT_DIR / f"content_{idx+1:05d}.json"
         with open(out_path, "w", encoding="utf-8") as f:
             json.dump(obj, f, indent=2, ensure_ascii=False)
 
-        state["done_urls"].add(url)
-        state["last_index"] = idx + 1
-        save_state(state)
-
-        time.sleep(random.uniform(0.2, 0.7))
+        if frontier:
+            if obj.get("success"):
+                frontier.complete(url, content_hash(obj["content"]))
+            else:
+                frontier.fail(url, obj.get("error"))
+
+    engine = CrawlEngine(
+        headers=HEADERS,
+        concurrency=CONCURRENCY,
+        per_host=PER_HOST,
+        timeout=12,
+        max_retries=MAX_RETRIES,
+        rate=AIMDRateController(initial_rate=2.0),
+        cache=(
+            HttpCache(FRONTIER_SOURCE, code_version(__file__))
+            if USE_HTTP_CACHE
+            else None
+        ),
+        archive=ResponseArchive(),
+        replay=args.replay,
+        dead_letter=dead_letter,
+        telemetry=CrawlTelemetry(FRONTIER_SOURCE, worker=args.worker),
+    )
+    # heartbeat obnavlja lease-ove dok radnik živi; mrtvom radniku ističu
+    with frontier.keep_leases() if frontier else nullcontext():
+        for batch in batches:
+            engine.crawl(
+                batch, fill_item, on_result, url_of=lambda job: job[1].get("url")
+            )
+    if frontier:
+        if frontier.reassigned:
+            print(f" Preuzeto od radnika sa isteklim lease-om: {frontier.reassigned}")
+        frontier.close()
 
     print("🎉 GOTOVO – sve obradjeno!")
 
@@ -1,12 +1,22 @@
+import argparse
 import json
 import re
+import sys
 import time
 from datetime import datetime
+from pathlib import Path
 from urllib.parse import urljoin
 
 import requests
 from bs4 import BeautifulSoup
 
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(ROOT))
+
+from crawler.discovery import STOP_AFTER_KNOWN, KnownUrlRun, load_known_items  # noqa: E402
+from crawler.engine import host_of  # noqa: E402
+from crawler.rate import AIMDRateController  # noqa: E402
+
 BASE = "https://digital-strategy.ec.europa.eu"
 START_URL = f"{BASE}/en/news"
 HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
@@ -15,13 +25,47 @@ HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
 STATE_FILE = "eu_news_collector_state.json"
 
 
+def latest_collection():
+    """Najnoviji eu_news_full_*.json u tekućem folderu (ili None)."""
+    files = sorted(Path(".").glob("eu_news_full_*.json"))
+    return files[-1] if files else None
+
+
 class EUFullNewsCollectorWithState:
-    def __init__(self):
+    def __init__(self, incremental_from=None, stop_after=STOP_AFTER_KNOWN):
         self.session = requests.Session()
         self.session.headers = HEADERS
+        self.rate = AIMDRateController(initial_rate=0.5)
         self.items = []
         self.seen_urls = set()
-        self.state = self._load_state()
+
+        # incremental: poznati URL-ovi iz prethodnog eu_news_full_*.json;
+        # paginacija staje posle `stop_after` poznatih zaredom
+        self.incremental = incremental_from is not None
+        self.known_items = (
+            load_known_items(incremental_from) if self.incremental else []
+        )
+        self.tracker = KnownUrlRun(
+            [it["url"] for it in self.known_items],
+            stop_after if self.incremental else None,
+        )
+        if self.incremental:
+            print(
+                f"🔁 INCREMENTAL: {len(self.known_items)} poznatih URL-ova "
+                f"iz {incremental_from}"
+            )
+            self.state = self._new_state()
+        else:
+            self.state = self._load_state()
+
+    def _new_state(self):
+        return {
+            "current_page": 0,
+            "total_collected": 0,
+            "last_successful_page": 0,
+            "started_at": datetime.now().isoformat(),
+            "last_updated": datetime.now().isoformat(),
+        }
 
     def _load_state(self):
         """Učitava state ako postoji, inače kreira novi"""
@@ -32,16 +76,13 @@ class EUFullNewsCollectorWithState:
                 return state
         except FileNotFoundError:
             print("🆕 POKREĆEM OD POČETKA")
-            return {
-                "current_page": 0,
-                "total_collected": 0,
-                "last_successful_page": 0,
-                "started_at": datetime.now().isoformat(),
-                "last_updated": datetime.now().isoformat(),
-            }
+            return self._new_state()
 
     def _save_state(self):
-        """Čuva trenutni state"""
+        """Čuva trenutni state (incremental prolaz ne dira state punog prolaza)"""
+        if self.incremental:
+            return
+
         self.state.update(
             {
                 "current_page": self.state.get("current_page", 0),
@@ -56,6 +97,9 @@ class EUFullNewsCollectorWithState:
 
     def _save_checkpoint(self):
         """Čuva checkpoint sa podacima i state-om"""
+        if self.incremental:
+            return
+
         checkpoint_data = {
             "state": self.state,
             "items": self.items,
@@ -69,26 +113,34 @@ class EUFullNewsCollectorWithState:
         print(f"💾 Checkpoint sačuvan: {checkpoint_file}")
 
     def _get_soup(self, url, retry_label=""):
-        """Stabilan HTTP sa pametnim rate-limit retry mehanizmom."""
+        """HTTP GET sa adaptivnim tempom (AIMD): 429/Retry-After → uspori."""
+        host = host_of(url)
         for attempt in range(5):
+            self.rate.wait(host)
+            started = time.monotonic()
             try:
                 r = self.session.get(url, timeout=20)
+            except Exception as e:
+                print(f"💥 ERROR {url}: {e}")
+                self.rate.on_error(host, e)
+                continue
 
-                if r.status_code == 429:
-                    wait = (attempt + 1) * 20
-                    print(f"⏳ RATE LIMIT {retry_label}! Čekam {wait}s...")
-                    time.sleep(wait)
-                    continue
+            self.rate.on_response(
+                host,
+                r.status_code,
+                time.monotonic() - started,
+                r.headers.get("Retry-After"),
+            )
 
-                if r.status_code != 200:
-                    print(f"⚠️ STATUS {r.status_code} → {url}")
-                    return None
+            if r.status_code == 429 or 500 <= r.status_code < 600:
+                print(f"⏳ {r.status_code} {retry_label} → pokušaj {attempt + 1}/5")
+                continue
 
-                return BeautifulSoup(r.text, "html.parser")
+            if r.status_code != 200:
+                print(f"⚠️ STATUS {r.status_code} → {url}")
+                return None
 
-            except Exception as e:
-                print(f"💥 ERROR {url}: {e}")
-                time.sleep(10)
+            return BeautifulSoup(r.text, "html.parser")
 
         return None
 
@@ -142,7 +194,6 @@ class EUFullNewsCollectorWithState:
                     break
                 current_page += 1
                 self.state["current_page"] = current_page
-                time.sleep(3)
                 continue
 
             consecutive_empty = 0
@@ -159,6 +210,9 @@ class EUFullNewsCollectorWithState:
                     continue
                 self.seen_urls.add(full_url)
 
+                if not self.tracker.check(full_url):
+                    continue
+
                 title = link.get_text(strip=True)
                 date_listing, news_type = self._extract_date_and_type(link)
 
@@ -185,6 +239,11 @@ class EUFullNewsCollectorWithState:
             if current_page % checkpoint_interval == 0:
                 self._save_checkpoint()
 
+            if self.tracker.exhausted:
+                print(f"🏁 {self.tracker.run} poznatih URL-ova zaredom — kraj novih vesti.")
+                self.state["completed"] = True
+                break
+
             next_btn = soup.select_one(".ecl-pagination__item--next a, .pager-next a")
             if not next_btn:
                 print("🏁 KRAJ PAGINACIJE — GOTOVO!")
@@ -193,40 +252,43 @@ class EUFullNewsCollectorWithState:
                 break
 
             current_page += 1
-            time.sleep(2)
 
         new_items = len(self.items) - total_before
         print(f"\n📈 U ovoj sesiji: {new_items} novih vesti")
+        for host, st in self.rate.snapshot().items():
+            print(f"⏱ {host}: {st['rate']} req/s, backoff: {st['backoffs']}x")
         return self.items
 
     def save_final(self):
         """Čuva finalne rezultate i briše state fajl."""
         filename = f"eu_news_full_{datetime.now().strftime('%Y%m%d_%H%M')}.json"
 
+        # incremental: nove vesti (listing je od najnovijeg) + prethodna kolekcija
+        items = self.items + self.known_items
+
         type_stats = {}
-        for item in self.items:
+        for item in items:
             t = item["news_type"]
             type_stats[t] = type_stats.get(t, 0) + 1
 
         out = {
             "metadata": {
                 "collected_at": datetime.now().isoformat(),
-                "total_urls": len(self.items),
-                "urls_with_dates": len([x for x in self.items if x["date_listing"]]),
-                "urls_without_dates": len(
-                    [x for x in self.items if not x["date_listing"]]
-                ),
+                "total_urls": len(items),
+                "new_urls": len(self.items),
+                "urls_with_dates": len([x for x in items if x["date_listing"]]),
+                "urls_without_dates": len([x for x in items if not x["date_listing"]]),
                 "news_by_type": type_stats,
                 "base_url": BASE,
                 "collection_completed": self.state.get("completed", False),
             },
-            "items": self.items,
+            "items": items,
         }
 
         with open(filename, "w", encoding="utf-8") as f:
             json.dump(out, f, indent=2, ensure_ascii=False)
 
-        if self.state.get("completed"):
+        if self.state.get("completed") and not self.incremental:
             import os
 
             if os.path.exists(STATE_FILE):
@@ -234,7 +296,7 @@ class EUFullNewsCollectorWithState:
                 print(" Obrisan state fajl (završeno)")
 
         print(f"\n Finalni fajl: {filename}")
-        print(f" Ukupno URL-ova: {len(self.items)}")
+        print(f" Ukupno URL-ova: {len(items)} (novih: {len(self.items)})")
 
         print(" STATISTIKA TIPOVA:")
         for t, c in type_stats.items():
@@ -244,7 +306,27 @@ class EUFullNewsCollectorWithState:
 
 
 def main():
-    collector = EUFullNewsCollectorWithState()
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--incremental",
+        nargs="?",
+        const="latest",
+        metavar="EU_NEWS_FULL_JSON",
+        help="samo nove vesti u odnosu na prethodnu kolekciju "
+        "(podrazumevano najnoviji eu_news_full_*.json)",
+    )
+    parser.add_argument("--stop-after", type=int, default=STOP_AFTER_KNOWN)
+    args = parser.parse_args()
+
+    base = args.incremental
+    if base == "latest":
+        base = latest_collection()
+        if base is None:
+            print("Nema prethodne kolekcije → radim pun prolaz.")
+
+    collector = EUFullNewsCollectorWithState(
+        incremental_from=base, stop_after=args.stop_after
+    )
 
     start = datetime.now()
     items = collector.collect_all_news()
@@ -257,7 +339,9 @@ def main():
     print(f" Trajanje: {duration:.1f} min")
     print(f" Ukupno vesti: {len(items)}")
 
-    if collector.state.get("completed"):
+    if collector.incremental:
+        print(" INCREMENTAL DOPUNA GOTOVA!")
+    elif collector.state.get("completed"):
         print(" KOMPLETNA ARHIVA SKINUTA!")
     else:
         print(" SKUPLJANJE PAUZIRANO - POKRENI PONOVO DA NASTAVIŠ!")
@@ -2,8 +2,6 @@ import json
 import uuid
 from pathlib import Path
 
-from scripts.weaviate_client import WVT
-
 CLASS_NAME = "PolicyChunksUnified"
 
 
@@ -25,6 +23,27 @@ def fix_date(value):
     return v
 
 
+def build_item(obj):
+    """(uuid, props) jednog DigWatch chunka; UUID je izveden iz chunk ID-ja."""
+    uid = str(uuid.uuid5(uuid.NAMESPACE_URL, obj["id"]))
+
+    tags = obj.get("tags") or []
+    tags = [str(t).lower() for t in tags]
+
+    props = {
+        "title": obj.get("title") or "",
+        "text": (obj.get("text") or "").strip(),
+        "url": obj.get("url") or "",
+        "source": obj.get("source") or "digwatch",
+        "origin_site": obj.get("origin_site") or "digwatch",
+        "date": fix_date(obj.get("date")),
+        "quarter": obj.get("quarter"),
+        "categories": obj.get("categories") or [],
+        "tags": tags,
+    }
+    return uid, props
+
+
 def load_digwatch():
     if not DIGWATCH_DATA.exists():
         print("[digwatch] ❌ Fajl ne postoji!")
@@ -43,38 +62,18 @@ def load_digwatch():
             if not text:
                 continue
 
-            raw_id = obj.get("id")
-            if not raw_id:
+            if not obj.get("id"):
                 continue
 
-            uid = str(uuid.uuid5(uuid.NAMESPACE_URL, raw_id))
-
-            date = fix_date(obj.get("date"))
-
-            quarter = obj.get("quarter")
-
-            tags = obj.get("tags") or []
-            tags = [str(t).lower() for t in tags]
-
-            props = {
-                "title": obj.get("title") or "",
-                "text": text,
-                "url": obj.get("url") or "",
-                "source": obj.get("source") or "digwatch",
-                "origin_site": obj.get("origin_site") or "digwatch",
-                "date": date,
-                "quarter": quarter,
-                "categories": obj.get("categories") or [],
-                "tags": tags,
-            }
-
-            items.append((uid, props))
+            items.append(build_item(obj))
 
     print(f"[digwatch] ukupno chunkova: {len(items)}")
     return items
 
 
 def main():
+    # WVT tek ovde: build_item() koristi i push_ingest bez konekcije na Weaviate
+    from scripts.weaviate_client import WVT
 
     schema = WVT.schema.get()
     classes = {c["class"] for c in schema.get("classes", [])}
@@ -1,8 +1,9 @@
+import argparse
 import json
 import uuid
 from pathlib import Path
 
-from scripts.weaviate_client import WVT
+from scripts.ingest_state import IngestState
 
 CLASS_NAME = "PolicyChunksUnified"
 
@@ -44,7 +45,32 @@ def stable_uuid(url, idx):
     return str(uuid.uuid5(uuid.NAMESPACE_URL, base))
 
 
-def load_eu_ds():
+def build_item(obj, idx):
+    """(uuid, props) za idx-ti chunk članka (idx broji chunkove po URL-u, od 1)."""
+    url = (obj.get("url") or "").rstrip("/")
+    date_iso = to_rfc3339(obj.get("date"))
+    quarter = obj.get("quarter") or to_quarter(date_iso)
+
+    raw_tags = obj.get("tags") or []
+    tags = [t.lower().strip() for t in raw_tags if t]
+
+    categories = [(c or "").strip() for c in (obj.get("categories") or [])]
+
+    props = {
+        "title": obj.get("title") or "",
+        "text": (obj.get("text") or "").strip(),
+        "url": url,
+        "source": obj.get("source") or "eu-news",
+        "origin_site": "digital-strategy",
+        "date": date_iso,
+        "quarter": quarter,
+        "categories": categories,
+        "tags": tags,
+    }
+    return stable_uuid(url, idx), props
+
+
+def load_eu_ds(state):
     if not EU_DS_DATA.exists():
         print("[eu-ds] Fajl ne postoji → preskačem.")
         return []
@@ -67,47 +93,41 @@ def load_eu_ds():
             if not url:
                 continue
 
-            raw_date = obj.get("date")
-            date_iso = to_rfc3339(raw_date)
-            quarter = obj.get("quarter") or to_quarter(date_iso)
-
             key = ("digital-strategy", url)
             counters[key] = counters.get(key, 0) + 1
             idx = counters[key]
 
-            uid = stable_uuid(url, idx)
-
-            raw_tags = obj.get("tags") or []
-            tags = [t.lower().strip() for t in raw_tags if t]
-
-            categories = [(c or "").strip() for c in (obj.get("categories") or [])]
-
-            props = {
-                "title": obj.get("title") or "",
-                "text": text,
-                "url": url,
-                "source": obj.get("source") or "eu-news",
-                "origin_site": "digital-strategy",
-                "date": date_iso,
-                "quarter": quarter,
-                "categories": categories,
-                "tags": tags,
-            }
+            # članak sa istim fingerprint-om kao u poslednjem ingest-u → preskoči
+            if state.unchanged(obj, url):
+                continue
 
-            items.append((uid, props))
+            items.append(build_item(obj, idx))
 
     print(f"[eu-ds] ukupno chunkova: {len(items)}")
     return items
 
 
 def main():
+    # WVT tek ovde: build_item() koristi i push_ingest bez konekcije na Weaviate
+    from scripts.weaviate_client import WVT
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="upiši sve chunkove, i one nepromenjenog fingerprint-a",
+    )
+    args = parser.parse_args()
+
     schema = WVT.schema.get()
     existing = {c["class"] for c in schema.get("classes", [])}
     if CLASS_NAME not in existing:
         print(" Schema ne postoji! Kreiraj je prvo preko glavne ingest skripte.")
         return
 
-    eu_ds_items = load_eu_ds()
+    state = IngestState("eu_ds", enabled=not args.all)
+    eu_ds_items = load_eu_ds(state)
+    print(f"[eu-ds] nepromenjeni chunkovi (preskočeni): {state.skipped}")
     total = len(eu_ds_items)
     if total == 0:
         print("Nema EU DS chunkova za ingest.")
@@ -126,6 +146,8 @@ def main():
                 pct = processed / total * 100
                 print(f"... upisano {processed}/{total} ({pct:.1f}%)")
 
+    state.save()
+
     print("---------------------------------------------")
     print(f"EU DS INGEST GOTOV: ukupno={processed}")
     print("---------------------------------------------")
@@ -1,9 +1,11 @@
 # scripts/ingest_ietf_unified.py
 
+import argparse
 import json
 import uuid
 from pathlib import Path
 
+from scripts.ingest_state import IngestState
 from scripts.weaviate_client import WVT
 
 CLASS_NAME = "PolicyChunksUnified"
@@ -25,7 +27,7 @@ def fix_date(value):
     return v
 
 
-def load_ietf():
+def load_ietf(state):
     if not INPUT_FILE.exists():
         print(f" Ne postoji fajl: {INPUT_FILE}")
         return []
@@ -47,6 +49,10 @@ def load_ietf():
             if not raw_id:
                 continue
 
+            # članak sa istim fingerprint-om kao u poslednjem ingest-u → preskoči
+            if state.unchanged(obj, obj.get("url") or ""):
+                continue
+
             uid = str(uuid.uuid5(uuid.NAMESPACE_URL, raw_id))
 
             date = fix_date(obj.get("date"))
@@ -73,6 +79,14 @@ def load_ietf():
 
 
 def ingest():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="upiši sve chunkove, i one nepromenjenog fingerprint-a",
+    )
+    args = parser.parse_args()
+
     print(" IETF INGEST START")
 
     schema = WVT.schema.get()
@@ -81,7 +95,9 @@ def ingest():
         print(" Klasa ne postoji!")
         return
 
-    ietf_items = load_ietf()
+    state = IngestState("ietf", enabled=not args.all)
+    ietf_items = load_ietf(state)
+    print(f"[ietf] nepromenjeni chunkovi (preskočeni): {state.skipped}")
     total = len(ietf_items)
 
     if total == 0:
@@ -101,6 +117,8 @@ def ingest():
                 pct = processed / total * 100
                 print(f"... upisano {processed}/{total} ({pct:.1f}%)")
 
+    state.save()
+
     print("---------------------------------------------")
     print(f"IETF INGEST GOTOV: ukupno={processed}")
     print("---------------------------------------------")
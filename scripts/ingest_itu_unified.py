@@ -1,7 +1,9 @@
+import argparse
 import json
 import uuid
 from pathlib import Path
 
+from scripts.ingest_state import IngestState
 from scripts.weaviate_client import WVT
 
 CLASS_NAME = "PolicyChunksUnified"
@@ -28,7 +30,7 @@ def fix_date(value):
     return v
 
 
-def load_itu():
+def load_itu(state):
     if not ITU_DATA.exists():
         print("[itu]  Fajl ne postoji!")
         return []
@@ -50,6 +52,10 @@ def load_itu():
             if not raw_id:
                 continue
 
+            # članak sa istim fingerprint-om kao u poslednjem ingest-u → preskoči
+            if state.unchanged(obj, obj.get("url") or ""):
+                continue
+
             uid = str(uuid.uuid5(uuid.NAMESPACE_URL, raw_id))
 
             date = fix_date(obj.get("date"))
@@ -77,6 +83,14 @@ def load_itu():
 
 
 def ingest():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="upiši sve chunkove, i one nepromenjenog fingerprint-a",
+    )
+    args = parser.parse_args()
+
     print(" ITU INGEST START")
 
     schema = WVT.schema.get()
@@ -86,7 +100,9 @@ def ingest():
         print(" Klasa ne postoji!")
         return
 
-    itu_items = load_itu()
+    state = IngestState("itu", enabled=not args.all)
+    itu_items = load_itu(state)
+    print(f"[itu] nepromenjeni chunkovi (preskočeni): {state.skipped}")
     total = len(itu_items)
 
     if total == 0:
@@ -106,6 +122,8 @@ def ingest():
                 pct = processed / total * 100
                 print(f"... upisano {processed}/{total} ({pct:.1f}%)")
 
+    state.save()
+
     print("---------------------------------------------")
     print(f" ITU INGEST GOTOV: ukupno={processed}")
     print("---------------------------------------------")
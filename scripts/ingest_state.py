@@ -0,0 +1,45 @@
+import json
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+STATE_DIR = ROOT / "data" / "processed" / "ingest_state"
+
+
+class IngestState:
+    """
+    Pamti fingerprint svakog članka (url → fingerprint) iz poslednjeg USPEŠNOG
+    ingest-a jednog izvora. Chunkovi članka čiji se fingerprint nije promenio
+    od tada se preskaču – već su u Weaviate-u sa istim UUID-jevima.
+
+    Fingerprint dolazi iz crawlera (crawler/fingerprint.py) preko chunk zapisa;
+    chunk bez fingerprint-a se uvek upisuje.
+    """
+
+    def __init__(self, source, enabled=True):
+        self.path = STATE_DIR / f"{source}.json"
+        self.enabled = enabled
+        self.done = {}
+        if enabled and self.path.exists():
+            self.done = json.loads(self.path.read_text(encoding="utf-8"))
+        self.pending = {}
+        self.skipped = 0
+
+    def unchanged(self, obj, url) -> bool:
+        """True → chunk se preskače; inače se fingerprint pamti za save()."""
+        fp = obj.get("fingerprint")
+        if not fp:
+            return False
+        if self.enabled and self.done.get(url) == fp:
+            self.skipped += 1
+            return True
+        self.pending[url] = fp
+        return False
+
+    def save(self):
+        """Poziva se tek posle uspešnog batch upisa."""
+        self.done.update(self.pending)
+        self.pending = {}
+        STATE_DIR.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(
+            json.dumps(self.done, ensure_ascii=False, indent=0), encoding="utf-8"
+        )
@@ -1,7 +1,9 @@
+import argparse
 import json
 import uuid
 from pathlib import Path
 
+from scripts.ingest_state import IngestState
 from scripts.weaviate_client import WVT
 
 CLASS_NAME = "PolicyChunksUnified"
@@ -25,7 +27,7 @@ def fix_date(value):
     return v
 
 
-def load_un():
+def load_un(state):
     if not UN_DATA.exists():
         print("[un]  Fajl ne postoji!")
         return []
@@ -47,6 +49,10 @@ def load_un():
             if not raw_id:
                 continue
 
+            # članak sa istim fingerprint-om kao u poslednjem ingest-u → preskoči
+            if state.unchanged(obj, obj.get("url") or ""):
+                continue
+
             uid = str(uuid.uuid5(uuid.NAMESPACE_DNS, raw_id))
 
             date = fix_date(obj.get("date"))
@@ -74,6 +80,14 @@ def load_un():
 
 
 def ingest():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="upiši sve chunkove, i one nepromenjenog fingerprint-a",
+    )
+    args = parser.parse_args()
+
     print(" UN INGEST START")
 
     schema = WVT.schema.get()
@@ -83,7 +97,9 @@ def ingest():
         print(" Klasa ne postoji!")
         return
 
-    un_items = load_un()
+    state = IngestState("un", enabled=not args.all)
+    un_items = load_un(state)
+    print(f"[un] nepromenjeni chunkovi (preskočeni): {state.skipped}")
     total = len(un_items)
 
     if total == 0:
@@ -103,6 +119,8 @@ def ingest():
                 pct = processed / total * 100
                 print(f"... upisano {processed}/{total} ({pct:.1f}%)")
 
+    state.save()
+
     print("---------------------------------------------")
     print(f" UN INGEST GOTOV: ukupno={processed}")
     print("---------------------------------------------")
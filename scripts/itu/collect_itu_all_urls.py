@@ -1,10 +1,17 @@
+import argparse
 import json
 import re
+import sys
 from pathlib import Path
 
 import requests
 from bs4 import BeautifulSoup
 
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(ROOT))
+
+from crawler.discovery import STOP_AFTER_KNOWN, KnownUrlRun, load_known_items  # noqa: E402
+
 BASE = "https://www.itu.int/hub/?s=&post_type=post&paged={}"
 HEADERS = {
     "User-Agent": (
@@ -18,10 +25,21 @@ NEWS_RE = re.compile(r"^https://www\.itu\.int/hub/\d{4}/\d{2}/.+?/?$")
 OUT = Path("itu_all_urls.jsonl")
 
 
-def collect_all():
+def collect_all(incremental=False, stop_after=STOP_AFTER_KNOWN):
+    """
+    Pun prolaz: stranice do "Nothing found" i upis celog OUT fajla.
+    incremental: staje posle `stop_after` uzastopnih već poznatih URL-ova
+    (iz postojećeg OUT fajla) i samo dopisuje nove URL-ove na kraj OUT-a.
+    """
     all_urls = {}
+    seen = set()
     page = 1
 
+    known = [it["url"] for it in load_known_items(OUT)] if incremental else []
+    tracker = KnownUrlRun(known, stop_after if incremental else None)
+    if incremental:
+        print(f"Incremental: {len(known)} poznatih URL-ova, stop posle {stop_after}")
+
     while True:
         url = BASE.format(page)
         resp = requests.get(url, headers=HEADERS, timeout=20)
@@ -34,6 +52,7 @@ def collect_all():
         soup = BeautifulSoup(resp.text, "html.parser")
 
         found_on_page = 0
+        links_on_page = 0
         for a in soup.find_all("a", href=True):
             href = a["href"].strip()
             if href.startswith("/hub/"):
@@ -46,7 +65,12 @@ def collect_all():
             if not title:
                 continue
 
-            if href not in all_urls:
+            if href in seen:
+                continue
+            seen.add(href)
+            links_on_page += 1
+
+            if tracker.check(href):
                 all_urls[href] = {
                     "url": href,
                     "title": title,
@@ -57,12 +81,17 @@ def collect_all():
 
         print(f"Page {page}: {found_on_page} URLs")
 
-        if found_on_page == 0:
+        if tracker.exhausted:
+            print(f"{tracker.run} poznatih URL-ova zaredom → kraj novih vesti")
+            break
+
+        # incremental: strana sa samo poznatim URL-ovima nije kraj listinga
+        if links_on_page == 0 or (found_on_page == 0 and not incremental):
             break
 
         page += 1
 
-    with OUT.open("w", encoding="utf-8") as f:
+    with OUT.open("a" if incremental else "w", encoding="utf-8") as f:
         for obj in all_urls.values():
             f.write(json.dumps(obj, ensure_ascii=False) + "\n")
 
@@ -71,4 +100,13 @@ def collect_all():
 
 
 if __name__ == "__main__":
-    collect_all()
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="samo nove vesti: staje kad naiđe na niz već poznatih URL-ova",
+    )
+    parser.add_argument("--stop-after", type=int, default=STOP_AFTER_KNOWN)
+    args = parser.parse_args()
+
+    collect_all(incremental=args.incremental, stop_after=args.stop_after)
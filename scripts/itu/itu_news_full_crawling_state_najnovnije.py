@@ -1,13 +1,28 @@
+import argparse
 import json
-import random
 import re
-import time
+import sys
+from contextlib import nullcontext
+from datetime import datetime
 from pathlib import Path
 
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
+from lxml import etree
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(ROOT))
+
+from crawler.archive import ResponseArchive  # noqa: E402
+from crawler.boilerplate import BoilerplateFilter  # noqa: E402
+from crawler.browser_pool import DEFAULT_SIZE, BrowserPool  # noqa: E402
+from crawler.dead_letter import DeadLetterQueue  # noqa: E402
+from crawler.engine import CrawlEngine  # noqa: E402
+from crawler.extract import get_text, parse_html  # noqa: E402
+from crawler.fingerprint import record_fingerprint  # noqa: E402
+from crawler.frontier import Frontier, finish_output, worker_output  # noqa: E402
+from crawler.http_cache import HttpCache, code_version  # noqa: E402
+from crawler.rate import AIMDRateController  # noqa: E402
+from crawler.streaming import ArticleEndDetector  # noqa: E402
+from crawler.telemetry import CrawlTelemetry  # noqa: E402
 
 # ----------------------------------------
 # CONFIG
@@ -15,9 +30,25 @@ from selenium.webdriver.common.by import By
 
 INPUT_FILE = "itu_all_urls.jsonl"
 OUTPUT_FILE = "itu_all_clean.jsonl"
-STATE_FILE = "itu_state.json"  # <--- DODATO (state resume)
+STATE_FILE = "itu_state.json"  # stari last_index, samo za prelazak na frontier
+FRONTIER_SOURCE = "itu"
 TEST_LIMIT = None  # None = full crawl
 
+CONCURRENCY = 8
+PER_HOST = 4
+USE_HTTP_CACHE = True  # ETag/Last-Modified revalidacija (304 → bez ekstrakcije)
+# polja koja ulaze u chunkove; nepromenjen fingerprint → chunker/ingest preskaču članak
+FINGERPRINT_FIELDS = ("date", "content")
+STREAM_FETCH = True  # čitanje stranice prekida se na kraju <main> / STOP_PHRASES
+# skraćena strana se arhivira označena kao skraćena (reextract / --replay je
+# koriste); izmena koja traži ostatak strane traži jedan crawl sa False
+
+# Chrome se koristi SAMO kao fallback kad statički HTML nema telo članka.
+# Na mašinama bez Chrome-a/selenium-a postaviti na False.
+BROWSER_FALLBACK = True
+BROWSER_POOL_SIZE = DEFAULT_SIZE  # paralelne Chrome instance (po broju jezgara)
+BROWSER_WAIT_CSS = "main p"  # render je gotov kad se pojavi telo članka
+
 SKIP_LINES = [
     "Share on Facebook",
     "Share on Twitter",
@@ -45,11 +76,27 @@ GLOBAL_REMOVE_PATTERNS = [
     r"^\s*-\s*News\s*$",
 ]
 
+# jedan kompajliran filter umesto petlji po listama (crawler/boilerplate.py)
+BOILERPLATE = BoilerplateFilter(
+    skip_lines=SKIP_LINES,
+    stop_prefixes=STOP_PHRASES,
+    remove_patterns=GLOBAL_REMOVE_PATTERNS,
+    flags=re.MULTILINE | re.DOTALL,
+)
+
 DATE_XPATH = '//*[@id="content"]/div/div[2]/div/div[1]/article/div[1]/div[1]/span'
 
+# fallback izvori datuma u statičkom HTML-u (WordPress / Yoast meta)
+DATE_META_XPATHS = [
+    '//meta[@property="article:published_time"]/@content',
+    '//meta[@name="article:published_time"]/@content',
+    "//time[@datetime]/@datetime",
+]
+DATE_JSONLD_RE = re.compile(r'"datePublished"\s*:\s*"([^"]+)"')
+
 
 def load_state() -> int:
-    """Returns the index from which we should resume crawling."""
+    """Old last_index; only read once when the source moves to the frontier."""
     if not Path(STATE_FILE).exists():
         return 0
     try:
@@ -60,61 +107,72 @@ def load_state() -> int:
         return 0
 
 
-def save_state(index: int) -> None:
-    """Saves the last processed index."""
-    with open(STATE_FILE, "w", encoding="utf-8") as f:
-        json.dump({"last_index": index}, f, ensure_ascii=False, indent=2)
-
-
 def clean_spaces(text: str) -> str:
     return re.sub(r"\s+", " ", text).strip()
 
 
 def global_clean(text: str) -> str:
-    cleaned = text
-    for p in GLOBAL_REMOVE_PATTERNS:
-        cleaned = re.sub(p, "", cleaned, flags=re.MULTILINE | re.DOTALL)
-    cleaned = re.sub(r"\n\s*\n\s*\n+", "\n\n", cleaned)
-    return cleaned.strip()
+    return BOILERPLATE.clean(text)
 
 
-def get_driver():
-    opts = Options()
-    opts.add_argument("--headless=new")
-    opts.add_argument("--disable-gpu")
-    opts.add_argument("--no-sandbox")
-    opts.add_argument("--log-level=3")
-    return webdriver.Chrome(options=opts)
+def format_iso_date(value: str) -> str:
+    """'2025-03-24T08:00:00+00:00' → '24 Mar 2025' (format koji daje DATE_XPATH)."""
+    try:
+        dt = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return ""
+    return f"{dt.day} {dt.strftime('%b %Y')}"
 
 
-def extract_date(driver) -> str:
+def extract_date_static(doc) -> str:
+    """Datum iz statičkog HTML-a: DATE_XPATH, pa meta tagovi, pa JSON-LD."""
     try:
-        el = driver.find_element(By.XPATH, DATE_XPATH)
-        return el.text.strip()
+        nodes = doc.xpath(DATE_XPATH)
+        if nodes:
+            txt = nodes[0].text_content().strip()
+            if txt:
+                return txt
+
+        for xp in DATE_META_XPATHS:
+            values = doc.xpath(xp)
+            if values:
+                formatted = format_iso_date(values[0])
+                if formatted:
+                    return formatted
+
+        for script in doc.xpath('//script[@type="application/ld+json"]/text()'):
+            m = DATE_JSONLD_RE.search(script)
+            if m:
+                formatted = format_iso_date(m.group(1))
+                if formatted:
+                    return formatted
     except Exception:
-        return ""
+        pass
+    return ""
+
 
+MAIN_XPATH = etree.XPath("(//main)[1]")
+TEXT_BLOCKS_XPATH = etree.XPath(".//p | .//h2 | .//h3 | .//li")  # redosled dokumenta
 
-def extract_content(html):
-    soup = BeautifulSoup(html, "html.parser")
 
-    main = soup.find("main")
+def extract_content(doc):
+    main = MAIN_XPATH(doc) if doc is not None else []
     if not main:
         return ""
 
     lines = []
     seen = set()
 
-    for tag in main.find_all(["p", "h2", "h3", "li"]):
+    for tag in TEXT_BLOCKS_XPATH(main[0]):
 
-        txt = tag.get_text(" ", strip=True)
+        txt = get_text(tag)
         if not txt:
             continue
 
-        if any(txt.startswith(stop) for stop in STOP_PHRASES):
+        if BOILERPLATE.stops(txt):
             break
 
-        if txt in SKIP_LINES:
+        if BOILERPLATE.skips(txt):
             continue
 
         txt = clean_spaces(txt)
@@ -122,9 +180,9 @@ def extract_content(html):
             continue
         seen.add(txt)
 
-        if tag.name in ("h2", "h3"):
+        if tag.tag in ("h2", "h3"):
             lines.append(txt)
-        elif tag.name == "li":
+        elif tag.tag == "li":
             lines.append(f"- {txt}")
         else:
             lines.append(txt)
@@ -132,8 +190,94 @@ def extract_content(html):
     return global_clean("\n\n".join(lines))
 
 
+def stream_stop():
+    """Detektor kraja članka za streaming fetch: kraj <main> ili STOP_PHRASES."""
+    return ArticleEndDetector(
+        container="main",
+        inside=None,
+        stop_phrases=STOP_PHRASES,
+        require_xpaths=(DATE_XPATH,),
+    )
+
+
+def make_extractor(browser, archive=None):
+    def render(url):
+        rendered = browser.render(url, wait_css=BROWSER_WAIT_CSS)
+        if archive is not None:
+            archive.record(
+                url,
+                200,
+                {"Content-Type": "text/html; charset=utf-8"},
+                rendered.encode("utf-8"),
+            )
+        return rendered
+
+    def extract_article(obj, html):
+        url = obj["url"]
+        if html is None:
+            return {
+                "url": url,
+                "success": False,
+                "error": "fetch_failed",
+                "date": "",
+                "content": "",
+            }
+
+        doc = parse_html(html)
+        date_str = extract_date_static(doc)
+        content = extract_content(doc)
+
+        if not content and browser is not None:
+            try:
+                rendered = render(url)
+            except Exception as e:
+                return {
+                    "url": url,
+                    "success": False,
+                    "error": f"selenium_error: {e}",
+                    "date": date_str,
+                    "content": "",
+                }
+            rendered_doc = parse_html(rendered)
+            content = extract_content(rendered_doc)
+            date_str = date_str or extract_date_static(rendered_doc)
+
+        return {
+            "url": url,
+            "success": bool(content),
+            "error": None if content else "empty_content",
+            "date": date_str,
+            "content": content,
+        }
+
+    return extract_article
+
+
 def main():
-    print("STARTING FULL ITU CRAWL")
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="bez mreže: stranice se čitaju iz arhive (data/raw/archive), od indexa 0",
+    )
+    parser.add_argument(
+        "--redrive",
+        action="store_true",
+        help="ponovo samo URL-ovi iz dead-letter fajla; izlaz se dopisuje",
+    )
+    parser.add_argument(
+        "--worker",
+        help="ime radnika: više procesa/mašina deli frontier (CRAWL_FRONTIER_DB) "
+        "preko lease-ova, izlaz ide u <OUTPUT>.<ime>.jsonl",
+    )
+    args = parser.parse_args()
+    if args.worker and args.replay:
+        parser.error("--worker ne radi sa --replay (replay ne koristi frontier)")
+    output_file = worker_output(OUTPUT_FILE, args.worker)
+
+    dead_letter = None if args.replay else DeadLetterQueue(FRONTIER_SOURCE)
+
+    print("STARTING FULL ITU CRAWL" + (" (REPLAY)" if args.replay else ""))
 
     if not Path(INPUT_FILE).exists():
         print("Nema ulaznog fajla:", INPUT_FILE)
@@ -147,67 +291,105 @@ def main():
     total = len(urls)
     limit = total if TEST_LIMIT is None else min(TEST_LIMIT, total)
 
-    start_index = load_state()
-    print(f"▶ Nastavljam od indexa: {start_index}")
-
-    mode = "a" if start_index > 0 and Path(OUTPUT_FILE).exists() else "w"
-    fout = open(OUTPUT_FILE, mode, encoding="utf-8")
-
-    driver = get_driver()
-
-    for i in range(start_index, limit):
-        obj = urls[i]
-        url = obj["url"]
-
-        print(f"[{i+1}/{limit}] Fetch → {url}")
-
-        try:
-            driver.get(url)
-            time.sleep(2.3)
-
-            date_str = extract_date(driver)
-            html = driver.page_source
-
-        except Exception as e:
-            fout.write(
-                json.dumps(
-                    {
-                        "url": url,
-                        "success": False,
-                        "error": f"selenium_error: {e}",
-                        "date": "",
-                        "content": "",
-                    },
-                    ensure_ascii=False,
-                )
-                + "\n"
-            )
-            fout.flush()
-            save_state(i + 1)
-            continue
-
-        content = extract_content(html)
-
-        fout.write(
-            json.dumps(
-                {
-                    "url": url,
-                    "success": bool(content),
-                    "error": None if content else "empty_content",
-                    "date": date_str,
-                    "content": content,
-                },
-                ensure_ascii=False,
-            )
-            + "\n"
-        )
-
+    if args.replay:
+        frontier = None
+        done_before = 0
+        batches = [urls[:limit]]
+        todo = limit
+    elif args.redrive:
+        frontier = Frontier(FRONTIER_SOURCE, owner=args.worker)
+        done_before = 0
+        batches = [dead_letter.take()]
+        todo = len(batches[0])
+        print(f"Dead-letter re-drive: {todo} URL-ova")
+    else:
+        frontier = Frontier(FRONTIER_SOURCE, owner=args.worker)
+        by_url = {obj["url"]: obj for obj in urls if obj.get("url")}
+        if frontier.add(by_url) == len(by_url):
+            # prvi put na frontier-u: preuzmi napredak iz starog itu_state.json
+            frontier.mark_done([obj.get("url") for obj in urls[: load_state()]])
+
+        counts = frontier.counts()
+        done_before = counts.get("done", 0) + counts.get("failed", 0)
+        todo = counts.get("pending", 0) + counts.get("in_progress", 0)
+        if TEST_LIMIT is not None:
+            todo = min(todo, TEST_LIMIT)
+        batches = frontier.batches(by_url, limit=TEST_LIMIT)
+    print(f"▶ Za obradu: {todo} (obrađeno ranije: {done_before})")
+
+    append = done_before > 0 or args.redrive or args.worker
+    mode = "a" if append and output_file.exists() else "w"
+    fout = open(output_file, mode, encoding="utf-8")
+
+    archive = ResponseArchive()
+    browser = (
+        BrowserPool(size=BROWSER_POOL_SIZE)
+        if BROWSER_FALLBACK and not args.replay
+        else None
+    )
+
+    processed = {"n": 0}
+
+    def on_result(i, obj, record):
+        if record is None:
+            record = {
+                "url": obj["url"],
+                "success": False,
+                "error": "extract_error",
+                "date": "",
+                "content": "",
+            }
+        processed["n"] += 1
+        mark = "✔" if record["success"] else "✖"
+        print(f"[{processed['n']}/{todo}] {mark} {obj['url']}")
+        if record["success"]:
+            record["fingerprint"] = record_fingerprint(record, FINGERPRINT_FIELDS)
+
+        fout.write(json.dumps(record, ensure_ascii=False) + "\n")
         fout.flush()
-        save_state(i + 1)
-        time.sleep(random.uniform(0.5, 1.2))
-
-    fout.close()
-    driver.quit()
+        if frontier:
+            if record["success"]:
+                frontier.complete(obj["url"], record["fingerprint"])
+            else:
+                frontier.fail(obj["url"], record["error"])
+
+    engine = CrawlEngine(
+        concurrency=CONCURRENCY,
+        per_host=PER_HOST,
+        timeout=20,
+        rate=AIMDRateController(initial_rate=2.0),
+        cache=(
+            HttpCache(FRONTIER_SOURCE, code_version(__file__))
+            if USE_HTTP_CACHE
+            else None
+        ),
+        archive=archive,
+        replay=args.replay,
+        dead_letter=dead_letter,
+        telemetry=CrawlTelemetry(FRONTIER_SOURCE, worker=args.worker),
+        stream_stop=stream_stop if STREAM_FETCH else None,
+    )
+    extract = make_extractor(browser, archive)
+    try:
+        # heartbeat obnavlja lease-ove dok radnik živi; mrtvom radniku ističu
+        with frontier.keep_leases() if frontier else nullcontext():
+            for batch in batches:
+                engine.crawl(batch, extract, on_result)
+    finally:
+        fout.close()
+        # radnik svoj fajl dopisuje u glavni izlaz; URL ponovo preuzet (lastmod
+        # se pomerio) → ostaje samo najnoviji zapis
+        deduped = finish_output(OUTPUT_FILE, args.worker)
+        if deduped:
+            print(f"Uklonjeno starih verzija članaka: {deduped}")
+        if frontier:
+            if frontier.reassigned:
+                print(f"Preuzeto od isteklih lease-ova: {frontier.reassigned}")
+            frontier.close()
+        if browser:
+            print(f"Chrome fallback korišćen za {browser.rendered} stranica")
+            browser.close()
+        archive.close()
 
     print("\nFULL CRAWL FINISHED!")
     print("Sačuvano u:", OUTPUT_FILE)
@@ -0,0 +1,261 @@
+"""
+Push ingestion: a small local HTTP endpoint that takes ONE article and runs
+its source's extract → chunk → categorize → ingest path right away, instead
+of waiting for the next crawl / batch cycle.
+
+    python -m scripts.push_ingest --port 8090
+    python -m scripts.push_ingest --dry-run       # everything except the write
+
+    POST /ingest
+        {"source": "eu_ds", "url": "https://digital-strategy.ec.europa.eu/en/news/..."}
+        {"source": "eu_ds", "url": "...", "html": "<html>...", "title": "..."}
+        {"source": "digwatch", "url": "https://dig.watch/updates/..."}
+        {"source": "digwatch", "post": {...raw WP REST post...}}
+    → 200 {"source", "url", "title", "chunks": [{"id", "uuid"}, ...], ...}
+
+    GET /health
+
+Without "html" / "post" the page (EU) or the post (DigWatch, REST `slug=`)
+is fetched. The same functions as the batch scripts are used, so chunk ids
+and UUIDs are identical to what the next batch ingest writes – a pushed
+article is simply overwritten with the same objects later. DigWatch posts are
+also put into the raw store; EU fingerprints are recorded in the ingest
+state, so the batch ingest skips the article while it is unchanged.
+
+If PUSH_TOKEN is set, requests need "Authorization: Bearer <PUSH_TOKEN>".
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+from lxml import html
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+sys.path.append(str(ROOT / "chunker"))  # chunkeri uvoze susedne module direktno
+
+from chunk_digwatch_v2_pro import chunk_item  # noqa: E402
+from chunk_eu_news_v3_pro import chunk_article, drop_learned_boilerplate  # noqa: E402
+from crawler.fingerprint import record_fingerprint  # noqa: E402
+from crawler.wordpress import SOURCES as WP_SOURCES, WordPressSource  # noqa: E402
+from scripts import ingest_digwatch_unified, ingest_eu_digital  # noqa: E402
+from scripts.digwatch.normalize_digwatch import normalize_post  # noqa: E402
+from scripts.eu_digital_strategy import novo_crawlovanje as eu  # noqa: E402
+from scripts.ingest_state import IngestState  # noqa: E402
+
+CLASS_NAME = "PolicyChunksUnified"
+
+HOST = "127.0.0.1"
+PORT = 8090
+MAX_BODY = 5 * 1024 * 1024
+FETCH_TIMEOUT = 30
+
+SOURCES = ("digwatch", "eu_ds")
+
+
+class PushError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def page_title(doc):
+    og = doc.xpath('string(//meta[@property="og:title"]/@content)').strip()
+    if og:
+        return og
+    h1 = doc.xpath("//h1")
+    if h1:
+        return " ".join(h1[0].text_content().split())
+    return doc.xpath("string(//title)").strip()
+
+
+class Pusher:
+    def __init__(self, dry_run=False):
+        self.dry_run = dry_run
+        self._write_lock = threading.Lock()
+        self.wp = WordPressSource("digwatch", WP_SOURCES["digwatch"])
+        self.wp_session = self.wp.session()
+        self.taxonomy = self.wp.taxonomy(self.wp_session)
+        self.wvt = None
+        if not dry_run:
+            from scripts.weaviate_client import WVT
+
+            self.wvt = WVT
+
+    # ---- per source: payload → (article, chunk records, (uuid, props)) ----
+
+    def eu_ds(self, payload):
+        url = payload.get("url")
+        if not url:
+            raise PushError(400, "eu_ds traži 'url'")
+
+        html_text = payload.get("html")
+        if html_text is None:
+            r = requests.get(url, headers=eu.HEADERS, timeout=FETCH_TIMEOUT)
+            if r.status_code == 404:
+                raise PushError(404, f"stranica ne postoji: {url}")
+            r.raise_for_status()
+            html_text = r.text
+
+        title = payload.get("title")
+        if not title:
+            try:
+                title = page_title(html.fromstring(html_text))
+            except Exception:
+                title = ""
+
+        obj = {"url": url, "title": title}
+        if payload.get("news_type"):
+            obj["news_type"] = payload["news_type"]
+        eu.extract_article(obj, html_text)
+        if not obj["success"]:
+            raise PushError(422, obj["error"])
+        obj["fingerprint"] = record_fingerprint(obj, eu.FINGERPRINT_FIELDS)
+        drop_learned_boilerplate(obj)  # isto kao batch chunker
+
+        chunks = chunk_article(obj)
+        items = [
+            ingest_eu_digital.build_item(c, idx) for idx, c in enumerate(chunks, 1)
+        ]
+        return obj, chunks, items
+
+    def digwatch(self, payload):
+        post = payload.get("post")
+        if post is None:
+            if not payload.get("url"):
+                raise PushError(400, "digwatch traži 'url' ili 'post'")
+            post = self.wp.fetch_by_link(self.wp_session, payload["url"])
+            if not post:
+                raise PushError(404, f"post nije nađen (REST): {payload['url']}")
+
+        if not self.dry_run:
+            store = self.wp.open_store()
+            try:
+                store.put_many([post])
+            finally:
+                store.close()
+
+        item = normalize_post(post, self.taxonomy)
+        if not item["text"]:
+            raise PushError(422, "empty_content")
+
+        chunks = chunk_item(item)
+        items = [ingest_digwatch_unified.build_item(c) for c in chunks]
+        return item, chunks, items
+
+    # ---- ingest ----
+
+    def write(self, items):
+        with self._write_lock, self.wvt.batch as batch:
+            batch.batch_size = 200
+            for uid, props in items:
+                batch.add_data_object(props, CLASS_NAME, uuid=uid)
+
+    def push(self, source, payload):
+        started = time.monotonic()
+        article, chunks, items = getattr(self, source)(payload)
+
+        if not self.dry_run:
+            self.write(items)
+            if source == "eu_ds":
+                state = IngestState("eu_ds")
+                state.unchanged(article, article["url"].rstrip("/"))
+                with self._write_lock:
+                    state.save()
+
+        return {
+            "source": source,
+            "url": article.get("url"),
+            "title": article.get("title"),
+            "chunks": [
+                {"id": c["id"], "uuid": uid} for c, (uid, _) in zip(chunks, items)
+            ],
+            "ingested": not self.dry_run,
+            "seconds": round(time.monotonic() - started, 3),
+        }
+
+
+class PushHandler(BaseHTTPRequestHandler):
+    server_version = "PolicyPush/1.0"
+
+    def _send(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _authorized(self):
+        token = os.environ.get("PUSH_TOKEN")
+        return not token or self.headers.get("Authorization") == f"Bearer {token}"
+
+    def do_GET(self):
+        if self.path != "/health":
+            return self._send(404, {"error": "not found"})
+        self._send(200, {"ok": True, "sources": list(SOURCES)})
+
+    def do_POST(self):
+        if self.path != "/ingest":
+            return self._send(404, {"error": "not found"})
+        if not self._authorized():
+            return self._send(401, {"error": "unauthorized"})
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY:
+            return self._send(413, {"error": f"telo veće od {MAX_BODY} bajtova"})
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError as e:
+            return self._send(400, {"error": f"neispravan JSON: {e}"})
+        if not isinstance(payload, dict) or payload.get("source") not in SOURCES:
+            return self._send(400, {"error": f"'source' mora biti jedan od {SOURCES}"})
+
+        try:
+            result = self.server.pusher.push(payload["source"], payload)
+        except PushError as e:
+            return self._send(e.status, {"error": str(e)})
+        except requests.RequestException as e:
+            return self._send(502, {"error": f"fetch: {e}"})
+        except Exception as e:
+            return self._send(500, {"error": f"{type(e).__name__}: {e}"})
+
+        print(
+            f" ✔ {result['source']}: {result['url']} → "
+            f"{len(result['chunks'])} chunkova ({result['seconds']}s)",
+            flush=True,
+        )
+        self._send(200, result)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="ekstrakcija i chunkovanje bez upisa u Weaviate / raw store",
+    )
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), PushHandler)
+    server.pusher = Pusher(dry_run=args.dry_run)
+    print(f" Push ingest sluša na http://{args.host}:{args.port}/ingest")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n Push ingest zaustavljen.")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
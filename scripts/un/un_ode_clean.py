@@ -1,9 +1,35 @@
 import json
 import re
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(ROOT))
+
+from crawler.boilerplate import BoilerplateFilter, LearnedBoilerplate  # noqa: E402
 
 INPUT_FILE = "un_ode_news_full.jsonl"
 OUTPUT_FILE = "un_ode_news_clean.jsonl"
 
+SKIP_PREFIXES = ["learn more"]
+SKIP_CONTAINS = [
+    "see more recent news",
+    "media contact",
+    "media inquiries",
+    "for media inquiries",
+]
+
+# jedan kompajliran filter umesto niza provera po liniji (crawler/boilerplate.py)
+BOILERPLATE = BoilerplateFilter(
+    skip_contains=SKIP_CONTAINS,
+    skip_prefixes=SKIP_PREFIXES,
+    ignore_case=True,
+)
+# linije koje se ponavljaju na mnogo UN strana (crawler/learn_boilerplate.py)
+LEARNED = LearnedBoilerplate("un")
+URL_LINE_RE = re.compile(r"https?://\S+")
+BLANK_RUN_RE = re.compile(r"\n{3,}")
+
 
 def clean_un_ode_text(text):
 
@@ -18,19 +44,10 @@ def clean_un_ode_text(text):
         if not original:
             continue
 
-        if original.lower().startswith("learn more"):
-            continue
-        if "see more recent news" in original.lower():
+        if BOILERPLATE.skips(original):
             continue
 
-        if "media contact" in original.lower():
-            continue
-        if "media inquiries" in original.lower():
-            continue
-        if "for media inquiries" in original.lower():
-            continue
-
-        if re.match(r"https?://\S+", original):
+        if URL_LINE_RE.match(original):
             continue
 
         if original not in seen:
@@ -39,13 +56,14 @@ def clean_un_ode_text(text):
 
     cleaned_text = "\n\n".join(cleaned_lines)
 
-    cleaned_text = re.sub(r"\n{3,}", "\n\n", cleaned_text)
+    cleaned_text = BLANK_RUN_RE.sub("\n\n", cleaned_text)
 
     return cleaned_text
 
 
 def main():
     print("🧹 Cleaning UN ODET articles...")
+    dropped_total = 0
 
     with open(INPUT_FILE, "r", encoding="utf-8") as f_in, open(
         OUTPUT_FILE, "w", encoding="utf-8"
@@ -54,12 +72,19 @@ def main():
         for line in f_in:
             item = json.loads(line)
 
-            cleaned = clean_un_ode_text(item["text"])
+            # fingerprint dobija trag izbačenih linija → chunker ponovo chunkuje
+            # samo članke kojima se taj skup promenio
+            text, dropped = LEARNED.strip(item["text"])
+            item["fingerprint"] = LEARNED.stamp(item.get("fingerprint"), dropped)
+            dropped_total += len(dropped)
+
+            cleaned = clean_un_ode_text(text)
             item["text"] = cleaned
 
             f_out.write(json.dumps(item, ensure_ascii=False) + "\n")
 
     print(" Cleaning complete!")
+    print(f" Learned boilerplate lines dropped: {dropped_total} ({len(LEARNED)} known)")
     print(f" Saved: {OUTPUT_FILE}")
 
 
@@ -1,23 +1,31 @@
+import argparse
 import json
 import re
+import sys
+from pathlib import Path
 from urllib.parse import urljoin
 
 import requests
 from bs4 import BeautifulSoup
 
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(ROOT))
+
+from crawler.discovery import STOP_AFTER_KNOWN, KnownUrlRun, load_known_items  # noqa: E402
+
 BASE_URL = "https://www.un.org"
 LIST_URL = "https://www.un.org/digital-emerging-technologies/content/news"
 HEADERS = {"User-Agent": "Mozilla/5.0"}
+OUT_FILE = "un_ode_news_urls.json"
 
 DATE_PATTERN = re.compile(r"\d{1,2}\s+[A-Za-z]+\s+\d{4}")
 
+# incremental mod prati Drupal paginaciju (?page=N) dok ne naiđe na poznate URL-ove
+MAX_PAGES = 50
 
-def collect_un_urls():
-    print("🔎 Preuzimam listu vesti sa UN ODET...")
-    r = requests.get(LIST_URL, headers=HEADERS, timeout=20)
-    r.raise_for_status()
 
-    soup = BeautifulSoup(r.text, "html.parser")
+def parse_listing(html_text, listing_url):
+    soup = BeautifulSoup(html_text, "html.parser")
 
     items = []
 
@@ -48,19 +56,61 @@ def collect_un_urls():
                 "title": title,
                 "date": date_txt,
                 "url": full_url,
-                "listing_page": LIST_URL,
+                "listing_page": listing_url,
             }
         )
 
-    out_file = "un_ode_news_urls.json"
-    with open(out_file, "w", encoding="utf-8") as f:
+    return items
+
+
+def collect_un_urls(incremental=False, stop_after=STOP_AFTER_KNOWN):
+    if not incremental:
+        print("🔎 Preuzimam listu vesti sa UN ODET...")
+        r = requests.get(LIST_URL, headers=HEADERS, timeout=20)
+        r.raise_for_status()
+        items = parse_listing(r.text, LIST_URL)
+    else:
+        known_items = load_known_items(OUT_FILE)
+        tracker = KnownUrlRun([it["url"] for it in known_items], stop_after)
+        print(f"🔎 Incremental: {len(known_items)} poznatih URL-ova")
+
+        new_items = []
+        for page in range(MAX_PAGES):
+            url = LIST_URL if page == 0 else f"{LIST_URL}?page={page}"
+            r = requests.get(url, headers=HEADERS, timeout=20)
+            if r.status_code != 200:
+                break
+
+            page_items = parse_listing(r.text, url)
+            fresh = [it for it in page_items if tracker.check(it["url"])]
+            new_items.extend(fresh)
+            print(f" Strana {page + 1}: {len(fresh)} novih")
+
+            # ako sajt ignoriše ?page, ista strana daje samo poznate URL-ove → stop
+            if not page_items or tracker.exhausted:
+                break
+
+        # listing je od najnovijeg → novi idu na početak liste
+        items = new_items + known_items
+        print(f" Novih URL-ova: {len(new_items)}")
+
+    with open(OUT_FILE, "w", encoding="utf-8") as f:
         json.dump(items, f, indent=2, ensure_ascii=False)
 
-    print(f"\n Sacuvano: {out_file}")
+    print(f"\n Sacuvano: {OUT_FILE}")
     print(f" Ukupno URL-ova: {len(items)}")
 
     return items
 
 
 if __name__ == "__main__":
-    collect_un_urls()
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="dopuni postojeću listu: staje kad naiđe na niz već poznatih URL-ova",
+    )
+    parser.add_argument("--stop-after", type=int, default=STOP_AFTER_KNOWN)
+    args = parser.parse_args()
+
+    collect_un_urls(incremental=args.incremental, stop_after=args.stop_after)
@@ -1,13 +1,34 @@
+import argparse
 import json
+import sys
+from contextlib import nullcontext
 from datetime import datetime
+from pathlib import Path
 
-import requests
-from bs4 import BeautifulSoup
+from lxml import etree
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(ROOT))
+
+from crawler.archive import ResponseArchive  # noqa: E402
+from crawler.dead_letter import DeadLetterQueue  # noqa: E402
+from crawler.engine import CrawlEngine  # noqa: E402
+from crawler.extract import get_text, has_class, parse_html  # noqa: E402
+from crawler.fingerprint import record_fingerprint  # noqa: E402
+from crawler.frontier import Frontier, finish_output, worker_output  # noqa: E402
+from crawler.http_cache import HttpCache, code_version  # noqa: E402
+from crawler.telemetry import CrawlTelemetry  # noqa: E402
 
 HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
 
 INPUT_URLS = "un_ode_news_urls.json"
 OUTPUT_FILE = "un_ode_news_full.jsonl"
+USE_HTTP_CACHE = True  # ETag/Last-Modified revalidacija (304 → bez ekstrakcije)
+MAX_RETRIES = 3
+DEAD_LETTER_SOURCE = "un"
+FRONTIER_SOURCE = "un"  # samo u --worker režimu
+# polja koja ulaze u chunkove; nepromenjen fingerprint → chunker/ingest preskaču članak
+FINGERPRINT_FIELDS = ("title", "date", "text")
 
 
 def parse_date(date_str):
@@ -18,47 +39,49 @@ def parse_date(date_str):
         return date_str  # fallback
 
 
-def extract_text(soup):
+BODY_XPATH = etree.XPath(f"(//*[{has_class('field--name-body')}])[1]")
+MAIN_XPATH = etree.XPath("(//main)[1]")
+P_XPATH = etree.XPath(".//p")
+ALL_P_XPATH = etree.XPath("//p")
+
+
+def extract_text(doc):
     """
     Pokušavamo 3 nivoa:
     1) UN standardni body div (.field--name-body)
     2) <main> pa <p>
     3) fallback: SVI <p>
     """
+    if doc is None:
+        return ""
 
-    body = soup.select_one(".field--name-body")
+    body = BODY_XPATH(doc)
     if body:
-        paragraphs = [p.get_text(" ", strip=True) for p in body.find_all("p")]
+        paragraphs = [get_text(p) for p in P_XPATH(body[0])]
         return "\n\n".join(paragraphs)
 
-    main_tag = soup.find("main")
+    main_tag = MAIN_XPATH(doc)
     if main_tag:
-        paragraphs = [p.get_text(" ", strip=True) for p in main_tag.find_all("p")]
+        paragraphs = [get_text(p) for p in P_XPATH(main_tag[0])]
         if paragraphs:
             return "\n\n".join(paragraphs)
 
-    all_p = soup.find_all("p")
+    all_p = ALL_P_XPATH(doc)
     if all_p:
-        paragraphs = [p.get_text(" ", strip=True) for p in all_p]
+        paragraphs = [get_text(p) for p in all_p]
         return "\n\n".join(paragraphs)
 
     return ""
 
 
-def crawl_article(item):
+def crawl_article(item, html_text):
     url = item["url"]
-    print(f" Crawling: {url}")
 
-    try:
-        r = requests.get(url, headers=HEADERS, timeout=20)
-        r.raise_for_status()
-    except Exception as e:
-        print(f" ERROR {url}: {e}")
+    if html_text is None:
+        print(f" ERROR {url}: fetch failed")
         return None
 
-    soup = BeautifulSoup(r.text, "html.parser")
-
-    text = extract_text(soup)
+    text = extract_text(parse_html(html_text))
     if not text:
         print(f"⚠️ Empty content: {url}")
 
@@ -75,18 +98,104 @@ def crawl_article(item):
 
 
 def main():
-    print(" Učitavam URL listu...")
-    with open(INPUT_URLS, "r", encoding="utf-8") as f:
-        urls = json.load(f)
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="bez mreže: stranice se čitaju iz arhive (data/raw/archive)",
+    )
+    parser.add_argument(
+        "--redrive",
+        action="store_true",
+        help="ponovo samo URL-ovi iz dead-letter fajla; izlaz se dopisuje",
+    )
+    parser.add_argument(
+        "--worker",
+        help="ime radnika: URL-ovi se dele sa drugim radnicima preko frontier-a "
+        "(CRAWL_FRONTIER_DB, lease po URL-u; već urađeni se preskaču), "
+        "izlaz ide u <OUTPUT>.<ime>.jsonl",
+    )
+    args = parser.parse_args()
+    if args.worker and args.replay:
+        parser.error("--worker ne radi sa --replay (replay ne koristi frontier)")
+    output_file = worker_output(OUTPUT_FILE, args.worker)
+
+    dead_letter = None if args.replay else DeadLetterQueue(DEAD_LETTER_SOURCE)
+
+    if args.redrive:
+        urls = dead_letter.take()
+        print(f" Dead-letter re-drive: {len(urls)} URL-ova")
+    else:
+        print(" Učitavam URL listu...")
+        with open(INPUT_URLS, "r", encoding="utf-8") as f:
+            urls = json.load(f)
 
     print(f" Ukupno za crawling: {len(urls)}")
 
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as out:
-        for item in urls:
-            data = crawl_article(item)
-            if data:
-                out.write(json.dumps(data, ensure_ascii=False) + "\n")
-
+    frontier = None
+    batches = [urls]
+    if args.worker and not args.redrive:
+        frontier = Frontier(FRONTIER_SOURCE, owner=args.worker)
+        by_url = {item["url"]: item for item in urls if item.get("url")}
+        frontier.add(by_url)
+        counts = frontier.counts()
+        print(
+            f" Frontier: urađeno {counts.get('done', 0)} | "
+            f"za obradu {counts.get('pending', 0) + counts.get('in_progress', 0)}"
+        )
+        batches = frontier.batches(by_url)
+
+    engine = CrawlEngine(
+        headers=HEADERS,
+        concurrency=8,
+        per_host=4,
+        max_retries=MAX_RETRIES,
+        cache=(
+            HttpCache(
+                DEAD_LETTER_SOURCE,
+                code_version(__file__),
+                ok=lambda r: bool(r.get("text")),
+            )
+            if USE_HTTP_CACHE
+            else None
+        ),
+        archive=ResponseArchive(),
+        replay=args.replay,
+        dead_letter=dead_letter,
+        telemetry=CrawlTelemetry(DEAD_LETTER_SOURCE, worker=args.worker),
+    )
+
+    mode = "a" if args.redrive or args.worker else "w"
+    with open(output_file, mode, encoding="utf-8") as out:
+
+        def on_result(i, item, data):
+            if not data:
+                # neuspeli fetch je već upisan u dead-letter fajl
+                print(f" ✖ [{i+1}/{len(urls)}]: {item['url']}")
+                if frontier:
+                    frontier.fail(item["url"], "fetch_failed")
+                return
+            print(f" Crawled [{i+1}/{len(urls)}]: {item['url']}")
+            data["fingerprint"] = record_fingerprint(data, FINGERPRINT_FIELDS)
+            out.write(json.dumps(data, ensure_ascii=False) + "\n")
+            if frontier:
+                frontier.complete(item["url"], data["fingerprint"])
+
+        # heartbeat obnavlja lease-ove dok radnik živi; mrtvom radniku ističu
+        with frontier.keep_leases() if frontier else nullcontext():
+            for batch in batches:
+                engine.crawl(batch, crawl_article, on_result)
+
+    # radnik svoj fajl dopisuje u glavni izlaz; URL ponovo preuzet → ostaje
+    # samo najnoviji zapis
+    deduped = finish_output(OUTPUT_FILE, args.worker)
+    if deduped:
+        print(f" Uklonjeno starih verzija članaka: {deduped}")
+
+    if frontier:
+        if frontier.reassigned:
+            print(f" Preuzeto od radnika sa isteklim lease-om: {frontier.reassigned}")
+        frontier.close()
     print(f"\n Sačuvano: {OUTPUT_FILE}")
     print(" Full crawling završen!")
 
@@ -0,0 +1,96 @@
+import pytest
+
+bs4 = pytest.importorskip("bs4")
+
+from crawler import bench_extract  # noqa: E402
+from crawler.extract import get_text, outer_html, parse_html  # noqa: E402
+
+FRAGMENT = """
+<div class=" lead  intro" data-x='say "hi"'>
+  Tom &amp; Jerry <b>bold</b><br>
+  <!-- note -->
+  <script>var a = 1 < 2;</script><style>p {}</style>
+  <img src="a.png" alt="a &lt; b">
+  <pre>  keep
+    spacing </pre>
+  <p>   </p><a href="/x?a=1&amp;b=2" rel="nofollow  noopener">link</a>
+</div>
+"""
+
+IETF_PAGE = """
+<html><body><main>
+  <h1> IETF 120 highlights </h1>
+  <p>12 March 2024</p>
+  <p>The <a href="/meeting">meeting</a> covered   QUIC &amp; TLS.</p>
+  <ul><li>one</li><li>two</li></ul>
+  <div><i class="bi bi-twitter"></i> Share</div>
+  <p>The <a href="/meeting">meeting</a> covered   QUIC &amp; TLS.</p>
+  <h2>Next steps</h2>
+</main></body></html>
+"""
+
+UN_PAGE = """
+<html><body>
+  <p>Outside</p>
+  <div class="field field--name-body">
+    <p>First <em>paragraph</em>.</p><p> Second &nbsp; one </p>
+  </div>
+</body></html>
+"""
+
+UN_MAIN_PAGE = (
+    "<html><body><main><p>A</p><div><p>B <b>c</b></p></div></main></body></html>"
+)
+
+ITU_PAGE = """
+<html><body><main>
+  <h2>Digital inclusion</h2>
+  <p>ITU launched a new   initiative.</p>
+  <ul><li>Point one</li><li>Point two</li></ul>
+  <p>ITU launched a new   initiative.</p>
+  <h3>Background</h3><p>More text.</p>
+</main></body></html>
+"""
+
+WP_CONTENT = """
+<h2>Policy</h2><p>Intro <strong>text</strong>.</p>
+<h3>Detail</h3><ul><li>a</li><li>b <ul><li>nested</li></ul></li></ul>
+<blockquote>Quote</blockquote><script>x()</script>
+<table><tr><th>Col</th><th>Val</th></tr><tr><td>k</td><td>v</td></tr></table>
+"""
+
+PAGES = [
+    ("ietf", IETF_PAGE),
+    ("ietf", "<html><body><main><p>no title</p></main></body></html>"),
+    ("un", UN_PAGE),
+    ("un", UN_MAIN_PAGE),
+    ("itu", ITU_PAGE),
+    ("digwatch_strip_html", FRAGMENT),
+    ("digwatch_strip_html", WP_CONTENT),
+    ("chunk_updates_v1", WP_CONTENT),
+    ("chunk_updates_v1", "<div>only <span>loose</span> text</div>"),
+]
+
+
+@pytest.mark.parametrize("name, html", PAGES)
+def test_extractor_matches_beautifulsoup(name, html):
+    _, before, after = bench_extract.EXTRACTORS[name]
+    assert after(html) == before(html)
+
+
+def test_get_text_matches_beautifulsoup():
+    soup = bs4.BeautifulSoup(FRAGMENT, "html.parser").div
+    el = parse_html(FRAGMENT).find(".//div")
+    assert get_text(el) == soup.get_text(" ", strip=True)
+    assert get_text(el, "\n") == soup.get_text("\n", strip=True)
+
+
+def test_outer_html_matches_beautifulsoup():
+    soup = bs4.BeautifulSoup(FRAGMENT, "html.parser").div
+    el = parse_html(FRAGMENT).find(".//div")
+    assert outer_html(el) == str(soup)
+
+
+def test_parse_html_empty_input():
+    assert parse_html("") is None
+    assert get_text(parse_html("<p> a </p><p>b</p>")) == "a b"
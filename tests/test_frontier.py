@@ -0,0 +1,96 @@
+import json
+import time
+
+from crawler.frontier import Frontier, finish_output, worker_output
+
+
+def test_claims_follow_input_order_without_duplicates(tmp_path):
+    db = tmp_path / "frontier.sqlite"
+    a = Frontier("itu", db, owner="a")
+    b = Frontier("itu", db, owner="b")
+    assert a.add(["u1", "u2", "u3"]) == 3
+    assert a.add(["u2", "u4"]) == 1
+
+    assert a.claim(2) == ["u1", "u2"]
+    assert b.claim(10) == ["u3", "u4"]
+    assert a.claim(10) == []
+    assert a.counts() == {"in_progress": 4}
+
+
+def test_expired_lease_is_reassigned_and_late_worker_cannot_finish(tmp_path):
+    db = tmp_path / "frontier.sqlite"
+    a = Frontier("itu", db, lease=-1, owner="a")
+    b = Frontier("itu", db, owner="b")
+    a.add(["u1"])
+    assert a.claim() == ["u1"]
+
+    assert b.claim() == ["u1"]
+    assert b.reassigned == 1
+    assert not a.complete("u1", "hash-a")
+    assert b.complete("u1", "hash-b")
+    # already done: a late fail() from the first worker changes nothing
+    assert not a.fail("u1", "timeout")
+    assert b.counts() == {"done": 1}
+
+
+def test_heartbeat_keeps_the_lease(tmp_path):
+    db = tmp_path / "frontier.sqlite"
+    a = Frontier("itu", db, lease=60, owner="a")
+    b = Frontier("itu", db, owner="b")
+    a.add(["u1", "u2"])
+    a.claim()
+    assert a.heartbeat() == 2
+    assert b.claim() == []
+    assert a.workers()["a"][0] == 2
+
+
+def test_refresh_requeues_changed_urls_first(tmp_path):
+    frontier = Frontier("eu_ds", tmp_path / "frontier.sqlite", owner="a")
+    frontier.add(["u1", "u2"])
+    assert frontier.refresh([("u1", "2024-01-01"), ("u2", "2024-01-01")]) == ([], [])
+    for url in frontier.claim():
+        frontier.complete(url, "h")
+
+    new, changed = frontier.refresh(
+        [("u1", "2024-01-01"), ("u2", "2024-03-01"), ("u3", "2024-02-01")]
+    )
+    assert (new, changed) == (["u3"], ["u2"])
+    assert frontier.claim() == ["u2", "u3"]
+
+
+def test_changed_since_counts_new_content_hashes(tmp_path):
+    frontier = Frontier("itu", tmp_path / "frontier.sqlite", owner="a")
+    frontier.refresh([("u1", "2024-01-01"), ("u2", "2024-01-01")])
+    for url in frontier.claim():
+        frontier.complete(url, "h1")
+    since = time.time()
+
+    frontier.refresh([("u1", "2024-02-01"), ("u2", "2024-02-01")])
+    for url in frontier.claim():
+        frontier.complete(url, "h2" if url == "u1" else "h1")
+    assert frontier.changed_since(since) == 1
+
+
+def test_batches_drop_urls_missing_from_input(tmp_path):
+    frontier = Frontier("un", tmp_path / "frontier.sqlite", owner="a")
+    frontier.add(["u1", "u2", "u3"])
+    items = {"u1": {"url": "u1"}, "u3": {"url": "u3"}}
+    assert list(frontier.batches(items, size=10)) == [[items["u1"], items["u3"]]]
+    assert frontier.counts()["dropped"] == 1
+
+
+def test_finish_output_merges_worker_records(tmp_path):
+    out = tmp_path / "articles.jsonl"
+    out.write_text(json.dumps({"url": "u1", "v": 1}) + "\n", encoding="utf-8")
+    part = worker_output(out, "w1")
+    part.write_text(
+        "".join(json.dumps({"url": u, "v": 2}) + "\n" for u in ("u1", "u2")),
+        encoding="utf-8",
+    )
+
+    finish_output(out, "w1")
+    lines = out.read_text(encoding="utf-8").splitlines()
+    records = [json.loads(line) for line in lines]
+    assert {r["url"]: r["v"] for r in records} == {"u1": 2, "u2": 2}
+    assert len(records) == 2
+    assert not part.exists()
@@ -0,0 +1,68 @@
+import json
+
+from crawler.raw_store import SegmentedJsonlStore, iter_json_array
+
+
+def post(pid, modified, content="x"):
+    return {"id": pid, "modified": modified, "content": {"rendered": content}}
+
+
+def test_put_many_appends_only_new_or_modified(tmp_path):
+    store = SegmentedJsonlStore(tmp_path)
+    assert store.put_many([post(1, "2024-01-01"), post(2, "2024-01-01")]) == (2, 0)
+    assert store.put_many([post(1, "2024-01-01"), post(2, "2024-02-01", "y")]) == (
+        0,
+        1,
+    )
+    assert len(store) == 2
+    assert store.get(2)["content"]["rendered"] == "y"
+    assert store.max_modified() == "2024-02-01"
+    store.close()
+
+
+def test_iter_posts_yields_latest_versions(tmp_path):
+    store = SegmentedJsonlStore(tmp_path, segment_bytes=200)
+    for version in range(3):
+        store.put_many([post(pid, f"2024-0{version + 1}-01") for pid in range(5)])
+    posts = list(store.iter_posts())
+    assert sorted(p["id"] for p in posts) == list(range(5))
+    assert {p["modified"] for p in posts} == {"2024-03-01"}
+    assert len(list(tmp_path.glob("segment-*.jsonl"))) > 1
+    store.close()
+
+
+def test_compact_drops_superseded_versions(tmp_path):
+    store = SegmentedJsonlStore(tmp_path)
+    store.put_many([post(pid, "2024-01-01") for pid in range(10)])
+    store.put_many([post(pid, "2024-02-01") for pid in range(5)])
+    assert store.dead_ratio() > 0.3
+
+    assert store.compact() == 10
+    assert store.dead_ratio() == 0.0
+    assert {p["id"]: p["modified"] for p in store.iter_posts()} == {
+        pid: "2024-02-01" if pid < 5 else "2024-01-01" for pid in range(10)
+    }
+    store.close()
+
+    # the compacted segment is picked up on reopen and new writes follow it
+    store = SegmentedJsonlStore(tmp_path)
+    store.put_many([post(10, "2024-03-01")])
+    assert len(store) == 11
+    assert store.get(3)["modified"] == "2024-02-01"
+    store.close()
+
+
+def test_iter_json_array_small_blocks(tmp_path):
+    posts = [post(pid, "2024-01-01", "ž" * pid) for pid in range(50)] + [12345]
+    path = tmp_path / "updates_all.json"
+    path.write_text(json.dumps(posts, ensure_ascii=False, indent=1), encoding="utf-8")
+    assert list(iter_json_array(path, read_bytes=7)) == posts
+
+
+def test_import_legacy_into_empty_store(tmp_path):
+    legacy = tmp_path / "updates_all.json"
+    legacy.write_text(json.dumps([post(1, "a"), post(2, "b")]), encoding="utf-8")
+    store = SegmentedJsonlStore(tmp_path / "store")
+    assert store.import_legacy(legacy) == 2
+    assert store.import_legacy(legacy) == 0
+    store.close()